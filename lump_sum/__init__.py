@@ -0,0 +1,95 @@
+"""
+LUMP SUM vs DCA - Motor de simulación
+=====================================
+Núcleo de cálculo sin dependencias de interfaz (Streamlit, plotly, yfinance),
+importable desde procesos por lotes y workers.
+
+Autor: BQuant Finance
+"""
+
+from .calendario import REGLAS_CALENDARIO, posiciones_compra, indices_compra, num_aportaciones
+from .fiscalidad import TRAMOS_IRPF_2024, calcular_impuestos_españa, calcular_impuestos_españa_array
+from .metricas import (
+    calcular_metricas,
+    calcular_max_drawdown,
+    calcular_cagr,
+    calcular_twr,
+    calcular_twr_diario,
+    calcular_tir,
+)
+from .operaciones import LibroOperaciones
+from .simulacion import (
+    MOTORES_CAPITAL_DISPONIBLE,
+    simular_lump_sum,
+    simular_dca_capital_disponible,
+    simular_dca_aportacion_periodica,
+)
+from .resultado import ResultadoSimulacion, fila_resumen
+from .cartera import REGLAS_REBALANCEO, simular_cartera_lump_sum, simular_cartera_dca, comparar_cartera_ls_dca
+from .horizontes import PrefijosSimulacion
+from .estudios import estudio_ventanas_moviles, barrido_parametros
+from .paralelo import ArraysCompartidos, EjecutorProcesos
+from .montecarlo import caminos_bootstrap, simular_caminos, monte_carlo_ls_dca
+from .proveedores import (
+    ErrorDatos,
+    TickerNoEncontrado,
+    ErrorProveedor,
+    ProveedorPrecios,
+    ProveedorYFinance,
+    ProveedorFicheros,
+    crear_proveedor,
+)
+from .almacen import AlmacenPrecios
+from .universo import UNIVERSOS, ejecutar_universo
+from .cache import CacheLRU, huella_serie
+from .instrumentacion import Cronometro
+from .submuestreo import lttb
+
+__all__ = [
+    'REGLAS_CALENDARIO',
+    'posiciones_compra',
+    'indices_compra',
+    'num_aportaciones',
+    'TRAMOS_IRPF_2024',
+    'calcular_impuestos_españa',
+    'calcular_impuestos_españa_array',
+    'calcular_metricas',
+    'calcular_max_drawdown',
+    'calcular_cagr',
+    'calcular_twr',
+    'calcular_twr_diario',
+    'calcular_tir',
+    'LibroOperaciones',
+    'MOTORES_CAPITAL_DISPONIBLE',
+    'simular_lump_sum',
+    'simular_dca_capital_disponible',
+    'simular_dca_aportacion_periodica',
+    'ResultadoSimulacion',
+    'fila_resumen',
+    'REGLAS_REBALANCEO',
+    'simular_cartera_lump_sum',
+    'simular_cartera_dca',
+    'comparar_cartera_ls_dca',
+    'PrefijosSimulacion',
+    'estudio_ventanas_moviles',
+    'barrido_parametros',
+    'ArraysCompartidos',
+    'EjecutorProcesos',
+    'caminos_bootstrap',
+    'simular_caminos',
+    'monte_carlo_ls_dca',
+    'ErrorDatos',
+    'TickerNoEncontrado',
+    'ErrorProveedor',
+    'ProveedorPrecios',
+    'ProveedorYFinance',
+    'ProveedorFicheros',
+    'crear_proveedor',
+    'AlmacenPrecios',
+    'UNIVERSOS',
+    'ejecutar_universo',
+    'CacheLRU',
+    'huella_serie',
+    'Cronometro',
+    'lttb',
+]
@@ -0,0 +1,230 @@
+"""
+Almacén local de precios en SQLite con refresco incremental.
+
+La primera vez que se pide un ticker se descarga toda su historia; después solo
+se piden las sesiones posteriores a la última guardada. Cualquier fecha_inicio
+se sirve recortando lo almacenado, así que cambiar la fecha nunca descarga.
+
+Como los cierres están ajustados (dividendos, splits), al refrescar se vuelve a
+pedir la penúltima sesión guardada, la última ya cerrada: si su precio ya no
+coincide, el ajuste ha cambiado y se recarga la historia completa. La última
+sesión guardada puede ser un cierre parcial (descargado con el mercado
+abierto), así que no se compara: se sobrescribe con el valor nuevo. Si la
+fuente falla con un ticker ya guardado se sirve lo almacenado y se avisa por el
+logger 'lump_sum.almacen'.
+
+El almacén es a su vez un ProveedorPrecios que envuelve a la fuente real.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .proveedores import ProveedorPrecios, TickerNoEncontrado, crear_proveedor
+from .metadatos import TTL_METADATOS
+from .coalescencia import VUELOS
+
+
+RUTA_POR_DEFECTO = Path(os.environ.get('LUMP_SUM_ALMACEN', Path.home() / '.cache' / 'lump_sum' / 'precios.sqlite'))
+
+# Tolerancia relativa para considerar que el cierre ajustado no ha cambiado
+TOLERANCIA_AJUSTE = 1e-6
+
+REGISTRO = logging.getLogger('lump_sum.almacen')
+
+
+class AlmacenPrecios(ProveedorPrecios):
+    """Precios de cierre ajustados por ticker, persistidos en disco."""
+    
+    def __init__(
+        self,
+        ruta: str = None,
+        ttl: float = 3600,
+        proveedor: ProveedorPrecios = None,
+        ttl_metadatos: float = TTL_METADATOS
+    ):
+        """
+        ruta: fichero SQLite (por defecto ~/.cache/lump_sum/precios.sqlite o $LUMP_SUM_ALMACEN).
+        ttl: segundos durante los que no se vuelve a consultar la fuente tras un refresco.
+        proveedor: fuente real de los datos (por defecto crear_proveedor()).
+        ttl_metadatos: vigencia de los metadatos guardados (mucho mayor que la de los precios).
+        """
+        self.ruta = Path(ruta) if ruta is not None else RUTA_POR_DEFECTO
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.ttl_metadatos = ttl_metadatos
+        self._contadores = {'aciertos': 0, 'fallos': 0, 'esperas_coalescidas': 0}
+        self._lock_contadores = threading.Lock()
+        self.proveedor = proveedor or crear_proveedor()
+        with self._conexion() as con:
+            con.executescript("""
+                CREATE TABLE IF NOT EXISTS precios (
+                    ticker TEXT NOT NULL,
+                    fecha TEXT NOT NULL,
+                    cierre REAL NOT NULL,
+                    PRIMARY KEY (ticker, fecha)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS tickers (
+                    ticker TEXT PRIMARY KEY,
+                    ultima_fecha TEXT NOT NULL,
+                    actualizado REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS metadatos (
+                    ticker TEXT PRIMARY KEY,
+                    datos TEXT NOT NULL,
+                    actualizado REAL NOT NULL
+                );
+            """)
+    
+    @contextmanager
+    def _conexion(self):
+        """Conexión de corta duración: confirma la transacción y se cierra al salir."""
+        con = sqlite3.connect(self.ruta, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+    
+    def precios(self, ticker: str, fecha_inicio: str = None) -> pd.Series:
+        """Serie de cierres desde fecha_inicio (incluida), refrescando la cola si ha caducado."""
+        ticker = ticker.upper().strip()
+        try:
+            # Sesiones concurrentes sobre el mismo ticker comparten un único refresco
+            descargado, compartido = VUELOS.ejecutar((str(self.ruta), ticker), self.actualizar, ticker)
+        except Exception as e:
+            # Fuente caída: se sirve lo almacenado si existe
+            if self._estado(ticker) is None:
+                raise
+            REGISTRO.warning("No se pudo refrescar %s; se sirven los precios almacenados: %s", ticker, e)
+        else:
+            self._contar('esperas_coalescidas' if compartido else 'fallos' if descargado else 'aciertos')
+        return self._leer(ticker, fecha_inicio)
+    
+    def estadisticas(self) -> dict:
+        """
+        Contadores de precios(): aciertos (servido sin ir a la fuente), fallos
+        (hubo descarga) y esperas_coalescidas (se esperó a la descarga de otra sesión).
+        """
+        with self._lock_contadores:
+            estadisticas = dict(self._contadores)
+        estadisticas['en_vuelo'] = VUELOS.en_vuelo()
+        return estadisticas
+    
+    def _contar(self, contador: str):
+        with self._lock_contadores:
+            self._contadores[contador] += 1
+    
+    def metadatos(self, ticker: str) -> dict:
+        """Metadatos guardados si siguen vigentes; si no, se piden a la fuente y se guardan."""
+        ticker = ticker.upper().strip()
+        with self._conexion() as con:
+            fila = con.execute("SELECT datos, actualizado FROM metadatos WHERE ticker = ?", (ticker,)).fetchone()
+        if fila is not None and time.time() - fila[1] < self.ttl_metadatos:
+            return json.loads(fila[0])
+        try:
+            info = self.proveedor.metadatos(ticker)
+        except Exception:
+            # Fuente caída: mejor metadatos caducados que ninguno
+            if fila is None:
+                raise
+            return json.loads(fila[0])
+        with self._conexion() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO metadatos (ticker, datos, actualizado) VALUES (?, ?, ?)",
+                (ticker, json.dumps(info, ensure_ascii=False, default=str), time.time())
+            )
+        return info
+    
+    def actualizar(self, ticker: str, forzar: bool = False) -> bool:
+        """
+        Descarga lo que falte del ticker: todo si es nuevo, solo la cola si ya existe.
+        Devuelve True si se ha consultado la fuente.
+        """
+        ticker = ticker.upper().strip()
+        estado = self._estado(ticker)
+        if estado is None:
+            self._recargar(ticker)
+            return True
+        
+        _, actualizado = estado
+        if not forzar and time.time() - actualizado < self.ttl:
+            return False
+        
+        # Desde la penúltima sesión guardada (o la única): la última puede ser parcial y se sobrescribe
+        sesiones = self._ultimas_sesiones(ticker)
+        nuevos = self.proveedor.precios(ticker, sesiones[0])
+        if nuevos.empty:
+            self._marcar_actualizado(ticker)
+            return True
+        
+        # La última sesión cerrada debe coincidir; si no, el ajuste histórico ha cambiado
+        guardado = self._leer(ticker, sesiones[0]).iloc[:1] if len(sesiones) == 2 else pd.Series(dtype=float)
+        solape = nuevos.reindex(guardado.index).dropna()
+        if len(solape) and not np.allclose(solape.values, guardado.loc[solape.index].values, rtol=TOLERANCIA_AJUSTE):
+            self._recargar(ticker)
+            return True
+        
+        self._guardar(ticker, nuevos)
+        return True
+    
+    def _recargar(self, ticker: str):
+        historia = self.proveedor.precios(ticker, None)
+        if historia.empty:
+            raise TickerNoEncontrado(ticker)
+        # Borrado e inserción en la misma transacción: ningún lector ve el ticker vacío
+        with self._conexion() as con:
+            con.execute("DELETE FROM precios WHERE ticker = ?", (ticker,))
+            self._insertar(con, ticker, historia)
+    
+    def _guardar(self, ticker: str, serie: pd.Series):
+        with self._conexion() as con:
+            self._insertar(con, ticker, serie)
+    
+    def _insertar(self, con: sqlite3.Connection, ticker: str, serie: pd.Series):
+        filas = list(zip([ticker] * len(serie), serie.index.strftime('%Y-%m-%d'), serie.values.astype(float)))
+        con.executemany("INSERT OR REPLACE INTO precios (ticker, fecha, cierre) VALUES (?, ?, ?)", filas)
+        ultima = con.execute("SELECT MAX(fecha) FROM precios WHERE ticker = ?", (ticker,)).fetchone()[0]
+        con.execute(
+            "INSERT OR REPLACE INTO tickers (ticker, ultima_fecha, actualizado) VALUES (?, ?, ?)",
+            (ticker, ultima, time.time())
+        )
+    
+    def _marcar_actualizado(self, ticker: str):
+        with self._conexion() as con:
+            con.execute("UPDATE tickers SET actualizado = ? WHERE ticker = ?", (time.time(), ticker))
+    
+    def _estado(self, ticker: str) -> tuple[str, float] | None:
+        with self._conexion() as con:
+            return con.execute(
+                "SELECT ultima_fecha, actualizado FROM tickers WHERE ticker = ?", (ticker,)
+            ).fetchone()
+    
+    def _ultimas_sesiones(self, ticker: str) -> list[str]:
+        """Penúltima y última fecha guardadas (solo la última si hay una)."""
+        with self._conexion() as con:
+            filas = con.execute(
+                "SELECT fecha FROM precios WHERE ticker = ? ORDER BY fecha DESC LIMIT 2", (ticker,)
+            ).fetchall()
+        return [fila[0] for fila in reversed(filas)]
+    
+    def _leer(self, ticker: str, fecha_inicio: str = None) -> pd.Series:
+        desde = pd.Timestamp(fecha_inicio).strftime('%Y-%m-%d') if fecha_inicio is not None else ''
+        with self._conexion() as con:
+            filas = con.execute(
+                "SELECT fecha, cierre FROM precios WHERE ticker = ? AND fecha >= ? ORDER BY fecha",
+                (ticker, desde)
+            ).fetchall()
+        if not filas:
+            return pd.Series(dtype=float, name='Close')
+        fechas, cierres = zip(*filas)
+        return pd.Series(cierres, index=pd.DatetimeIndex(fechas), name='Close', dtype=float)
+
@@ -0,0 +1,315 @@
+"""
+Benchmarks de los caminos críticos del motor.
+
+Mide sin red los simuladores, las métricas, el IRPF, la reconstrucción de las
+curvas "sin costes" (_curvas_por_coste), los prefijos por horizonte, la
+cartera de NUM_ACTIVOS_CARTERA activos y los estudios completos (ventanas
+móviles y barrido) sobre series sintéticas de
+1k, 10k y 100k sesiones (paseo aleatorio geométrico con semilla fija) y,
+opcionalmente, sobre las series de un directorio de ficheros (ProveedorFicheros).
+
+Ejemplos:
+    python -m lump_sum.benchmark --salida base.json
+    python -m lump_sum.benchmark --salida actual.json --comparar base.json --umbral 25
+
+El resultado es un JSON (commit, entorno y un registro por caso y serie con el
+mejor tiempo y la mediana de las repeticiones). Con --comparar se compara el
+mejor tiempo de cada caso con el de la referencia y el proceso termina con
+código 1 si alguno empeora más de --umbral %.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .calendario import indices_compra
+from .fiscalidad import calcular_impuestos_españa, calcular_impuestos_españa_array
+from .metricas import calcular_metricas, calcular_max_drawdown
+from .simulacion import (
+    _curvas_por_coste,
+    simular_lump_sum,
+    simular_dca_capital_disponible,
+    simular_dca_aportacion_periodica,
+)
+from .horizontes import PrefijosSimulacion
+from .cartera import simular_cartera_lump_sum, simular_cartera_dca
+from .estudios import estudio_ventanas_moviles, barrido_parametros
+from .proveedores import ProveedorFicheros
+
+
+TAMAÑOS = (1_000, 10_000, 100_000)
+SEMILLA = 42
+# El motor 'bucle' es la referencia día a día: con series largas solo alarga el benchmark
+MAX_DIAS_BUCLE = 10_000
+# Por debajo de esta diferencia absoluta (s) no se considera regresión: es ruido del reloj
+TOLERANCIA_S = 0.001
+# Activos de la cartera sintética (la serie por un ruido propio de cada activo)
+NUM_ACTIVOS_CARTERA = 10
+
+PARAMETROS = {
+    'capital': 100_000,
+    'aportacion_mensual': 1_000,
+    'meses_dca': 12,
+    'comision': 0.001,
+    'slippage': 0.0005,
+    'tasa_monetario': 0.035,
+    'horizonte_estudios': 10 * 252,
+}
+
+
+def serie_sintetica(n_dias: int, semilla: int = SEMILLA, inicio: str = '1850-01-01') -> pd.Series:
+    """
+    Precios de un paseo aleatorio geométrico (7% anual, 18% de volatilidad) en días laborables.
+
+    Es también la serie de las pruebas (tests/conftest.py), que fijan otra semilla e inicio.
+    """
+    rng = np.random.default_rng(semilla)
+    retornos = rng.normal(0.07 / 252, 0.18 / np.sqrt(252), n_dias - 1)
+    valores = 100 * np.exp(np.concatenate(([0.0], np.cumsum(retornos))))
+    # 1850: 100k sesiones laborables caben antes del límite de pd.Timestamp
+    return pd.Series(valores, index=pd.bdate_range(inicio, periods=n_dias), name='Close')
+
+
+def casos(precios: pd.Series) -> dict:
+    """Funciones sin argumentos a cronometrar sobre precios, por nombre de caso."""
+    p = PARAMETROS
+    coste = p['comision'] + p['slippage']
+    n_dias = len(precios)
+    horizonte = min(p['horizonte_estudios'], n_dias // 2)
+    indices = indices_compra(precios.index, p['meses_dca'], 'primer_dia_mes')
+    curva_ls = simular_lump_sum(precios, p['capital'], p['comision'], p['slippage'])['valores']
+    valores_ls = curva_ls.to_numpy()
+    años = (precios.index[-1] - precios.index[0]).days / 365.25
+    plusvalias = np.linspace(-50_000, 500_000, n_dias)
+    prefijos = PrefijosSimulacion.dca_capital_disponible(
+        precios, p['capital'], p['meses_dca'], p['comision'], p['slippage'], p['tasa_monetario']
+    )
+    ruido = np.random.default_rng(SEMILLA).normal(0.0, 0.005, (n_dias, NUM_ACTIVOS_CARTERA))
+    cartera = pd.DataFrame(precios.to_numpy()[:, None] * np.exp(np.cumsum(ruido, axis=0)), index=precios.index)
+    pesos = np.ones(NUM_ACTIVOS_CARTERA)
+    
+    funciones = {
+        'simular_lump_sum': lambda: simular_lump_sum(precios, p['capital'], p['comision'], p['slippage']),
+        'simular_dca_capital_disponible': lambda: simular_dca_capital_disponible(
+            precios, p['capital'], p['meses_dca'], p['comision'], p['slippage'], p['tasa_monetario']
+        ),
+        'simular_dca_capital_disponible_bucle': lambda: simular_dca_capital_disponible(
+            precios, p['capital'], p['meses_dca'], p['comision'], p['slippage'], p['tasa_monetario'], motor='bucle'
+        ),
+        'simular_dca_aportacion_periodica': lambda: simular_dca_aportacion_periodica(
+            precios, p['aportacion_mensual'], p['meses_dca'], p['comision'], p['slippage']
+        ),
+        'simular_cartera_lump_sum': lambda: simular_cartera_lump_sum(
+            cartera, pesos, p['capital'], p['comision'], p['slippage'], 'periodico:12'
+        ),
+        'simular_cartera_dca': lambda: simular_cartera_dca(
+            cartera, pesos, p['capital'], p['meses_dca'], p['comision'], p['slippage'], p['tasa_monetario'],
+            rebalanceo='periodico:12'
+        ),
+        'calcular_metricas': lambda: calcular_metricas(valores_ls, años, p['capital'], valores_ls[-1]),
+        'calcular_max_drawdown': lambda: calcular_max_drawdown(curva_ls),
+        # Una llamada por plusvalía (como los simuladores) frente a la versión vectorizada
+        'calcular_impuestos_españa': lambda: [calcular_impuestos_españa(x) for x in plusvalias],
+        'calcular_impuestos_españa_array': lambda: calcular_impuestos_españa_array(plusvalias),
+        'curvas_sin_costes': lambda: _curvas_por_coste(
+            precios, indices, p['capital'] / p['meses_dca'], (0.0, coste)
+        ),
+        'prefijos_construccion': lambda: PrefijosSimulacion.dca_capital_disponible(
+            precios, p['capital'], p['meses_dca'], p['comision'], p['slippage'], p['tasa_monetario']
+        ),
+        'prefijos_consulta': lambda: prefijos.resultado(horizonte),
+        'estudio_ventanas_moviles': lambda: estudio_ventanas_moviles(
+            precios, horizonte, p['capital'], p['meses_dca'], p['comision'], p['slippage'], p['tasa_monetario']
+        ),
+        'barrido_parametros': lambda: barrido_parametros(
+            precios, horizonte, p['capital'], [6, 12, 24], [0.0, 0.001], [0.0, 0.0005],
+            tasa_monetario=p['tasa_monetario']
+        ),
+    }
+    if n_dias > MAX_DIAS_BUCLE:
+        del funciones['simular_dca_capital_disponible_bucle']
+    return funciones
+
+
+def cronometrar(funcion, repeticiones: int = 5, tiempo_max: float = 10.0) -> dict:
+    """
+    Mejor tiempo, mediana y media (s) de hasta repeticiones llamadas tras una de calentamiento.
+    
+    Se para antes si las llamadas ya suman tiempo_max segundos (siempre al menos una).
+    """
+    funcion()
+    tiempos = []
+    while len(tiempos) < repeticiones and (not tiempos or sum(tiempos) < tiempo_max):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return {
+        'min_s': min(tiempos),
+        'mediana_s': float(np.median(tiempos)),
+        'media_s': float(np.mean(tiempos)),
+        'repeticiones': len(tiempos),
+    }
+
+
+def _commit() -> str | None:
+    """Commit de git del código medido (None fuera de un repositorio)."""
+    try:
+        salida = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(__file__).parent,
+            capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return salida.stdout.strip() or None
+
+
+def _entorno() -> dict:
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'plataforma': platform.platform(),
+        'procesadores': os.cpu_count(),
+    }
+
+
+def ejecutar_benchmarks(
+    series: dict,
+    filtro: list = None,
+    repeticiones: int = 5,
+    tiempo_max: float = 10.0,
+    progreso=None
+) -> dict:
+    """
+    Cronometra todos los casos (o los que contienen alguno de los textos de filtro) sobre cada serie.
+    
+    series: {nombre: pd.Series}. progreso(registro) se llama tras cada caso.
+    Devuelve {'commit', 'fecha', 'entorno', 'parametros', 'resultados': [registro...]}
+    con un registro {'caso', 'serie', 'dias', 'min_s', 'mediana_s', 'media_s', 'repeticiones'} por medida.
+    """
+    resultados = []
+    # Las series sintéticas largas abarcan siglos: el desbordamiento en la TIR es esperado
+    with np.errstate(over='ignore', invalid='ignore'):
+        for nombre_serie, precios in series.items():
+            for caso, funcion in casos(precios).items():
+                if filtro and not any(texto in caso for texto in filtro):
+                    continue
+                registro = {'caso': caso, 'serie': nombre_serie, 'dias': len(precios)}
+                registro.update(cronometrar(funcion, repeticiones, tiempo_max))
+                resultados.append(registro)
+                if progreso is not None:
+                    progreso(registro)
+    
+    return {
+        'commit': _commit(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'entorno': _entorno(),
+        'parametros': PARAMETROS,
+        'resultados': resultados,
+    }
+
+
+def comparar(base: dict, actual: dict, umbral: float = 25.0) -> list:
+    """
+    Compara el mejor tiempo de cada (caso, serie) presente en ambos informes.
+    
+    Devuelve un registro por caso con base_s, actual_s, variacion (%) y
+    regresion (True si empeora más de umbral % y más de TOLERANCIA_S).
+    """
+    referencia = {(r['caso'], r['serie']): r['min_s'] for r in base['resultados']}
+    comparacion = []
+    for registro in actual['resultados']:
+        clave = (registro['caso'], registro['serie'])
+        if clave not in referencia:
+            continue
+        base_s = referencia[clave]
+        actual_s = registro['min_s']
+        variacion = (actual_s / base_s - 1) * 100 if base_s > 0 else 0.0
+        comparacion.append({
+            'caso': registro['caso'],
+            'serie': registro['serie'],
+            'base_s': base_s,
+            'actual_s': actual_s,
+            'variacion': variacion,
+            'regresion': variacion > umbral and actual_s - base_s > TOLERANCIA_S,
+        })
+    return comparacion
+
+
+def _series(args) -> dict:
+    series = {f"sintetica_{n}": serie_sintetica(n) for n in args.tamaños}
+    if args.ficheros:
+        proveedor = ProveedorFicheros(args.ficheros)
+        tickers = args.tickers or sorted({
+            ruta.stem for ruta in Path(args.ficheros).iterdir() if ruta.suffix in ('.csv', '.parquet')
+        })
+        for ticker in tickers:
+            series[f"fichero_{ticker.upper()}"] = proveedor.precios(ticker)
+    return series
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m lump_sum.benchmark',
+        description='Benchmarks offline de simuladores, métricas, IRPF y estudios.'
+    )
+    parser.add_argument('--tamaños', nargs='+', type=int, default=list(TAMAÑOS), help='Sesiones de las series sintéticas')
+    parser.add_argument('--ficheros', help='Directorio con series de referencia (<TICKER>.csv|.parquet)')
+    parser.add_argument('--tickers', nargs='+', help='Tickers del directorio a medir (por defecto, todos)')
+    parser.add_argument('--casos', nargs='+', help='Solo los casos que contienen alguno de estos textos')
+    parser.add_argument('--repeticiones', type=int, default=5, help='Repeticiones por caso (tras una de calentamiento)')
+    parser.add_argument('--tiempo-max', type=float, default=10.0, help='Segundos máximos por caso antes de dejar de repetir')
+    parser.add_argument('--salida', help='Fichero JSON de resultados (por defecto, salida estándar)')
+    parser.add_argument('--comparar', help='JSON de referencia con el que comparar')
+    parser.add_argument('--umbral', type=float, default=25.0, help='Empeoramiento máximo admitido en %% (con --comparar)')
+    return parser
+
+
+def main(argv: list = None) -> int:
+    args = _parser().parse_args(argv)
+    
+    def progreso(registro):
+        print(
+            f"{registro['caso']:<40} {registro['serie']:<20} "
+            f"{registro['min_s'] * 1000:>10.2f} ms  (mediana {registro['mediana_s'] * 1000:.2f} ms, "
+            f"{registro['repeticiones']} rep.)",
+            file=sys.stderr
+        )
+    
+    informe = ejecutar_benchmarks(_series(args), args.casos, args.repeticiones, args.tiempo_max, progreso)
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        Path(args.salida).write_text(texto, encoding='utf-8')
+    else:
+        print(texto)
+    
+    if not args.comparar:
+        return 0
+    base = json.loads(Path(args.comparar).read_text(encoding='utf-8'))
+    comparacion = comparar(base, informe, args.umbral)
+    print(f"\nComparación con {base.get('commit') or args.comparar} (umbral {args.umbral:.0f}%):", file=sys.stderr)
+    for fila in comparacion:
+        marca = 'REGRESIÓN' if fila['regresion'] else ''
+        print(
+            f"{fila['caso']:<40} {fila['serie']:<20} {fila['base_s'] * 1000:>10.2f} ms -> "
+            f"{fila['actual_s'] * 1000:>10.2f} ms  {fila['variacion']:+7.1f}%  {marca}",
+            file=sys.stderr
+        )
+    regresiones = sum(fila['regresion'] for fila in comparacion)
+    if regresiones:
+        print(f"{regresiones} caso(s) más lentos que la referencia", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
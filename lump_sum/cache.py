@@ -0,0 +1,78 @@
+"""
+Caché LRU en memoria para resultados de simulación.
+
+Streamlit vuelve a ejecutar todo el script con cada interacción; con esta caché
+los cambios puramente visuales (vista del gráfico, curvas sin costes...) no
+repiten las simulaciones. Tamaño acotado y expulsión del menos usado; varias
+peticiones simultáneas de la misma clave calculan una sola vez.
+
+Los resultados se devuelven por referencia: no deben modificarse. Cada consulta
+anota en la etapa de instrumentación abierta si fue acierto, fallo o espera.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from .coalescencia import UnVuelo
+from .instrumentacion import anotar
+
+
+class CacheLRU:
+    """Caché acotada con expulsión LRU y estadísticas de aciertos y fallos."""
+    
+    def __init__(self, max_entradas: int = 128):
+        if max_entradas < 1:
+            raise ValueError("max_entradas debe ser al menos 1")
+        self.max_entradas = max_entradas
+        self._entradas: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._vuelos = UnVuelo()
+        self._estadisticas = {'aciertos': 0, 'fallos': 0, 'esperas_coalescidas': 0, 'expulsiones': 0}
+    
+    def obtener_o_calcular(self, clave, funcion, *args, **kwargs):
+        """Devuelve el resultado guardado para la clave o lo calcula con funcion(*args, **kwargs)."""
+        with self._lock:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self._estadisticas['aciertos'] += 1
+                anotar(cache='acierto')
+                return self._entradas[clave]
+        
+        resultado, compartido = self._vuelos.ejecutar(clave, funcion, *args, **kwargs)
+        
+        with self._lock:
+            # Quien espera a un cálculo en curso de la misma clave no cuenta como fallo
+            self._estadisticas['esperas_coalescidas' if compartido else 'fallos'] += 1
+            self._entradas[clave] = resultado
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self._estadisticas['expulsiones'] += 1
+        anotar(cache='espera' if compartido else 'fallo')
+        return resultado
+    
+    def limpiar(self):
+        """Vacía la caché (las estadísticas se conservan)."""
+        with self._lock:
+            self._entradas.clear()
+    
+    def estadisticas(self) -> dict:
+        """Aciertos, fallos, expulsiones, tasa de aciertos (%) y ocupación."""
+        with self._lock:
+            estadisticas = dict(self._estadisticas)
+            estadisticas['entradas'] = len(self._entradas)
+        estadisticas['max_entradas'] = self.max_entradas
+        consultas = estadisticas['aciertos'] + estadisticas['fallos'] + estadisticas['esperas_coalescidas']
+        estadisticas['tasa_aciertos'] = estadisticas['aciertos'] / consultas * 100 if consultas else 0.0
+        return estadisticas
+
+
+def huella_serie(serie: pd.Series) -> str:
+    """Versión de una serie de precios: cambia si cambia cualquier fecha o valor."""
+    huella = hashlib.blake2b(digest_size=16)
+    huella.update(serie.index.asi8.tobytes())
+    huella.update(serie.to_numpy(dtype=float).tobytes())
+    return huella.hexdigest()
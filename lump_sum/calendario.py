@@ -0,0 +1,107 @@
+"""
+Calendario de aportaciones sobre sesiones de mercado.
+
+Traduce una regla de calendario a posiciones en el índice de precios, con
+searchsorted sobre todas las ventanas a la vez. Las reglas se escriben como
+texto, igual que los proveedores ('nombre' o 'nombre:argumento'):
+
+- 'primer_dia_mes': primera compra el día de inicio y después la primera
+  sesión de cada mes.
+- 'ultimo_dia_mes': última sesión de cada mes, empezando por el mes de inicio.
+- 'semanal:N': cada N semanas desde el inicio (por defecto N = 1).
+- 'dia_mes:D': día D de cada mes (o la siguiente sesión si es festivo), desde
+  la primera vez que cae en o después del inicio. D > días del mes = último día.
+
+Si la fecha objetivo no tiene sesión se compra en la siguiente; las compras que
+caen fuera de la serie se descartan.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+REGLAS_CALENDARIO = ('primer_dia_mes', 'ultimo_dia_mes', 'semanal', 'dia_mes')
+
+
+def interpretar_regla(regla: str) -> tuple[str, int]:
+    """Separa 'nombre:argumento' y valida la regla. Devuelve (nombre, argumento)."""
+    nombre, _, argumento = regla.partition(':')
+    if nombre not in REGLAS_CALENDARIO:
+        raise ValueError(f"Regla de calendario desconocida: {regla!r}. Opciones: {list(REGLAS_CALENDARIO)}")
+    if nombre in ('primer_dia_mes', 'ultimo_dia_mes'):
+        if argumento:
+            raise ValueError(f"La regla {nombre!r} no admite argumento")
+        return nombre, 0
+    try:
+        valor = int(argumento) if argumento else 1
+    except ValueError:
+        raise ValueError(f"Argumento no entero en la regla {regla!r}") from None
+    limite = 31 if nombre == 'dia_mes' else None
+    if valor < 1 or (limite is not None and valor > limite):
+        raise ValueError(f"Argumento fuera de rango en la regla {regla!r}")
+    return nombre, valor
+
+
+def regla_por_momento(aportacion_inicio_mes: bool) -> str:
+    """Regla equivalente al antiguo parámetro aportacion_inicio_mes."""
+    return 'primer_dia_mes' if aportacion_inicio_mes else 'ultimo_dia_mes'
+
+
+def num_aportaciones(meses: int, regla: str) -> int:
+    """Número de aportaciones que la regla hace en 'meses' meses."""
+    nombre, cada_semanas = interpretar_regla(regla)
+    if nombre != 'semanal':
+        return int(meses)
+    return max(1, round(meses * 52 / 12 / cada_semanas))
+
+
+def posiciones_compra(
+    fechas: pd.DatetimeIndex,
+    inicios: np.ndarray,
+    num_compras: int,
+    regla: str,
+    fines: np.ndarray = None
+) -> np.ndarray:
+    """
+    Posiciones absolutas en fechas de las compras de cada ventana.
+    
+    Devuelve un array (len(inicios), num_compras) de enteros crecientes por fila.
+    Las compras posteriores al fin de su ventana (fines, por defecto la última
+    sesión) valen len(fechas). Una compra de 'ultimo_dia_mes' solo es válida si
+    la ventana llega al mes siguiente: sin él no se sabe si el mes ha terminado.
+    """
+    nombre, argumento = interpretar_regla(regla)
+    dias = np.asarray(fechas.values, dtype='datetime64[D]')
+    inicios = np.asarray(inicios, dtype=np.int64)
+    fines = np.full(len(inicios), len(dias) - 1) if fines is None else np.asarray(fines, dtype=np.int64)
+    dia_inicio = dias[inicios][:, None]
+    k = np.arange(num_compras)[None, :]
+    mes_inicio = dia_inicio.astype('datetime64[M]')
+    confirmacion = None
+    
+    if nombre == 'semanal':
+        posiciones = np.searchsorted(dias, dia_inicio + k * 7 * argumento, side='left')
+    elif nombre == 'primer_dia_mes':
+        posiciones = np.searchsorted(dias, (mes_inicio + k).astype('datetime64[D]'), side='left')
+        posiciones[:, 0] = inicios
+    elif nombre == 'ultimo_dia_mes':
+        # Última sesión antes de la primera sesión del mes siguiente
+        confirmacion = np.searchsorted(dias, (mes_inicio + k + 1).astype('datetime64[D]'), side='left')
+        posiciones = confirmacion - 1
+    else:
+        # dia_mes: si el día ya ha pasado en el mes de inicio se empieza el mes siguiente
+        def dia_objetivo(mes):
+            dias_mes = ((mes + 1).astype('datetime64[D]') - mes.astype('datetime64[D]')).astype(np.int64)
+            return mes.astype('datetime64[D]') + (np.minimum(argumento, dias_mes) - 1)
+        
+        mes_primera = mes_inicio + (dia_objetivo(mes_inicio) < dia_inicio).astype(np.int64)
+        posiciones = np.searchsorted(dias, dia_objetivo(mes_primera + k), side='left')
+    
+    ultima_valida = posiciones if confirmacion is None else confirmacion
+    return np.where(ultima_valida <= fines[:, None], posiciones, len(dias))
+
+
+def indices_compra(fechas: pd.DatetimeIndex, num_compras: int, regla: str) -> np.ndarray:
+    """Posiciones de compra dentro de una única serie que empieza en fechas[0]."""
+    posiciones = posiciones_compra(fechas, np.array([0]), num_compras, regla)[0]
+    return posiciones[posiciones < len(fechas)]
@@ -0,0 +1,518 @@
+"""
+LS vs DCA sobre una cartera de varios activos con pesos objetivo y rebalanceo.
+
+precios es una matriz alineada (días × activos, un DataFrame sin huecos). Las
+participaciones de la cartera solo cambian en los eventos (aportaciones y
+rebalanceos): cada evento es una fila de las matrices eventos × activos de
+compras y ventas, y las participaciones diarias salen de ellas con
+searchsorted, como en los simuladores de un activo. Solo se recorren los
+eventos; lo que es por activo (repartos, valores, coste FIFO de cada venta)
+son operaciones sobre matrices.
+
+Costes e IRPF como en los simuladores de un activo: comisión y slippage sobre
+cada compra y venta, lotes FIFO por activo y tramos del ahorro. Las ventas de
+los rebalanceos tributan en su año (ganancias y pérdidas de todos los activos
+se compensan dentro del año y las pérdidas netas, con las ganancias de los
+cuatro años siguientes); los impuestos se descuentan del valor final, sin
+retirar efectivo de la cartera. Reglas de rebalanceo (texto, como las de
+lump_sum.calendario):
+
+- 'nunca': cada aportación se reparte según los pesos objetivo.
+- 'aportaciones': cada aportación va a los activos infraponderados, sin
+  ventas (no genera ganancias hasta la venta final).
+- 'periodico:N': vuelta a los pesos objetivo cada N meses (por defecto 12), en
+  la primera sesión del mes.
+- 'umbral:P': vuelta a los pesos objetivo al cierre del primer día en que un
+  peso se separa más de P puntos porcentuales del objetivo (por defecto 5).
+"""
+
+import numpy as np
+import pandas as pd
+
+from .calendario import indices_compra as calcular_indices_compra, posiciones_compra, regla_por_momento
+from .fiscalidad import calcular_impuestos_españa
+from .metricas import calcular_metricas, calcular_twr
+from .simulacion import _drawdown_post_dca, _efectivo_pendiente, _tir_aportaciones
+
+
+REGLAS_REBALANCEO = ('nunca', 'aportaciones', 'periodico', 'umbral')
+MODOS_DCA = ('capital_disponible', 'aportacion_periodica')
+
+# Sesiones que se revisan de una vez en busca de un peso fuera de la banda (regla 'umbral')
+VENTANA_UMBRAL = 252
+
+# Años en los que una pérdida patrimonial neta compensa ganancias posteriores
+AÑOS_COMPENSACION = 4
+
+
+def interpretar_rebalanceo(regla: str) -> tuple[str, float]:
+    """Separa 'nombre:argumento' y valida la regla. Devuelve (nombre, argumento)."""
+    nombre, _, argumento = regla.partition(':')
+    if nombre not in REGLAS_REBALANCEO:
+        raise ValueError(f"Regla de rebalanceo desconocida: {regla!r}. Opciones: {list(REGLAS_REBALANCEO)}")
+    if nombre in ('nunca', 'aportaciones'):
+        if argumento:
+            raise ValueError(f"La regla {nombre!r} no admite argumento")
+        return nombre, 0
+    try:
+        valor = (int if nombre == 'periodico' else float)(argumento) if argumento else (12 if nombre == 'periodico' else 5.0)
+    except ValueError:
+        raise ValueError(f"Argumento no válido en la regla {regla!r}") from None
+    if valor <= 0 or (nombre == 'umbral' and valor >= 100):
+        raise ValueError(f"Argumento fuera de rango en la regla {regla!r}")
+    return nombre, valor
+
+
+def _matriz_precios(precios: pd.DataFrame, pesos) -> tuple[np.ndarray, np.ndarray]:
+    """Precios (días × activos) y pesos objetivo normalizados; lanza ValueError si no son válidos."""
+    if not isinstance(precios, pd.DataFrame) or precios.shape[1] == 0 or len(precios) < 2:
+        raise ValueError("precios debe ser un DataFrame con al menos un activo y dos sesiones")
+    valores_precio = precios.to_numpy(dtype=float)
+    if not np.isfinite(valores_precio).all() or (valores_precio <= 0).any():
+        raise ValueError("Precios con huecos o no positivos: alinear los activos (p. ej. dropna) antes de simular")
+    
+    if isinstance(pesos, dict):
+        desconocidos = set(pesos) - set(precios.columns)
+        if desconocidos:
+            raise ValueError(f"Pesos de activos sin precios: {sorted(desconocidos)}")
+        pesos = [pesos.get(activo, 0.0) for activo in precios.columns]
+    pesos = np.asarray(pesos, dtype=float)
+    if pesos.shape != (precios.shape[1],):
+        raise ValueError(f"Hacen falta {precios.shape[1]} pesos (uno por activo), hay {pesos.size}")
+    if (pesos < 0).any() or pesos.sum() <= 0:
+        raise ValueError("Los pesos deben ser no negativos y sumar más que 0")
+    return valores_precio, pesos / pesos.sum()
+
+
+def _dias_rebalanceo(fechas: pd.DatetimeIndex, cada_meses: int) -> np.ndarray:
+    """Primera sesión de cada N meses desde el inicio (sin el primer ni el último día)."""
+    meses = (fechas[-1].year - fechas[0].year) * 12 + fechas[-1].month - fechas[0].month
+    posiciones = posiciones_compra(fechas, np.array([0]), meses + 1, 'primer_dia_mes')[0][cada_meses::cada_meses]
+    return posiciones[posiciones < len(fechas) - 1]
+
+
+def _reparto_aportaciones(
+    participaciones: np.ndarray, precios: np.ndarray, pesos: np.ndarray, aportacion: float, hacia_objetivo: bool
+) -> np.ndarray:
+    """
+    Importe que va a cada activo en cada aportación (aportaciones × activos, una por fila de precios).
+    
+    Por pesos o, con hacia_objetivo (una sola aportación), a los activos infraponderados.
+    """
+    if not hacia_objetivo or not participaciones.any():
+        return pesos * np.full((len(precios), 1), aportacion)
+    valor = participaciones * precios
+    # Lo que falta a cada activo para su peso tras la aportación (suma al menos la aportación)
+    deficit = np.maximum(pesos * (valor.sum() + aportacion) - valor, 0.0)
+    return aportacion * deficit / deficit.sum()
+
+
+def _ordenes_rebalanceo(
+    participaciones: np.ndarray, precio: np.ndarray, pesos: np.ndarray, coste: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Importes de compra y de venta (brutos) para volver a los pesos; las compras se pagan con las ventas netas."""
+    valor = participaciones * precio
+    objetivo = pesos * valor.sum()
+    ventas = np.maximum(valor - objetivo, 0.0)
+    compras = np.maximum(objetivo - valor, 0.0)
+    total_ventas = ventas.sum()
+    if compras.sum() > 0:
+        compras = compras * ((total_ventas - total_ventas * coste) / compras.sum())
+    return compras, ventas
+
+
+def _impuestos_anuales(años: np.ndarray, ganancias: np.ndarray) -> tuple[dict, float, dict]:
+    """
+    IRPF de cada año sobre la suma de sus ganancias (una por venta, ya netas entre activos).
+    
+    Las pérdidas netas de un año compensan, de la más antigua a la más reciente,
+    las ganancias de los AÑOS_COMPENSACION siguientes. Devuelve
+    ({año: impuesto}, impuesto total, desglose por tramo sumado de todos los años).
+    """
+    años_venta, posicion = np.unique(años, return_inverse=True)
+    netas = np.zeros(len(años_venta))
+    np.add.at(netas, posicion, ganancias)
+    
+    impuestos_por_año = {}
+    desglose = {}
+    pendientes = []  # [año, pérdida por compensar]
+    for año, base in zip(años_venta.tolist(), netas.tolist()):
+        pendientes = [p for p in pendientes if año - p[0] <= AÑOS_COMPENSACION and p[1] > 0]
+        if base < 0:
+            pendientes.append([año, -base])
+            base = 0.0
+        else:
+            for perdida in pendientes:
+                compensada = min(base, perdida[1])
+                base -= compensada
+                perdida[1] -= compensada
+        impuesto, desglose_año = calcular_impuestos_españa(base)
+        impuestos_por_año[año] = impuesto
+        for tramo, valores in desglose_año.items():
+            acumulado = desglose.setdefault(tramo, {'base': 0.0, 'impuesto': 0.0})
+            acumulado['base'] += valores['base']
+            acumulado['impuesto'] += valores['impuesto']
+    return impuestos_por_año, float(sum(impuestos_por_año.values())), desglose
+
+
+def _simular_cartera(
+    valores_precio: np.ndarray,
+    fechas: pd.DatetimeIndex,
+    pesos: np.ndarray,
+    indices_aportacion: list,
+    aportacion: float,
+    comision: float,
+    slippage: float,
+    rebalanceo: str
+) -> dict:
+    """
+    Núcleo común: aportaciones, rebalanceos, venta de todo el último día e IRPF.
+    
+    Devuelve las matrices días × activos de participaciones y valores, y los
+    totales de costes, venta final, plusvalías e impuestos del activo.
+    """
+    nombre, argumento = interpretar_rebalanceo(rebalanceo)
+    n_dias, n_activos = valores_precio.shape
+    coste = comision + slippage
+    indices_aportacion = np.asarray(indices_aportacion, dtype=np.int64)
+    programados = _dias_rebalanceo(fechas, argumento) if nombre == 'periodico' else np.empty(0, dtype=np.int64)
+    umbral = argumento / 100 if nombre == 'umbral' else None
+    
+    participaciones = np.zeros(n_activos)
+    num_rebalanceos = 0
+    sin_eventos = np.empty((0, n_activos))
+    dias_evento = [np.empty(0, dtype=np.int64)]
+    importes_compra, compradas, importes_venta, vendidas, tras_evento = ([sin_eventos] for _ in range(5))
+    
+    def registrar(dias, compra, nuevas, venta, salen, tras):
+        nonlocal participaciones
+        dias_evento.append(dias)
+        importes_compra.append(compra)
+        compradas.append(nuevas)
+        importes_venta.append(venta)
+        vendidas.append(salen)
+        tras_evento.append(tras)
+        participaciones = tras[-1]
+    
+    def rebalancear(dia: int):
+        nonlocal num_rebalanceos
+        num_rebalanceos += 1
+        precio = valores_precio[dia]
+        compra, venta = _ordenes_rebalanceo(participaciones, precio, pesos, coste)
+        nuevas = (compra - compra * coste) / precio
+        salen = np.minimum(venta / precio, participaciones)
+        tras = participaciones - salen + nuevas
+        registrar(np.array([dia]), compra[None], nuevas[None], (salen * precio)[None], salen[None], tras[None])
+    
+    # Se avanza por bloques: las aportaciones hasta el próximo rebalanceo (o hasta VENTANA_UMBRAL
+    # sesiones con la regla 'umbral') se compran de una vez; con 'aportaciones', de una en una
+    i_aportacion = i_programado = 0
+    desde = 0
+    while True:
+        fin = programados[i_programado] if i_programado < len(programados) else n_dias - 1
+        corte = min(fin, desde + VENTANA_UMBRAL) if umbral is not None else fin
+        j = np.searchsorted(indices_aportacion, corte, side='right')
+        if nombre == 'aportaciones':
+            j = min(j, i_aportacion + 1)
+        dias = indices_aportacion[i_aportacion:j]
+        compra = nuevas = tras = sin_eventos
+        if len(dias):
+            precios = valores_precio[dias]
+            compra = _reparto_aportaciones(participaciones, precios, pesos, aportacion, nombre == 'aportaciones')
+            nuevas = (compra - compra * coste) / precios
+            tras = participaciones + np.cumsum(nuevas, axis=0)
+        
+        if umbral is not None and desde < corte:
+            # Pesos al cierre de cada sesión del bloque: primera que se sale de la banda
+            tras_dia = np.vstack((participaciones[None], tras))[np.searchsorted(dias, np.arange(desde, corte), side='right')]
+            valor = tras_dia * valores_precio[desde:corte]
+            total = valor.sum(axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                fuera = (total > 0) & (np.abs(valor / total[:, None] - pesos).max(axis=1) > umbral)
+            if fuera.any():
+                dia = desde + int(np.argmax(fuera))
+                k = np.searchsorted(dias, dia, side='right')
+                if k:
+                    sin_venta = np.zeros_like(nuevas[:k])
+                    registrar(dias[:k], compra[:k], nuevas[:k], sin_venta, sin_venta, tras[:k])
+                i_aportacion += k
+                rebalancear(dia)
+                desde = dia + 1
+                continue
+        
+        if len(dias):
+            sin_venta = np.zeros_like(nuevas)
+            registrar(dias, compra, nuevas, sin_venta, sin_venta, tras)
+        i_aportacion = j
+        if corte < fin or (nombre == 'aportaciones' and i_aportacion < len(indices_aportacion)):
+            desde = corte
+            continue
+        if i_programado == len(programados):
+            break
+        rebalancear(fin)
+        i_programado += 1
+        desde = fin + 1
+    
+    dias_evento = np.concatenate(dias_evento)
+    importes_compra = np.vstack(importes_compra)
+    compradas = np.vstack(compradas)
+    importes_venta = np.vstack(importes_venta)
+    vendidas = np.vstack(vendidas)
+    
+    # Participaciones y valor de cada activo cada día (fila 0 = antes del primer evento)
+    tras_k = np.vstack((np.zeros((1, n_activos)), np.vstack(tras_evento)))
+    participaciones_diarias = tras_k[np.searchsorted(dias_evento, np.arange(n_dias), side='right')]
+    valores_activos = participaciones_diarias * valores_precio
+    
+    # VENTAS: las de los rebalanceos y la de todo el último día
+    con_venta = vendidas.any(axis=1)
+    dias_venta = np.append(dias_evento[con_venta], n_dias - 1)
+    participaciones_venta = np.vstack((vendidas[con_venta], participaciones))
+    importe_bruto = np.vstack((importes_venta[con_venta], participaciones * valores_precio[-1]))
+    importe_neto = importe_bruto - importe_bruto * coste
+    
+    # Coste FIFO: el coste de lo vendido hasta un momento es lineal a trozos en las participaciones
+    # vendidas acumuladas (un tramo por lote), así que cada venta es una diferencia de interpolaciones
+    cero = np.zeros((1, n_activos))
+    fin_lote = np.vstack((cero, np.cumsum(compradas, axis=0)))
+    coste_lotes = np.vstack((cero, np.cumsum(importes_compra, axis=0)))
+    vendidas_acumuladas = np.vstack((cero, np.cumsum(participaciones_venta, axis=0)))
+    coste_vendido = np.column_stack([
+        np.interp(vendidas_acumuladas[:, a], fin_lote[:, a], coste_lotes[:, a]) for a in range(n_activos)
+    ])
+    ganancias = importe_neto - np.diff(coste_vendido, axis=0)
+    
+    impuestos_por_año, impuestos, desglose = _impuestos_anuales(fechas[dias_venta].year.to_numpy(), ganancias.sum(axis=1))
+    
+    valor_final = valores_activos[-1]
+    activos = pd.DataFrame({
+        'peso_objetivo': pesos,
+        'peso_final': valor_final / valor_final.sum() if valor_final.sum() > 0 else 0.0,
+        'valor_final': valor_final,
+        'invertido': importes_compra.sum(axis=0),
+        'vendido_rebalanceos': importe_bruto[:-1].sum(axis=0),
+        'plusvalia': ganancias.sum(axis=0),
+        'costes_transaccion': (importes_compra.sum(axis=0) + importe_bruto.sum(axis=0)) * coste,
+    })
+    compras_totales = float(importes_compra.sum())
+    ventas_totales = float(importe_bruto.sum())
+    return {
+        'valores_activos': valores_activos,
+        'valor_bruto': float(importe_bruto[-1].sum()),
+        'valor_tras_venta': float(importe_neto[-1].sum()),
+        'plusvalia': float(ganancias.sum()),
+        'impuestos': impuestos,
+        'impuestos_por_año': impuestos_por_año,
+        'desglose_impuestos': desglose,
+        'comision_compra': compras_totales * comision,
+        'slippage_compra': compras_totales * slippage,
+        'comision_venta': ventas_totales * comision,
+        'slippage_venta': ventas_totales * slippage,
+        'num_operaciones': int(np.count_nonzero(compradas) + np.count_nonzero(participaciones_venta)),
+        'num_rebalanceos': num_rebalanceos,
+        'activos': activos,
+    }
+
+
+def _resultado_cartera(
+    precios: pd.DataFrame,
+    motor: dict,
+    valores: np.ndarray,
+    valor_neto: float,
+    capital_referencia: float,
+    capital_invertido: float,
+    impuestos_intereses: float,
+    intereses_monetario: float,
+    tir: float,
+    twr: float,
+    metricas: dict,
+    fechas_dd: tuple
+) -> dict:
+    """Diccionario de resultado con las mismas claves que los simuladores de un activo (y las de la cartera)."""
+    impuestos = motor['impuestos'] + impuestos_intereses
+    plusvalia = motor['plusvalia']
+    costes_transaccion = motor['comision_compra'] + motor['slippage_compra'] + motor['comision_venta'] + motor['slippage_venta']
+    max_dd, fecha_pico, fecha_valle = fechas_dd
+    return {
+        'valores': pd.Series(valores, index=precios.index),
+        'valores_activos': pd.DataFrame(motor['valores_activos'], index=precios.index, columns=precios.columns),
+        'valor_bruto': motor['valor_bruto'],
+        'valor_tras_venta': motor['valor_tras_venta'],
+        'valor_neto': valor_neto,
+        'rentabilidad': (valor_neto / capital_referencia - 1) * 100,
+        'cagr': metricas['cagr'],
+        'tir': tir,
+        'twr': twr,
+        'max_drawdown': max_dd,
+        'fecha_pico_dd': fecha_pico,
+        'fecha_valle_dd': fecha_valle,
+        'volatilidad': metricas['volatilidad'],
+        'sharpe': metricas['sharpe'],
+        'base_coste': capital_invertido,
+        'plusvalia': plusvalia,
+        'impuestos': impuestos,
+        'impuestos_activo': motor['impuestos'],
+        'impuestos_intereses': impuestos_intereses,
+        'impuestos_por_año': motor['impuestos_por_año'],
+        'desglose_impuestos': motor['desglose_impuestos'],
+        'tipo_efectivo': (motor['impuestos'] / plusvalia * 100) if plusvalia > 0 else 0,
+        'comision_compra': motor['comision_compra'],
+        'slippage_compra': motor['slippage_compra'],
+        'comision_venta': motor['comision_venta'],
+        'slippage_venta': motor['slippage_venta'],
+        'costes_transaccion': costes_transaccion,
+        'coste_total': costes_transaccion + impuestos,
+        'num_operaciones': motor['num_operaciones'],
+        'num_rebalanceos': motor['num_rebalanceos'],
+        'años': (precios.index[-1] - precios.index[0]).days / 365.25,
+        'intereses_monetario': intereses_monetario,
+        'capital_invertido': capital_invertido,
+        'activos': motor['activos'].set_axis(precios.columns),
+    }
+
+
+def simular_cartera_lump_sum(
+    precios: pd.DataFrame,
+    pesos,
+    capital: float,
+    comision: float,
+    slippage: float,
+    rebalanceo: str = 'nunca'
+) -> dict:
+    """
+    Lump Sum sobre una cartera: todo el capital el primer día, repartido según pesos.
+    
+    pesos: uno por columna de precios (lista o {activo: peso}; se normalizan a
+    suma 1). Devuelve las claves de simular_lump_sum (sin precio_medio ni
+    curvas_coste) más valores_activos (días × activos), activos (resumen por
+    activo), num_rebalanceos e impuestos_por_año.
+    """
+    valores_precio, pesos = _matriz_precios(precios, pesos)
+    motor = _simular_cartera(valores_precio, precios.index, pesos, [0], capital, comision, slippage, rebalanceo)
+    valores = motor['valores_activos'].sum(axis=1)
+    valor_neto = motor['valor_tras_venta'] - motor['impuestos']
+    
+    años = (precios.index[-1] - precios.index[0]).days / 365.25
+    metricas = calcular_metricas(valores, años, capital, valor_neto)
+    serie = pd.Series(valores, index=precios.index)
+    resultado = _resultado_cartera(
+        precios, motor, valores, valor_neto, capital, capital, 0, 0,
+        _tir_aportaciones(serie, [0], capital, valor_neto), calcular_twr(serie, [capital], [0]),
+        metricas, (metricas['max_drawdown'], precios.index[metricas['idx_pico']], precios.index[metricas['idx_valle']])
+    )
+    resultado['valores_solo_activo'] = resultado['valores']
+    resultado['capital_total_aportado'] = capital
+    resultado['rebalanceo'] = rebalanceo
+    return resultado
+
+
+def simular_cartera_dca(
+    precios: pd.DataFrame,
+    pesos,
+    capital: float,
+    meses_dca: int,
+    comision: float,
+    slippage: float,
+    tasa_monetario: float = 0.0,
+    modo: str = 'capital_disponible',
+    aportacion_mensual: float = None,
+    rebalanceo: str = 'nunca',
+    aportacion_inicio_mes: bool = True,
+    indices_compra: np.ndarray = None
+) -> dict:
+    """
+    DCA sobre una cartera: cada aportación se reparte entre los activos según la regla de rebalanceo.
+    
+    modo como en los simuladores de un activo: 'capital_disponible' (capital /
+    meses_dca por aportación; el cash pendiente rinde tasa_monetario) o
+    'aportacion_periodica' (aportacion_mensual, por defecto capital / meses_dca).
+    Drawdown y volatilidad, solo desde la última aportación. Claves como
+    simular_cartera_lump_sum más las de DCA (impuestos_activo, dias_dca...).
+    """
+    if modo not in MODOS_DCA:
+        raise ValueError(f"Modo DCA desconocido: {modo!r}. Opciones: {list(MODOS_DCA)}")
+    valores_precio, pesos = _matriz_precios(precios, pesos)
+    n_dias = len(precios)
+    
+    if indices_compra is None:
+        indices_compra = calcular_indices_compra(precios.index, meses_dca, regla_por_momento(aportacion_inicio_mes))
+    indices_compra = [int(i) for i in indices_compra[:meses_dca]]
+    num_compras = len(indices_compra)
+    ultimo_dia_dca = indices_compra[-1] if indices_compra else 0
+    disponible = modo == 'capital_disponible'
+    aportacion = capital / meses_dca if disponible or aportacion_mensual is None else aportacion_mensual
+    
+    motor = _simular_cartera(valores_precio, precios.index, pesos, indices_compra, aportacion, comision, slippage, rebalanceo)
+    valores_solo_activo = motor['valores_activos'].sum(axis=1)
+    capital_invertido = float(num_compras * aportacion)
+    
+    # Cash pendiente e intereses (solo con capital disponible)
+    if disponible:
+        pendiente, intereses = _efectivo_pendiente(n_dias, indices_compra, capital, aportacion, tasa_monetario / 252)
+        valores = valores_solo_activo + pendiente + intereses
+        intereses_monetario = intereses[-1]
+        impuestos_intereses, _ = calcular_impuestos_españa(intereses_monetario)
+        capital_referencia = capital
+    else:
+        valores = valores_solo_activo
+        intereses_monetario = 0
+        impuestos_intereses = 0
+        capital_referencia = capital_invertido
+    valor_neto = motor['valor_tras_venta'] + intereses_monetario - motor['impuestos'] - impuestos_intereses
+    
+    años = (precios.index[-1] - precios.index[0]).days / 365.25
+    valores_post_dca = valores_solo_activo[ultimo_dia_dca:]
+    metricas = calcular_metricas(valores_post_dca, años, capital_referencia, valor_neto)
+    serie_activo = pd.Series(valores_solo_activo, index=precios.index)
+    
+    # TIR de lo invertido en los activos (con capital disponible, sin el monetario, como en un activo)
+    valor_final_tir = motor['valor_tras_venta'] - motor['impuestos'] if disponible else valor_neto
+    resultado = _resultado_cartera(
+        precios, motor, valores, valor_neto, capital_referencia, capital_invertido,
+        impuestos_intereses, intereses_monetario,
+        _tir_aportaciones(serie_activo, indices_compra, aportacion, valor_final_tir),
+        calcular_twr(serie_activo, [aportacion] * num_compras, indices_compra),
+        metricas, _drawdown_post_dca(metricas, serie_activo, ultimo_dia_dca, valores_post_dca)
+    )
+    resultado['valores_solo_activo'] = serie_activo
+    resultado['capital_total_aportado'] = capital_referencia
+    resultado['aportacion_mensual'] = aportacion
+    resultado['dias_dca'] = ultimo_dia_dca
+    resultado['modo'] = modo
+    resultado['rebalanceo'] = rebalanceo
+    return resultado
+
+
+def comparar_cartera_ls_dca(
+    precios: pd.DataFrame,
+    pesos,
+    capital: float,
+    meses_dca: int,
+    comision: float,
+    slippage: float,
+    tasa_monetario: float = 0.0,
+    modo: str = 'capital_disponible',
+    aportacion_mensual: float = None,
+    rebalanceo: str = 'nunca',
+    aportacion_inicio_mes: bool = True
+) -> dict:
+    """
+    LS vs DCA sobre la misma cartera y regla de rebalanceo.
+    
+    En aportación periódica LS invierte el día 1 el total de las aportaciones.
+    Devuelve {'lump_sum': resultado, 'dca': resultado, 'diferencia_pp', 'ganador'}.
+    """
+    resultado_dca = simular_cartera_dca(
+        precios, pesos, capital, meses_dca, comision, slippage, tasa_monetario, modo,
+        aportacion_mensual, rebalanceo, aportacion_inicio_mes
+    )
+    resultado_ls = simular_cartera_lump_sum(
+        precios, pesos, resultado_dca['capital_total_aportado'], comision, slippage, rebalanceo
+    )
+    diferencia_pp = resultado_ls['rentabilidad'] - resultado_dca['rentabilidad']
+    return {
+        'lump_sum': resultado_ls,
+        'dca': resultado_dca,
+        'diferencia_pp': diferencia_pp,
+        'ganador': 'LS' if diferencia_pp > 0 else 'DCA',
+    }
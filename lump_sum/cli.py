@@ -0,0 +1,293 @@
+"""
+Ejecución por lotes LS vs DCA desde línea de comandos.
+
+Ejemplo:
+    python -m lump_sum --tickers SPY QQQ --fechas-inicio 2005-01-01 2010-01-01 \
+        --horizontes 5 10 --meses-dca 6 12 24 --salida resumen.parquet
+
+Recorre la rejilla ticker × fecha inicio × horizonte × modo × meses × momento
+× comisión × slippage y escribe una fila resumen por escenario en Parquet o
+CSV (según la extensión), en bloques a medida que se calculan. Con
+--procesos N todos los escenarios se reparten entre N procesos de un único
+pool, que comparten en memoria los precios de todos los tickers (se cargan
+antes de empezar); las filas salen en el mismo orden.
+
+El momento es 'inicio', 'final' o cualquier regla de lump_sum.calendario
+('semanal:2', 'dia_mes:15'...). Con reglas semanales los meses DCA son la
+duración del plan y el capital se reparte entre las aportaciones que caben.
+"""
+
+import argparse
+import itertools
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from .calendario import indices_compra, interpretar_regla, num_aportaciones, regla_por_momento
+from .simulacion import simular_lump_sum, simular_dca_capital_disponible, simular_dca_aportacion_periodica
+from .almacen import AlmacenPrecios
+from .paralelo import EjecutorProcesos
+from .resultado import ResultadoSimulacion, fila_resumen
+from .proveedores import ErrorDatos, TickerNoEncontrado, crear_proveedor
+
+
+MODOS_DCA = ('capital_disponible', 'aportacion_periodica')
+# Columnas enteras del resumen; el resto de columnas numéricas se escriben como float64
+COLUMNAS_ENTERAS = ('escenario_id', 'horizonte', 'meses_dca', 'num_compras_dca')
+
+
+class EscritorTabular:
+    """
+    Escribe DataFrames por bloques en un único fichero Parquet o CSV.
+    
+    En Parquet el esquema sale del primer bloque: las columnas numéricas que no
+    están en enteras se pasan a float64, así un bloque cuyos valores son enteros
+    por casualidad (0, 1000...) no fija un int64 que los siguientes no cumplen.
+    """
+    
+    def __init__(self, ruta: str, enteras=()):
+        self.ruta = Path(ruta)
+        self.enteras = set(enteras)
+        self.formato = 'parquet' if self.ruta.suffix.lower() in ('.parquet', '.pq') else 'csv'
+        self._escritor_parquet = None
+        self._esquema = None
+        self._cabecera_escrita = False
+        self.filas = 0
+    
+    def escribir(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        if self.formato == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            
+            df = df.astype({
+                columna: 'float64' for columna, tipo in df.dtypes.items()
+                if columna not in self.enteras and pd.api.types.is_numeric_dtype(tipo)
+                and not pd.api.types.is_bool_dtype(tipo)
+            })
+            if self._escritor_parquet is None:
+                tabla = pa.Table.from_pandas(df, preserve_index=False)
+                self._esquema = tabla.schema
+                self._escritor_parquet = pq.ParquetWriter(self.ruta, self._esquema)
+            else:
+                tabla = pa.Table.from_pandas(df, schema=self._esquema, preserve_index=False)
+            self._escritor_parquet.write_table(tabla)
+        else:
+            df.to_csv(self.ruta, mode='a' if self._cabecera_escrita else 'w',
+                      header=not self._cabecera_escrita, index=False)
+            self._cabecera_escrita = True
+        self.filas += len(df)
+    
+    def cerrar(self):
+        if self._escritor_parquet is not None:
+            self._escritor_parquet.close()
+            self._escritor_parquet = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def _curvas(escenario_id: int, resultado_ls: ResultadoSimulacion, resultado_dca: ResultadoSimulacion) -> pd.DataFrame:
+    """Curvas diarias del escenario en formato largo (una fila por día)."""
+    return pd.DataFrame({
+        'escenario_id': escenario_id,
+        'fecha': resultado_ls.fechas,
+        'valor_ls': resultado_ls.curva,
+        'valor_dca': resultado_dca.curva,
+        'valor_dca_solo_activo': resultado_dca['valores_solo_activo'].to_numpy(),
+    })
+
+
+def regla_momento(momento: str) -> str:
+    """'inicio' / 'final' o una regla de calendario; lanza ValueError si no es válida."""
+    if momento in ('inicio', 'final'):
+        return regla_por_momento(momento == 'inicio')
+    interpretar_regla(momento)
+    return momento
+
+
+def _momento(valor: str) -> str:
+    """Tipo argparse para --momentos."""
+    try:
+        regla_momento(valor)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return valor
+
+
+def ejecutar_escenario(
+    precios: pd.Series,
+    escenario: dict,
+    con_curvas: bool = False
+) -> tuple[ResultadoSimulacion, ResultadoSimulacion]:
+    """
+    Lanza LS y el DCA del escenario sobre la ventana de precios ya recortada.
+    LS invierte escenario['capital'] salvo que se indique otro en 'capital_ls'.
+    Devuelve resultados compactos: solo métricas salvo con con_curvas=True
+    (entonces ambos comparten el índice de fechas de precios).
+    """
+    resultado_ls = simular_lump_sum(
+        precios, escenario.get('capital_ls', escenario['capital']), escenario['comision'], escenario['slippage']
+    )
+    regla = regla_momento(escenario['momento'])
+    n_aportaciones = num_aportaciones(escenario['meses_dca'], regla)
+    indices = indices_compra(precios.index, n_aportaciones, regla)
+    if escenario['modo'] == 'capital_disponible':
+        resultado_dca = simular_dca_capital_disponible(
+            precios, escenario['capital'], n_aportaciones, escenario['comision'],
+            escenario['slippage'], escenario['tasa_monetario'], indices_compra=indices
+        )
+    else:
+        # Se mantiene el capital total del plan: aportación mensual × meses
+        aportacion = escenario['aportacion_mensual'] * escenario['meses_dca'] / n_aportaciones
+        resultado_dca = simular_dca_aportacion_periodica(
+            precios, aportacion, n_aportaciones, escenario['comision'],
+            escenario['slippage'], indices_compra=indices
+        )
+    return (
+        ResultadoSimulacion.desde_dict(resultado_ls, con_curvas, precios.index),
+        ResultadoSimulacion.desde_dict(resultado_dca, con_curvas, precios.index)
+    )
+
+
+def _claves_arrays(ticker: str) -> tuple[str, str]:
+    """Claves de los valores y las fechas del ticker en los arrays compartidos."""
+    return f'valores:{ticker}', f'fechas:{ticker}'
+
+
+def _tarea_escenario(arrays: dict, tarea: tuple) -> tuple[dict, pd.DataFrame]:
+    """
+    Tarea del pool: escenario sobre las posiciones [inicio, fin) de los precios de su
+    ticker (compartidos). Devuelve la fila resumen y, si se piden, las curvas.
+    """
+    escenario, inicio, fin, con_curvas = tarea
+    clave_valores, clave_fechas = _claves_arrays(escenario['ticker'])
+    precios = pd.Series(arrays[clave_valores][inicio:fin], index=pd.DatetimeIndex(arrays[clave_fechas][inicio:fin]))
+    resultado_ls, resultado_dca = ejecutar_escenario(precios, escenario, con_curvas)
+    curvas = _curvas(escenario['escenario_id'], resultado_ls, resultado_dca) if con_curvas else None
+    return fila_resumen(escenario, precios, resultado_ls, resultado_dca), curvas
+
+
+def _volcar(escritor: EscritorTabular, bloque: list, escritor_curvas: EscritorTabular, bloque_curvas: list):
+    """Escribe los bloques pendientes y los vacía."""
+    escritor.escribir(pd.DataFrame(bloque))
+    bloque.clear()
+    if escritor_curvas is not None and bloque_curvas:
+        escritor_curvas.escribir(pd.concat(bloque_curvas, ignore_index=True))
+    bloque_curvas.clear()
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m lump_sum',
+        description='Backtest por lotes Lump Sum vs DCA con costes e IRPF España 2024.'
+    )
+    parser.add_argument('--tickers', nargs='+', required=True, help='Tickers (SPY, ^GSPC, SAN.MC...)')
+    parser.add_argument('--fechas-inicio', nargs='+', required=True, help='Fechas de inicio YYYY-MM-DD')
+    parser.add_argument('--horizontes', nargs='+', type=int, default=[10], help='Horizontes en años')
+    parser.add_argument('--modos', nargs='+', choices=MODOS_DCA, default=['capital_disponible'])
+    parser.add_argument('--meses-dca', nargs='+', type=int, default=[12])
+    parser.add_argument('--momentos', nargs='+', type=_momento, default=['inicio'],
+                        help="inicio, final o regla de calendario (primer_dia_mes, ultimo_dia_mes, semanal:N, dia_mes:D)")
+    parser.add_argument('--capital', type=float, default=100_000.0, help='Capital LS y capital DCA (modo capital disponible)')
+    parser.add_argument('--aportacion-mensual', type=float, default=1000.0, help='Aportación mensual (modo aportación periódica)')
+    parser.add_argument('--comisiones', nargs='+', type=float, default=[0.10], help='Comisión por operación en %%')
+    parser.add_argument('--slippages', nargs='+', type=float, default=[0.05], help='Slippage por operación en %%')
+    parser.add_argument('--tasa-monetario', type=float, default=3.5, help='Rentabilidad anual del monetario en %%')
+    parser.add_argument('--salida', required=True, help='Fichero resumen (.parquet o .csv)')
+    parser.add_argument('--curvas', help='Fichero opcional con las curvas diarias (.parquet o .csv)')
+    parser.add_argument('--proveedor', help="Fuente de datos: 'yfinance' o 'ficheros:<directorio>' (por defecto $LUMP_SUM_PROVEEDOR o yfinance)")
+    parser.add_argument('--sin-almacen', action='store_true', help='Leer directamente del proveedor, sin almacén local')
+    parser.add_argument('--almacen', help='Fichero SQLite del almacén de precios (por defecto ~/.cache/lump_sum)')
+    parser.add_argument('--bloque', type=int, default=500, help='Filas por bloque de escritura')
+    parser.add_argument('--procesos', type=int, default=1,
+                        help='Procesos en paralelo (0 = todos los núcleos); los precios se comparten en memoria')
+    return parser
+
+
+def main(argv: list = None) -> int:
+    args = _parser().parse_args(argv)
+    
+    fechas_inicio = sorted(pd.Timestamp(f) for f in args.fechas_inicio)
+    rejilla = list(itertools.product(
+        fechas_inicio, args.horizontes, args.modos, args.meses_dca, args.momentos,
+        [c / 100 for c in args.comisiones], [s / 100 for s in args.slippages]
+    ))
+    
+    proveedor = crear_proveedor(args.proveedor)
+    if not args.sin_almacen:
+        proveedor = AlmacenPrecios(args.almacen, proveedor=proveedor)
+    escenario_id = 0
+    omitidos = 0
+    bloque = []
+    bloque_curvas = []
+    escritor_curvas = EscritorTabular(args.curvas, ('escenario_id',)) if args.curvas else None
+    
+    # Precios de todos los tickers y escenarios de la rejilla: un único pool para todos
+    arrays = {}
+    tareas = []
+    for ticker in args.tickers:
+        ticker = ticker.upper().strip()
+        try:
+            precios_full = proveedor.precios(ticker, fechas_inicio[0])
+        except TickerNoEncontrado:
+            precios_full = None
+        except ErrorDatos as e:
+            print(f"[{ticker}] error obteniendo datos: {e}", file=sys.stderr)
+            omitidos += len(rejilla)
+            continue
+        if precios_full is None or precios_full.empty:
+            print(f"[{ticker}] sin datos, se omite", file=sys.stderr)
+            omitidos += len(rejilla)
+            continue
+        
+        clave_valores, clave_fechas = _claves_arrays(ticker)
+        arrays[clave_valores] = precios_full.to_numpy(dtype=float)
+        arrays[clave_fechas] = precios_full.index.to_numpy()
+        for fecha, horizonte, modo, meses, momento, comision, slippage in rejilla:
+            dias_horizonte = horizonte * 252
+            inicio = int(precios_full.index.searchsorted(fecha, side='left'))
+            if len(precios_full) - inicio <= dias_horizonte:
+                omitidos += 1
+                continue
+            
+            escenario = {
+                'escenario_id': escenario_id,
+                'ticker': ticker,
+                'fecha_inicio': fecha,
+                'horizonte': horizonte,
+                'modo': modo,
+                'meses_dca': meses,
+                'momento': momento,
+                'comision': comision,
+                'slippage': slippage,
+                'tasa_monetario': args.tasa_monetario / 100 if modo == 'capital_disponible' else 0.0,
+                'capital': args.capital,
+                'aportacion_mensual': args.aportacion_mensual if modo == 'aportacion_periodica' else args.capital / meses,
+            }
+            tareas.append((escenario, inicio, inicio + dias_horizonte + 1, escritor_curvas is not None))
+            escenario_id += 1
+    
+    with EscritorTabular(args.salida, COLUMNAS_ENTERAS) as escritor:
+        # Los resultados llegan en orden y se escriben por bloques
+        ejecutor = EjecutorProcesos(args.procesos or None, arrays)
+        for fila, curvas in ejecutor.mapear(_tarea_escenario, tareas, tareas_por_envio=8):
+            bloque.append(fila)
+            if curvas is not None:
+                bloque_curvas.append(curvas)
+            if len(bloque) >= args.bloque:
+                _volcar(escritor, bloque, escritor_curvas, bloque_curvas)
+        
+        _volcar(escritor, bloque, escritor_curvas, bloque_curvas)
+    
+    if escritor_curvas is not None:
+        escritor_curvas.cerrar()
+    
+    print(f"{escritor.filas} escenarios escritos en {args.salida} ({omitidos} omitidos por falta de datos)",
+          file=sys.stderr)
+    return 0
@@ -0,0 +1,55 @@
+"""
+Coalescencia de peticiones concurrentes (single-flight).
+
+Si varias sesiones piden a la vez la misma clave (p. ej. refrescar SPY), solo
+la primera ejecuta la función; el resto espera y recibe el mismo resultado o la
+misma excepción.
+"""
+
+import threading
+from concurrent.futures import Future
+
+
+class UnVuelo:
+    """Grupo single-flight: una ejecución en curso por clave."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._en_vuelo: dict[object, Future] = {}
+    
+    def ejecutar(self, clave, funcion, *args, **kwargs) -> tuple[object, bool]:
+        """
+        Ejecuta funcion(*args, **kwargs) salvo que ya haya una ejecución en curso
+        para la clave, en cuyo caso espera a ella.
+        Devuelve (resultado, compartido); compartido=True si se esperó a otra llamada.
+        """
+        with self._lock:
+            futuro = self._en_vuelo.get(clave)
+            lider = futuro is None
+            if lider:
+                futuro = Future()
+                self._en_vuelo[clave] = futuro
+        
+        if not lider:
+            return futuro.result(), True
+        
+        try:
+            resultado = funcion(*args, **kwargs)
+        except BaseException as e:
+            futuro.set_exception(e)
+            raise
+        else:
+            futuro.set_result(resultado)
+            return resultado, False
+        finally:
+            with self._lock:
+                del self._en_vuelo[clave]
+    
+    def en_vuelo(self) -> int:
+        """Número de claves con una ejecución en curso."""
+        with self._lock:
+            return len(self._en_vuelo)
+
+
+# Grupo compartido por todo el proceso
+VUELOS = UnVuelo()
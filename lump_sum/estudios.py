@@ -0,0 +1,316 @@
+"""
+Estudios por lotes: ventanas móviles y barridos de parámetros vectorizados.
+"""
+
+import pandas as pd
+import numpy as np
+
+from .calendario import posiciones_compra, regla_por_momento
+from .fiscalidad import calcular_impuestos_españa_array
+from .metricas import calcular_tir
+from .paralelo import EjecutorProcesos, lotes
+
+
+def _años_desde_inicio(precios: pd.Series) -> np.ndarray:
+    """Años (días naturales / 365.25) de cada sesión desde la primera, como en los simuladores."""
+    return (precios.index - precios.index[0]).days.to_numpy() / 365.25
+
+
+def _rentabilidades_ls_dca(
+    valores_precio: np.ndarray,
+    inicios: np.ndarray,
+    dias_horizonte: int,
+    meses_dca: np.ndarray,
+    coste_pct: np.ndarray,
+    capital: float,
+    tasa_monetario: float,
+    modo_dca: str,
+    posiciones: np.ndarray,
+    aportacion_mensual: float = None,
+    tiempos: np.ndarray = None,
+    capital_ls: float = None
+) -> dict:
+    """
+    Núcleo vectorizado LS vs DCA sobre una rejilla (meses DCA × inicios × costes).
+    
+    posiciones: (S, K) posiciones absolutas de compra de lump_sum.calendario, con
+    len(valores_precio) en las que caen fuera de su ventana.
+    Devuelve rentabilidad_ls y rentabilidad_dca con forma (M, S, C), donde C son
+    los niveles de coste (comisión + slippage) aplanados. Reproduce la lógica de
+    costes e IRPF de simular_lump_sum y de los simuladores DCA.
+    Si se pasan tiempos (años desde el primer día, uno por sesión) añade tir_ls
+    y tir_dca, resueltas a la vez para todas las celdas. capital_ls fija el
+    capital de Lump Sum (por defecto capital, o lo aportado por el DCA en
+    'aportacion_periodica').
+    """
+    if modo_dca not in ('capital_disponible', 'aportacion_periodica'):
+        raise ValueError(f"Modo DCA desconocido: {modo_dca!r}")
+    
+    meses_dca = np.asarray(meses_dca, dtype=np.int64)
+    coste_pct = np.asarray(coste_pct, dtype=float).reshape(1, 1, -1)
+    n_dias = dias_horizonte + 1
+    ventanas = np.arange(len(inicios))[None, :]
+    precio_inicio = valores_precio[inicios][None, :, None]
+    precio_final = valores_precio[inicios + dias_horizonte][None, :, None]
+    
+    # Compras válidas por número de meses (las que caen fuera de la ventana se descartan)
+    validas = posiciones < len(valores_precio)
+    posiciones = np.where(validas, posiciones, inicios[:, None])
+    num_compras = np.minimum(meses_dca[:, None], validas.sum(axis=1)[None, :])
+    
+    # Suma acumulada sobre compras de 1/precio: columna k = primeras k compras de cada ventana
+    inversos = np.where(validas, 1.0 / valores_precio[posiciones], 0.0)
+    inversos_acum = np.concatenate((np.zeros((len(inicios), 1)), np.cumsum(inversos, axis=1)), axis=1)
+    suma_inversos = inversos_acum[ventanas, num_compras][:, :, None]
+    
+    if modo_dca == 'capital_disponible':
+        aportacion = (capital / meses_dca).astype(float)
+    else:
+        aportacion = np.full(len(meses_dca), aportacion_mensual if aportacion_mensual is not None else capital / meses_dca)
+    aportacion = aportacion.reshape(-1, 1, 1)
+    capital_invertido_dca = aportacion * num_compras[:, :, None]
+    if capital_ls is None:
+        capital_ls = capital if modo_dca == 'capital_disponible' else capital_invertido_dca
+    
+    # LUMP SUM
+    participaciones_ls = (capital_ls - capital_ls * coste_pct) / precio_inicio
+    valor_bruto_ls = participaciones_ls * precio_final
+    valor_tras_venta_ls = valor_bruto_ls - valor_bruto_ls * coste_pct
+    neto_ls = valor_tras_venta_ls - calcular_impuestos_españa_array(valor_tras_venta_ls - capital_ls)[0]
+    rentabilidad_ls = (neto_ls / capital_ls - 1) * 100
+    
+    # DCA
+    participaciones_dca = (aportacion - aportacion * coste_pct) * suma_inversos
+    valor_bruto_dca = participaciones_dca * precio_final
+    valor_tras_venta_dca = valor_bruto_dca - valor_bruto_dca * coste_pct
+    neto_dca = valor_tras_venta_dca - calcular_impuestos_españa_array(valor_tras_venta_dca - capital_invertido_dca)[0]
+    
+    if modo_dca == 'capital_disponible':
+        # Intereses del monetario sobre el capital pendiente antes de la compra de cada día:
+        # cada aportación deja de rentar en los días posteriores a su compra
+        dias_tras_compra = np.where(validas, n_dias - 1 - (posiciones - inicios[:, None]), 0)
+        dias_tras_acum = np.concatenate((np.zeros((len(inicios), 1)), np.cumsum(dias_tras_compra, axis=1)), axis=1)
+        saldo_dias = n_dias * capital - aportacion[:, :, 0] * dias_tras_acum[ventanas, num_compras]
+        intereses = np.maximum(saldo_dias, 0.0) * (tasa_monetario / 252)
+        neto_dca = neto_dca + (intereses - calcular_impuestos_españa_array(intereses)[0])[:, :, None]
+        rentabilidad_dca = (neto_dca / capital - 1) * 100
+        # La TIR del DCA mide solo lo invertido en el activo, como en el simulador
+        recuperado_dca = valor_tras_venta_dca - calcular_impuestos_españa_array(valor_tras_venta_dca - capital_invertido_dca)[0]
+    else:
+        rentabilidad_dca = (neto_dca / capital_invertido_dca - 1) * 100
+        recuperado_dca = neto_dca
+    
+    forma = (len(meses_dca), len(inicios), coste_pct.size)
+    resultado = {
+        'rentabilidad_ls': np.broadcast_to(rentabilidad_ls, forma),
+        'rentabilidad_dca': rentabilidad_dca
+    }
+    if tiempos is not None:
+        # Flujos (M, S, C, compras + venta): aportaciones en cada compra, venta neta al final
+        años_venta = (tiempos[inicios + dias_horizonte] - tiempos[inicios])[None, :, None, None]
+        flujos_ls = np.stack(np.broadcast_arrays(-capital_ls * np.ones(forma), neto_ls), axis=-1)
+        resultado['tir_ls'] = calcular_tir(flujos_ls, np.concatenate((np.zeros_like(años_venta), años_venta), axis=-1))
+        
+        años_compra = (tiempos[posiciones] - tiempos[inicios][:, None])[None, :, None, :]
+        compra_valida = (np.arange(posiciones.shape[1]) < num_compras[:, :, None])[:, :, None, :]
+        aportaciones = np.where(compra_valida, -aportacion[..., None], 0.0)
+        flujos_dca = np.concatenate((
+            np.broadcast_to(aportaciones, forma + (posiciones.shape[1],)),
+            np.broadcast_to(recuperado_dca, forma)[..., None]
+        ), axis=-1)
+        años_dca = np.concatenate((años_compra, años_venta), axis=-1)
+        resultado['tir_dca'] = calcular_tir(flujos_dca, años_dca)
+    return resultado
+
+
+def _lote_rentabilidades(arrays: dict, tarea: tuple) -> dict:
+    """Tarea del pool: núcleo sobre un lote de ventanas con los precios compartidos."""
+    inicios, posiciones, parametros = tarea
+    return _rentabilidades_ls_dca(
+        arrays['valores_precio'], inicios, posiciones=posiciones, tiempos=arrays.get('tiempos'), **parametros
+    )
+
+
+def _rentabilidades_por_lotes(
+    valores_precio: np.ndarray,
+    inicios: np.ndarray,
+    posiciones: np.ndarray,
+    tiempos: np.ndarray,
+    num_procesos: int,
+    **parametros
+) -> dict:
+    """
+    _rentabilidades_ls_dca repartido por lotes de ventanas entre num_procesos procesos.
+    Los precios y tiempos van en memoria compartida; los lotes se unen en orden.
+    """
+    if num_procesos == 1:
+        return _rentabilidades_ls_dca(valores_precio, inicios, posiciones=posiciones, tiempos=tiempos, **parametros)
+    
+    arrays = {'valores_precio': valores_precio}
+    if tiempos is not None:
+        arrays['tiempos'] = tiempos
+    ejecutor = EjecutorProcesos(num_procesos, arrays)
+    tareas = [(inicios[lote], posiciones[lote], parametros) for lote in lotes(len(inicios), ejecutor.num_procesos)]
+    resultados = list(ejecutor.mapear(_lote_rentabilidades, tareas))
+    return {clave: np.concatenate([r[clave] for r in resultados], axis=1) for clave in resultados[0]}
+
+
+def estudio_ventanas_moviles(
+    precios: pd.Series,
+    dias_horizonte: int,
+    capital: float,
+    meses_dca: int,
+    comision: float,
+    slippage: float,
+    tasa_monetario: float = 0.0,
+    modo_dca: str = 'capital_disponible',
+    aportacion_inicio_mes: bool = True,
+    aportacion_mensual: float = None,
+    calendario: str = None,
+    num_procesos: int = 1,
+    capital_ls: float = None
+) -> dict:
+    """
+    Estudio de ventanas móviles: LS vs DCA para cada posible día de inicio.
+    
+    Evalúa todas las ventanas de dias_horizonte + 1 sesiones en una sola pasada
+    de arrays, con la misma lógica de costes e IRPF que simular_lump_sum y los
+    simuladores DCA. En modo 'aportacion_periodica' LS invierte el capital total
+    aportado por el DCA para que la comparación sea sobre la misma cantidad;
+    capital_ls fija otro capital para LS (el del backtest principal, p. ej.).
+    calendario es una regla de lump_sum.calendario (por defecto, primer o último
+    día hábil del mes según aportacion_inicio_mes); meses_dca es entonces el
+    número de aportaciones. Con num_procesos > 1 (None = todos los núcleos) las
+    ventanas se reparten por lotes en un pool de procesos (lump_sum.paralelo).
+    """
+    valores_precio = precios.to_numpy(dtype=float)
+    n_ventanas = len(valores_precio) - dias_horizonte
+    if dias_horizonte < 1 or n_ventanas < 1:
+        raise ValueError(f"Serie demasiado corta ({len(valores_precio)} días) para un horizonte de {dias_horizonte} días")
+    
+    inicios = np.arange(n_ventanas)
+    posiciones = posiciones_compra(
+        precios.index, inicios, meses_dca, calendario or regla_por_momento(aportacion_inicio_mes),
+        fines=inicios + dias_horizonte
+    )
+    resultado = _rentabilidades_por_lotes(
+        valores_precio, inicios, posiciones, _años_desde_inicio(precios), num_procesos,
+        dias_horizonte=dias_horizonte, meses_dca=np.array([meses_dca]), coste_pct=np.array([comision + slippage]),
+        capital=capital, tasa_monetario=tasa_monetario, modo_dca=modo_dca, aportacion_mensual=aportacion_mensual,
+        capital_ls=capital_ls
+    )
+    rentabilidad_ls = resultado['rentabilidad_ls'][0, :, 0]
+    rentabilidad_dca = resultado['rentabilidad_dca'][0, :, 0]
+    
+    diferencia_pp = rentabilidad_ls - rentabilidad_dca
+    fechas_inicio = precios.index[inicios]
+    fechas_fin = precios.index[inicios + dias_horizonte]
+    idx_mejor = int(np.argmax(diferencia_pp))
+    idx_peor = int(np.argmin(diferencia_pp))
+    
+    return {
+        'rentabilidad_ls': pd.Series(rentabilidad_ls, index=fechas_inicio),
+        'rentabilidad_dca': pd.Series(rentabilidad_dca, index=fechas_inicio),
+        'diferencia_pp': pd.Series(diferencia_pp, index=fechas_inicio),
+        'tir_ls': pd.Series(resultado['tir_ls'][0, :, 0], index=fechas_inicio),
+        'tir_dca': pd.Series(resultado['tir_dca'][0, :, 0], index=fechas_inicio),
+        'num_ventanas': n_ventanas,
+        'win_rate_ls': float((diferencia_pp > 0).mean() * 100),
+        'diferencia_media': float(diferencia_pp.mean()),
+        'diferencia_mediana': float(np.median(diferencia_pp)),
+        'percentiles_pp': {p: float(v) for p, v in zip((5, 25, 50, 75, 95), np.percentile(diferencia_pp, [5, 25, 50, 75, 95]))},
+        'mejor_ventana': {
+            'fecha_inicio': fechas_inicio[idx_mejor],
+            'fecha_fin': fechas_fin[idx_mejor],
+            'diferencia_pp': float(diferencia_pp[idx_mejor])
+        },
+        'peor_ventana': {
+            'fecha_inicio': fechas_inicio[idx_peor],
+            'fecha_fin': fechas_fin[idx_peor],
+            'diferencia_pp': float(diferencia_pp[idx_peor])
+        },
+        'dias_horizonte': dias_horizonte,
+        'modo': modo_dca
+    }
+
+
+def barrido_parametros(
+    precios: pd.Series,
+    dias_horizonte: int,
+    capital: float,
+    meses_dca: list,
+    comisiones: list,
+    slippages: list,
+    fechas_inicio: list = None,
+    tasa_monetario: float = 0.0,
+    modo_dca: str = 'capital_disponible',
+    aportacion_inicio_mes: bool = True,
+    aportacion_mensual: float = None,
+    con_tir: bool = False,
+    calendario: str = None,
+    num_procesos: int = 1,
+    capital_ls: float = None
+) -> dict:
+    """
+    Barrido de parámetros: meses DCA × fecha de inicio × comisión × slippage.
+    
+    Toda la rejilla se evalúa en una pasada con arrays numpy en broadcast.
+    Si no se indican fechas_inicio se usan todas las ventanas posibles; cada
+    fecha se ajusta a la primera sesión disponible en o después de ella.
+    
+    Devuelve arrays con forma (meses_dca, fecha_inicio, comision, slippage)
+    junto con sus coordenadas:
+        {'dimensiones': (...), 'coordenadas': {...},
+         'rentabilidad_ls': ndarray, 'rentabilidad_dca': ndarray, 'diferencia_pp': ndarray}
+    Con con_tir=True añade tir_ls y tir_dca (más memoria: un flujo por compra y celda).
+    calendario, num_procesos y capital_ls funcionan como en estudio_ventanas_moviles.
+    """
+    valores_precio = precios.to_numpy(dtype=float)
+    n_ventanas = len(valores_precio) - dias_horizonte
+    if dias_horizonte < 1 or n_ventanas < 1:
+        raise ValueError(f"Serie demasiado corta ({len(valores_precio)} días) para un horizonte de {dias_horizonte} días")
+    
+    if fechas_inicio is None:
+        inicios = np.arange(n_ventanas)
+    else:
+        inicios = precios.index.searchsorted(pd.DatetimeIndex(fechas_inicio), side='left')
+        if (inicios >= n_ventanas).any():
+            raise ValueError(f"Hay fechas de inicio sin {dias_horizonte} días de historia por delante")
+    
+    meses_dca = np.asarray(meses_dca, dtype=np.int64)
+    comisiones = np.asarray(comisiones, dtype=float)
+    slippages = np.asarray(slippages, dtype=float)
+    coste_pct = comisiones[:, None] + slippages[None, :]
+    
+    posiciones = posiciones_compra(
+        precios.index, inicios, int(meses_dca.max()), calendario or regla_por_momento(aportacion_inicio_mes),
+        fines=inicios + dias_horizonte
+    )
+    resultado = _rentabilidades_por_lotes(
+        valores_precio, inicios, posiciones, _años_desde_inicio(precios) if con_tir else None, num_procesos,
+        dias_horizonte=dias_horizonte, meses_dca=meses_dca, coste_pct=coste_pct,
+        capital=capital, tasa_monetario=tasa_monetario, modo_dca=modo_dca, aportacion_mensual=aportacion_mensual,
+        capital_ls=capital_ls
+    )
+    forma = (len(meses_dca), len(inicios), len(comisiones), len(slippages))
+    rentabilidad_ls = np.ascontiguousarray(resultado['rentabilidad_ls']).reshape(forma)
+    rentabilidad_dca = resultado['rentabilidad_dca'].reshape(forma)
+    
+    barrido = {
+        'dimensiones': ('meses_dca', 'fecha_inicio', 'comision', 'slippage'),
+        'coordenadas': {
+            'meses_dca': meses_dca,
+            'fecha_inicio': precios.index[inicios],
+            'comision': comisiones,
+            'slippage': slippages
+        },
+        'rentabilidad_ls': rentabilidad_ls,
+        'rentabilidad_dca': rentabilidad_dca,
+        'diferencia_pp': rentabilidad_ls - rentabilidad_dca,
+        'dias_horizonte': dias_horizonte,
+        'modo': modo_dca
+    }
+    if con_tir:
+        barrido['tir_ls'] = np.ascontiguousarray(resultado['tir_ls']).reshape(forma)
+        barrido['tir_dca'] = resultado['tir_dca'].reshape(forma)
+    return barrido
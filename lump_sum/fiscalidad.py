@@ -0,0 +1,82 @@
+"""
+Fiscalidad: IRPF España 2024 sobre plusvalías (base del ahorro).
+"""
+
+import numpy as np
+
+
+TRAMOS_IRPF_2024 = [
+    (6_000, 0.19),
+    (50_000, 0.21),
+    (200_000, 0.23),
+    (300_000, 0.27),
+    (float('inf'), 0.28)
+]
+
+
+def calcular_impuestos_españa(plusvalia: float) -> tuple[float, dict]:
+    """Calcula impuestos sobre plusvalías según tramos IRPF España 2024."""
+    if plusvalia <= 0:
+        return 0.0, {}
+    
+    impuesto_total = 0.0
+    restante = plusvalia
+    limite_anterior = 0.0
+    desglose = {}
+    
+    for limite_superior, tipo in TRAMOS_IRPF_2024:
+        ancho_tramo = limite_superior - limite_anterior
+        base_en_tramo = min(restante, ancho_tramo)
+        
+        if base_en_tramo > 0:
+            impuesto_tramo = base_en_tramo * tipo
+            impuesto_total += impuesto_tramo
+            desglose[f"{int(tipo * 100)}%"] = {
+                'base': base_en_tramo,
+                'impuesto': impuesto_tramo
+            }
+            restante -= base_en_tramo
+            limite_anterior = limite_superior
+        
+        if restante <= 0:
+            break
+    
+    return impuesto_total, desglose
+
+
+def _tabla_tramos(tramos: list) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Límites inferiores, tipos e impuesto acumulado al inicio de cada tramo."""
+    limites_inferiores = np.array([0.0] + [limite for limite, _ in tramos[:-1]])
+    tipos = np.array([tipo for _, tipo in tramos])
+    impuesto_acumulado = np.zeros(len(tramos))
+    # Suma secuencial en el mismo orden que calcular_impuestos_españa
+    for j in range(1, len(tramos)):
+        ancho = limites_inferiores[j] - limites_inferiores[j - 1]
+        impuesto_acumulado[j] = impuesto_acumulado[j - 1] + ancho * tipos[j - 1]
+    return limites_inferiores, tipos, impuesto_acumulado
+
+
+_LIMITES_INFERIORES, _TIPOS, _IMPUESTO_ACUMULADO = _tabla_tramos(TRAMOS_IRPF_2024)
+
+
+def calcular_impuestos_españa_array(plusvalias: np.ndarray, desglose: bool = False) -> tuple[np.ndarray, dict]:
+    """
+    Versión vectorizada de calcular_impuestos_españa para un array de plusvalías.
+    
+    El impuesto de cada elemento es el acumulado hasta el inicio de su tramo
+    (precalculado) más lo que cae dentro del tramo, localizado con searchsorted.
+    Con desglose=True devuelve también {'19%': {'base': array, 'impuesto': array}, ...}
+    con la misma forma que plusvalias; si no, un dict vacío.
+    """
+    plusvalias = np.asarray(plusvalias, dtype=float)
+    tramo = np.maximum(np.searchsorted(_LIMITES_INFERIORES, plusvalias, side='left') - 1, 0)
+    impuestos = _IMPUESTO_ACUMULADO[tramo] + (plusvalias - _LIMITES_INFERIORES[tramo]) * _TIPOS[tramo]
+    impuestos = np.where(plusvalias > 0, impuestos, 0.0)
+    
+    detalle = {}
+    if desglose:
+        limites_superiores = np.append(_LIMITES_INFERIORES[1:], np.inf)
+        for inferior, superior, tipo in zip(_LIMITES_INFERIORES, limites_superiores, _TIPOS):
+            base = np.clip(plusvalias - inferior, 0.0, superior - inferior)
+            detalle[f"{int(tipo * 100)}%"] = {'base': base, 'impuesto': base * tipo}
+    return impuestos, detalle
@@ -0,0 +1,338 @@
+"""
+Simulaciones consultables para cualquier horizonte en tiempo constante.
+
+Simular sobre precios.iloc[:e + 1] es simular sobre toda la serie y quedarse con
+el prefijo: las compras que caben en la ventana, las participaciones y los
+intereses hasta el día e son los mismos. PrefijosSimulacion simula una vez la
+serie completa y guarda arrays acumulados (participaciones, aportado y costes
+tras cada compra, máximo y drawdown corrientes reiniciados en cada compra, sumas
+de retornos y de retornos al cuadrado, producto de factores del TWR). Con ellos
+resultado(dias_horizonte) devuelve el mismo diccionario que el simulador sobre
+la serie recortada sin recorrerla: solo la TIR depende del número de compras.
+
+Única excepción: con 'ultimo_dia_mes' una compra en la última sesión de la
+ventana no cuenta (no se sabe si el mes ha terminado); ese día se corrige el
+último punto de las curvas, que se copian.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .calendario import indices_compra as calcular_indices_compra, interpretar_regla
+from .fiscalidad import calcular_impuestos_españa
+from .metricas import calcular_cagr, calcular_tir
+from .simulacion import _curvas_por_coste
+from .operaciones import LibroOperaciones
+
+
+MODOS_PREFIJOS = ('lump_sum', 'capital_disponible', 'aportacion_periodica')
+
+
+class PrefijosSimulacion:
+    """
+    Una simulación (Lump Sum o DCA) sobre toda la serie, consultable por horizonte.
+    
+    Se construye con PrefijosSimulacion.lump_sum, .dca_capital_disponible o
+    .dca_aportacion_periodica (mismos parámetros que los simuladores, sin el
+    horizonte). Los resultados comparten memoria con la simulación completa: no
+    deben modificarse.
+    """
+    
+    def __init__(
+        self,
+        precios: pd.Series,
+        modo: str,
+        aportacion: float,
+        indices_compra,
+        comision: float,
+        slippage: float,
+        capital: float = 0.0,
+        tasa_monetario: float = 0.0,
+        regla: str = 'primer_dia_mes',
+        niveles_coste=(0.0,)
+    ):
+        if modo not in MODOS_PREFIJOS:
+            raise ValueError(f"Modo desconocido: {modo!r}. Opciones: {list(MODOS_PREFIJOS)}")
+        self.precios = precios
+        self.modo = modo
+        self.aportacion = aportacion
+        self.comision = comision
+        self.slippage = slippage
+        self.capital = capital
+        self.niveles_coste = niveles_coste
+        
+        valores_precio = precios.to_numpy(dtype=float)
+        n_dias = len(valores_precio)
+        indices = np.asarray(indices_compra, dtype=np.int64)
+        num_compras = len(indices)
+        self._valores_precio = valores_precio
+        self._indices = indices
+        self._años = (precios.index - precios.index[0]).days.to_numpy() / 365.25
+        # Con 'ultimo_dia_mes' la compra se confirma con la primera sesión del mes siguiente
+        self._confirmaciones = indices + (interpretar_regla(regla)[0] == 'ultimo_dia_mes')
+        
+        # Funciones escalón tras k compras (mismas operaciones que los simuladores)
+        aportaciones = np.full(num_compras, aportacion)
+        precios_compra = valores_precio[indices]
+        cantidades = (aportacion - aportacion * (comision + slippage)) / precios_compra
+        self._participaciones_tras_k = np.concatenate(([0.0], np.cumsum(cantidades)))
+        self._invertido_tras_k = np.concatenate(([0.0], np.cumsum(aportaciones)))
+        self._pendiente_tras_k = np.subtract.accumulate(np.concatenate(([capital], aportaciones)))
+        self._comisiones_tras_k = np.concatenate(([0.0], np.cumsum(np.full(num_compras, aportacion * comision))))
+        self._slippage_tras_k = np.concatenate(([0.0], np.cumsum(np.full(num_compras, aportacion * slippage))))
+        
+        dias = np.arange(n_dias)
+        compras_hasta = np.searchsorted(indices, dias, side='right')
+        compras_antes = np.searchsorted(indices, dias, side='left')
+        solo_activo = self._participaciones_tras_k[compras_hasta] * valores_precio
+        self._solo_activo = solo_activo
+        
+        # Intereses del monetario: se devengan antes de la compra del día sobre el capital pendiente
+        pendiente_previo = self._pendiente_tras_k[compras_antes]
+        tasa_diaria = tasa_monetario / 252 if modo == 'capital_disponible' else 0.0
+        self._intereses = np.cumsum(np.where(pendiente_previo > 0, pendiente_previo * tasa_diaria, 0.0))
+        if modo == 'capital_disponible':
+            self._efectivo = self._pendiente_tras_k[compras_hasta] + self._intereses
+            valores = solo_activo + self._pendiente_tras_k[compras_hasta] + self._intereses
+        else:
+            self._efectivo = None
+            valores = solo_activo
+        self._serie_valores = pd.Series(valores, index=precios.index)
+        self._serie_solo_activo = pd.Series(solo_activo, index=precios.index)
+        
+        # Máximo y drawdown corrientes desde la última compra (primera aparición de cada extremo)
+        self._maximo = np.zeros(n_dias)
+        self._pico = np.zeros(n_dias, dtype=np.int64)
+        self._peor_dd = np.zeros(n_dias)
+        self._valle = np.zeros(n_dias, dtype=np.int64)
+        tramos = np.append(np.unique(indices), n_dias)
+        for inicio, fin in zip(tramos[:-1], tramos[1:]):
+            valores_tramo = solo_activo[inicio:fin]
+            posiciones = np.arange(inicio, fin)
+            maximo = np.maximum.accumulate(valores_tramo)
+            nuevo_maximo = np.ones(len(valores_tramo), dtype=bool)
+            nuevo_maximo[1:] = valores_tramo[1:] > maximo[:-1]
+            drawdowns = (valores_tramo - maximo) / maximo
+            peor_dd = np.minimum.accumulate(drawdowns)
+            nuevo_valle = np.ones(len(valores_tramo), dtype=bool)
+            nuevo_valle[1:] = drawdowns[1:] < peor_dd[:-1]
+            self._maximo[inicio:fin] = maximo
+            self._pico[inicio:fin] = np.maximum.accumulate(np.where(nuevo_maximo, posiciones, inicio))
+            self._peor_dd[inicio:fin] = peor_dd
+            self._valle[inicio:fin] = np.maximum.accumulate(np.where(nuevo_valle, posiciones, inicio))
+        
+        # Sumas acumuladas de retornos y retornos al cuadrado (volatilidad de cualquier tramo;
+        # los retornos del día de cada compra no caen nunca dentro de un tramo)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            retornos = solo_activo[1:] / solo_activo[:-1] - 1
+        retornos = np.where(np.isfinite(retornos), retornos, 0.0)
+        self._suma_retornos = np.concatenate(([0.0], np.cumsum(retornos)))
+        self._suma_cuadrados = np.concatenate(([0.0], np.cumsum(retornos ** 2)))
+        
+        # TWR: producto acumulado de los factores diarios valores[d] / (valores[d-1] + flujos[d])
+        flujos = np.zeros(n_dias)
+        np.add.at(flujos, indices, aportacion)
+        base = np.concatenate(([0.0], solo_activo[:-1])) + flujos
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factores = np.where(base > 0, solo_activo / base, 1.0)
+        self._twr_acumulado = np.cumprod(factores)
+        
+        self._curvas_coste = _curvas_por_coste(precios, indices, aportacion, niveles_coste, self._efectivo)
+    
+    @classmethod
+    def lump_sum(cls, precios: pd.Series, capital: float, comision: float, slippage: float, niveles_coste=(0.0,)):
+        """Prefijos de simular_lump_sum."""
+        return cls(precios, 'lump_sum', capital, [0], comision, slippage, capital=capital, niveles_coste=niveles_coste)
+    
+    @classmethod
+    def dca_capital_disponible(
+        cls,
+        precios: pd.Series,
+        capital: float,
+        meses_dca: int,
+        comision: float,
+        slippage: float,
+        tasa_monetario: float,
+        calendario: str = 'primer_dia_mes',
+        niveles_coste=(0.0,)
+    ):
+        """Prefijos de simular_dca_capital_disponible (meses_dca compras según calendario)."""
+        indices = calcular_indices_compra(precios.index, meses_dca, calendario)
+        return cls(
+            precios, 'capital_disponible', capital / meses_dca, indices, comision, slippage,
+            capital=capital, tasa_monetario=tasa_monetario, regla=calendario, niveles_coste=niveles_coste
+        )
+    
+    @classmethod
+    def dca_aportacion_periodica(
+        cls,
+        precios: pd.Series,
+        aportacion_mensual: float,
+        meses_dca: int,
+        comision: float,
+        slippage: float,
+        calendario: str = 'primer_dia_mes',
+        niveles_coste=(0.0,)
+    ):
+        """Prefijos de simular_dca_aportacion_periodica."""
+        indices = calcular_indices_compra(precios.index, meses_dca, calendario)
+        return cls(
+            precios, 'aportacion_periodica', aportacion_mensual, indices, comision, slippage,
+            regla=calendario, niveles_coste=niveles_coste
+        )
+    
+    def compras(self, dias_horizonte: int) -> np.ndarray:
+        """Posiciones de las compras que hace la simulación con ese horizonte."""
+        return self._indices[:np.searchsorted(self._confirmaciones, dias_horizonte, side='right')]
+    
+    def _drawdown_y_volatilidad(self, fin: int, inicio: int, valor_fin: float, corregido: bool) -> tuple:
+        """Max DD (%), pico, valle y volatilidad (%) del tramo [inicio, fin] con el valor final dado."""
+        if fin == inicio or self._solo_activo[inicio] <= 0:
+            return 0.0, 0, 0, 0.0
+        
+        if not corregido:
+            valle = self._valle[fin]
+            max_dd = self._peor_dd[fin]
+            suma = self._suma_retornos[fin] - self._suma_retornos[inicio]
+            suma_cuadrados = self._suma_cuadrados[fin] - self._suma_cuadrados[inicio]
+        else:
+            # El último día no tiene la compra pendiente de confirmar: se extiende el tramo anterior
+            anterior = fin - 1
+            maximo = self._maximo[anterior]
+            drawdown = (valor_fin - max(maximo, valor_fin)) / max(maximo, valor_fin)
+            valle, max_dd = (fin, drawdown) if drawdown < self._peor_dd[anterior] else (self._valle[anterior], self._peor_dd[anterior])
+            retorno = valor_fin / self._solo_activo[anterior] - 1
+            suma = self._suma_retornos[anterior] - self._suma_retornos[inicio] + retorno
+            suma_cuadrados = self._suma_cuadrados[anterior] - self._suma_cuadrados[inicio] + retorno ** 2
+        pico = self._pico[anterior] if corregido and valle == fin else self._pico[valle]
+        
+        n_retornos = fin - inicio
+        volatilidad = 0.0
+        if n_retornos > 1:
+            varianza = max(suma_cuadrados - suma * suma / n_retornos, 0.0) / (n_retornos - 1)
+            volatilidad = np.sqrt(varianza) * np.sqrt(252) * 100
+        return max_dd * 100, pico, valle, float(volatilidad)
+    
+    def resultado(self, dias_horizonte: int) -> dict:
+        """Mismo diccionario que el simulador sobre precios.iloc[:dias_horizonte + 1]."""
+        fin = int(dias_horizonte)
+        if not 0 <= fin < len(self._valores_precio):
+            raise ValueError(f"Horizonte fuera de la serie: {dias_horizonte} (máximo {len(self._valores_precio) - 1})")
+        precios = self.precios.iloc[:fin + 1]
+        fechas = precios.index
+        comision, slippage = self.comision, self.slippage
+        
+        # Compras válidas en la ventana y compras del último día que aún no cuentan
+        num_compras = int(np.searchsorted(self._confirmaciones, fin, side='right'))
+        corregido = bool(np.searchsorted(self._indices, fin, side='right') > num_compras)
+        indices = self._indices[:num_compras]
+        ultimo_dia_dca = int(indices[-1]) if num_compras else 0
+        
+        # Libro de la ventana: un lote por compra válida y venta de todo el último día
+        libro = LibroOperaciones(fechas)
+        libro.comprar(indices, self._valores_precio[indices], self.aportacion, comision, slippage)
+        venta = libro.vender(fin, self._valores_precio[fin], libro.participaciones_abiertas(), comision, slippage)
+        
+        # VENTA
+        valor_bruto_final = venta['importe_bruto']
+        coste_venta = valor_bruto_final * (comision + slippage)
+        valor_tras_venta = venta['importe_neto']
+        intereses_monetario = self._intereses[fin] if self.modo == 'capital_disponible' else 0
+        capital_invertido_total = self._invertido_tras_k[num_compras]
+        
+        # IMPUESTOS
+        base_coste = self.capital if self.modo == 'lump_sum' else capital_invertido_total
+        plusvalia = venta['ganancia']
+        impuestos_activo, desglose_imp = calcular_impuestos_españa(plusvalia)
+        impuestos_intereses = calcular_impuestos_españa(intereses_monetario)[0] if self.modo == 'capital_disponible' else 0
+        impuestos_totales = impuestos_activo + impuestos_intereses
+        valor_neto = valor_tras_venta + intereses_monetario - impuestos_totales
+        
+        # MÉTRICAS (DD y volatilidad desde la última compra, como en los simuladores)
+        años = self._años[fin]
+        capital_referencia = capital_invertido_total if self.modo == 'aportacion_periodica' else self.capital
+        # Sin compras en la ventana (aportación periódica) no hay capital sobre el que medir
+        rentabilidad = (valor_neto / capital_referencia - 1) * 100 if capital_referencia > 0 else np.nan
+        cagr = calcular_cagr(capital_referencia, valor_neto, años)
+        max_dd, pico, valle, volatilidad = self._drawdown_y_volatilidad(fin, ultimo_dia_dca, valor_bruto_final, corregido)
+        sharpe = cagr / volatilidad if volatilidad > 0 else 0.0
+        
+        # TIR como _tir_aportaciones, con los tiempos ya calculados
+        tir = 0.0
+        if num_compras:
+            flujos = np.append(np.full(num_compras, -self.aportacion), valor_tras_venta - impuestos_activo)
+            tir = calcular_tir(flujos, np.append(self._años[indices], años))
+        twr = 0.0
+        if num_compras and fin > 0:
+            factor_final = valor_bruto_final / self._solo_activo[fin - 1] if corregido else 1.0
+            twr = (self._twr_acumulado[fin - corregido] * factor_final - 1) * 100
+        
+        # Curvas: vistas del prefijo salvo que haya que corregir el último día
+        if corregido:
+            efectivo = None
+            if self._efectivo is not None:
+                efectivo = self._efectivo[:fin + 1].copy()
+                efectivo[-1] = self._pendiente_tras_k[num_compras] + self._intereses[fin]
+            curvas_coste = _curvas_por_coste(precios, indices, self.aportacion, self.niveles_coste, efectivo)
+            valores_solo_activo = self._serie_solo_activo.iloc[:fin + 1].copy()
+            valores_solo_activo.iloc[-1] = valor_bruto_final
+            valores = valores_solo_activo
+            if efectivo is not None:
+                valores = self._serie_valores.iloc[:fin + 1].copy()
+                valores.iloc[-1] = valor_bruto_final + self._pendiente_tras_k[num_compras] + self._intereses[fin]
+        else:
+            curvas_coste = {clave: valor if clave == 'niveles' else valor[:, :fin + 1] for clave, valor in self._curvas_coste.items()}
+            valores_solo_activo = self._serie_solo_activo.iloc[:fin + 1]
+            valores = self._serie_valores.iloc[:fin + 1]
+        
+        if self.modo == 'lump_sum':
+            coste_compra = self.capital * (comision + slippage)
+            precio_medio = self._valores_precio[0]
+        else:
+            coste_compra = self._comisiones_tras_k[num_compras] + self._slippage_tras_k[num_compras]
+            precio_medio = libro.precio_medio()
+        
+        resultado = {
+            'valores': valores,
+            'valores_solo_activo': valores_solo_activo,
+            'valor_bruto': valor_bruto_final,
+            'valor_tras_venta': valor_tras_venta,
+            'valor_neto': valor_neto,
+            'rentabilidad': rentabilidad,
+            'cagr': cagr,
+            'tir': tir,
+            'twr': twr,
+            'max_drawdown': max_dd,
+            'fecha_pico_dd': fechas[pico],
+            'fecha_valle_dd': fechas[valle],
+            'volatilidad': volatilidad,
+            'sharpe': sharpe,
+            'base_coste': base_coste,
+            'plusvalia': plusvalia,
+            'impuestos': impuestos_totales,
+            'desglose_impuestos': desglose_imp,
+            'tipo_efectivo': (impuestos_activo / plusvalia * 100) if plusvalia > 0 else 0,
+            'comision_compra': self._comisiones_tras_k[num_compras] if self.modo != 'lump_sum' else self.capital * comision,
+            'slippage_compra': self._slippage_tras_k[num_compras] if self.modo != 'lump_sum' else self.capital * slippage,
+            'comision_venta': valor_bruto_final * comision,
+            'slippage_venta': valor_bruto_final * slippage,
+            'costes_transaccion': coste_compra + coste_venta,
+            'coste_total': coste_compra + coste_venta + impuestos_totales,
+            'num_operaciones': num_compras + 1,
+            'precio_medio': precio_medio,
+            'años': años,
+            'intereses_monetario': intereses_monetario,
+            'impuestos_intereses': impuestos_intereses,
+            'capital_invertido': base_coste,
+            'capital_total_aportado': self.capital if self.modo != 'aportacion_periodica' else capital_invertido_total,
+            'curvas_coste': curvas_coste,
+            'operaciones': libro
+        }
+        if self.modo != 'lump_sum':
+            resultado.update({
+                'impuestos_activo': impuestos_activo,
+                'dias_dca': ultimo_dia_dca,
+                'aportacion_mensual': self.aportacion,
+                'modo': self.modo
+            })
+        return resultado
@@ -0,0 +1,91 @@
+"""
+Tiempos por etapa con registro estructurado (una línea JSON por evento).
+
+Cada ejecución (un rerun del dashboard, un proceso por lotes) crea un Cronometro
+y envuelve sus etapas en `with cronometro.etapa('nombre'):`. Al cerrar cada
+etapa se emite por el logger 'lump_sum.tiempos' su duración y los datos
+anotados (acierto o fallo de caché, tamaños...); cerrar() emite el resumen de
+la ejecución. Sin handlers configurados no se escribe nada: el destino lo
+decide el programa.
+
+anotar(**datos) añade datos a la etapa abierta más interna del hilo actual, así
+las funciones cacheadas y CacheLRU pueden marcar aciertos y fallos sin recibir
+el cronómetro.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+
+REGISTRO = logging.getLogger('lump_sum.tiempos')
+
+# Etapas abiertas de cada hilo (la última es la más interna)
+_local = threading.local()
+
+
+def _etapas_abiertas() -> list:
+    if not hasattr(_local, 'etapas'):
+        _local.etapas = []
+    return _local.etapas
+
+
+def anotar(**datos):
+    """Añade datos a la etapa abierta más interna del hilo actual (sin etapa abierta no hace nada)."""
+    etapas = _etapas_abiertas()
+    if etapas:
+        etapas[-1].update(datos)
+
+
+class Cronometro:
+    """
+    Duración de las etapas de una ejecución.
+    
+    contexto (ticker, modo...) se añade a cada línea de registro. etapas guarda
+    los registros en orden de cierre: {'etapa', 'duracion_ms', ...datos anotados}.
+    """
+    
+    def __init__(self, ejecucion: str = None, **contexto):
+        self.ejecucion = ejecucion or uuid.uuid4().hex[:12]
+        self.contexto = contexto
+        self.etapas: list[dict] = []
+        self._inicio = time.perf_counter()
+    
+    @contextmanager
+    def etapa(self, nombre: str, **datos):
+        """Mide el bloque; el diccionario que devuelve admite más datos para el registro."""
+        registro = {'etapa': nombre, **datos}
+        abiertas = _etapas_abiertas()
+        abiertas.append(registro)
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro['duracion_ms'] = (time.perf_counter() - inicio) * 1000
+            abiertas.pop()
+            self.etapas.append(registro)
+            self._emitir('etapa', registro)
+    
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self._inicio) * 1000
+    
+    def resumen(self) -> dict:
+        """Ejecución, contexto, tiempo total y registros de las etapas cerradas."""
+        return {'ejecucion': self.ejecucion, **self.contexto, 'total_ms': self.total_ms(), 'etapas': list(self.etapas)}
+    
+    def cerrar(self) -> dict:
+        """Emite el resumen de la ejecución (duración por etapa) y lo devuelve."""
+        resumen = self.resumen()
+        self._emitir('ejecucion', {
+            'total_ms': resumen['total_ms'],
+            'etapas': {registro['etapa']: registro['duracion_ms'] for registro in self.etapas}
+        })
+        return resumen
+    
+    def _emitir(self, evento: str, datos: dict):
+        if REGISTRO.isEnabledFor(logging.INFO):
+            linea = {'evento': evento, 'ejecucion': self.ejecucion, **self.contexto, **datos}
+            REGISTRO.info(json.dumps(linea, default=str, ensure_ascii=False))
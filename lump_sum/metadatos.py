@@ -0,0 +1,70 @@
+"""
+Carga de metadatos en segundo plano.
+
+Los metadatos (nombre, divisa, tipo de activo) se piden aparte de los precios y
+en hilos propios, de modo que la simulación y los gráficos no esperan por
+ellos. Los resultados correctos se guardan en memoria durante mucho más tiempo
+que los precios; los errores no se guardan y se reintentan en la siguiente
+petición.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .proveedores import ProveedorPrecios
+
+
+# Los metadatos apenas cambian: una semana por defecto
+TTL_METADATOS = 7 * 24 * 3600
+
+
+class CargadorMetadatos:
+    """Pide metadatos en segundo plano y los mantiene en memoria durante ttl segundos."""
+    
+    def __init__(self, proveedor: ProveedorPrecios, ttl: float = TTL_METADATOS, max_hilos: int = 4):
+        self.proveedor = proveedor
+        self.ttl = ttl
+        self._ejecutor = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix='metadatos')
+        self._futuros: dict[str, tuple[float, Future]] = {}
+        self._lock = threading.Lock()
+    
+    def solicitar(self, ticker: str) -> Future:
+        """Devuelve el Future del ticker, lanzando la carga si no hay uno válido."""
+        ticker = ticker.upper().strip()
+        with self._lock:
+            entrada = self._futuros.get(ticker)
+            if entrada is not None:
+                lanzado, futuro = entrada
+                if not futuro.done():
+                    return futuro
+                if futuro.exception() is None and time.time() - lanzado < self.ttl:
+                    return futuro
+            futuro = self._ejecutor.submit(self.proveedor.metadatos, ticker)
+            self._futuros[ticker] = (time.time(), futuro)
+            return futuro
+    
+    def estado(self, ticker: str) -> str:
+        """
+        Estado de la última carga sin lanzar ninguna: 'sin_pedir', 'cargando',
+        'listo' o 'error'. Permite sondear sin reintentar una carga fallida.
+        """
+        with self._lock:
+            entrada = self._futuros.get(ticker.upper().strip())
+        if entrada is None:
+            return 'sin_pedir'
+        futuro = entrada[1]
+        if not futuro.done():
+            return 'cargando'
+        return 'listo' if futuro.exception() is None else 'error'
+    
+    def obtener(self, ticker: str, espera: float = 0.0) -> dict | None:
+        """
+        Metadatos si están disponibles en 'espera' segundos (0 = sin bloquear).
+        None si aún no han llegado o la carga ha fallado.
+        """
+        futuro = self.solicitar(ticker)
+        try:
+            return futuro.result(timeout=espera)
+        except Exception:
+            return None
@@ -0,0 +1,172 @@
+"""
+Métricas de rentabilidad y riesgo sobre series de valor.
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import datetime
+
+
+def calcular_metricas(
+    valores: np.ndarray,
+    años,
+    valor_inicial=None,
+    valor_final=None
+) -> dict:
+    """
+    Núcleo de métricas sobre un array de valores (1-D) o una matriz (curvas × días).
+    
+    Devuelve max_drawdown (%) con las posiciones de pico y valle, volatilidad
+    anualizada (%), CAGR (%) y Sharpe (CAGR / volatilidad, rf = 0). El CAGR se
+    calcula entre valor_inicial y valor_final (por defecto primer y último valor
+    de cada curva); años, valor_inicial y valor_final admiten un valor por curva.
+    Con entrada 1-D devuelve escalares; con 2-D, arrays de longitud n_curvas.
+    """
+    valores = np.asarray(valores, dtype=float)
+    unidimensional = valores.ndim == 1
+    valores = np.atleast_2d(valores)
+    n_curvas, n_dias = valores.shape
+    filas = np.arange(n_curvas)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Drawdown frente al máximo acumulado; el pico es la primera aparición de ese máximo
+        maximo = np.maximum.accumulate(valores, axis=1)
+        drawdowns = (valores - maximo) / maximo
+        idx_valle = np.argmin(drawdowns, axis=1)
+        max_dd = drawdowns[filas, idx_valle] * 100
+        nuevo_maximo = np.ones_like(valores, dtype=bool)
+        nuevo_maximo[:, 1:] = valores[:, 1:] > maximo[:, :-1]
+        posicion_maximo = np.maximum.accumulate(np.where(nuevo_maximo, np.arange(n_dias), 0), axis=1)
+        idx_pico = posicion_maximo[filas, idx_valle]
+        
+        drawdown_valido = (n_dias >= 2) & (valores[:, 0] != 0)
+        max_dd = np.where(drawdown_valido, max_dd, 0.0)
+        idx_pico = np.where(drawdown_valido, idx_pico, 0)
+        idx_valle = np.where(drawdown_valido, idx_valle, 0)
+        
+        # Volatilidad de los retornos diarios (se descartan los NaN, como pct_change().dropna())
+        retornos = valores[:, 1:] / valores[:, :-1] - 1
+        validos = ~np.isnan(retornos)
+        n_retornos = validos.sum(axis=1)
+        media = np.where(validos, retornos, 0.0).sum(axis=1) / n_retornos
+        varianza = np.where(validos, (retornos - media[:, None]) ** 2, 0.0).sum(axis=1) / (n_retornos - 1)
+        volatilidad = np.where(n_retornos > 1, np.sqrt(varianza) * np.sqrt(252) * 100, 0.0)
+        
+        # CAGR y Sharpe
+        valor_inicial = valores[:, 0] if valor_inicial is None else np.broadcast_to(np.asarray(valor_inicial, dtype=float), (n_curvas,))
+        valor_final = valores[:, -1] if valor_final is None else np.broadcast_to(np.asarray(valor_final, dtype=float), (n_curvas,))
+        años = np.broadcast_to(np.asarray(años, dtype=float), (n_curvas,))
+        cagr_valido = (valor_inicial > 0) & (años > 0) & (valor_final > 0)
+        cagr = np.where(cagr_valido, ((valor_final / valor_inicial) ** (1 / años) - 1) * 100, 0.0)
+        sharpe = np.where(volatilidad > 0, cagr / volatilidad, 0.0)
+    
+    metricas = {
+        'max_drawdown': max_dd,
+        'idx_pico': idx_pico,
+        'idx_valle': idx_valle,
+        'volatilidad': volatilidad,
+        'cagr': cagr,
+        'sharpe': sharpe
+    }
+    if unidimensional:
+        return {clave: valor[0].item() for clave, valor in metricas.items()}
+    return metricas
+
+
+def calcular_max_drawdown(serie: pd.Series) -> tuple[float, datetime, datetime]:
+    """Calcula Maximum Drawdown sobre una serie."""
+    if len(serie) < 2 or serie.iloc[0] == 0:
+        return 0.0, serie.index[0], serie.index[0]
+    
+    metricas = calcular_metricas(serie.to_numpy(dtype=float), 0)
+    return metricas['max_drawdown'], serie.index[metricas['idx_pico']], serie.index[metricas['idx_valle']]
+
+
+def calcular_cagr(valor_inicial: float, valor_final: float, años: float) -> float:
+    """Calcula CAGR."""
+    if valor_inicial <= 0 or años <= 0 or valor_final <= 0:
+        return 0.0
+    return ((valor_final / valor_inicial) ** (1 / años) - 1) * 100
+
+
+def calcular_twr_diario(valores: np.ndarray, flujos: np.ndarray):
+    """
+    TWR acumulado (%) encadenando factores diarios, sobre 1-D o matriz (curvas × días).
+    
+    flujos[d] es el dinero aportado el día d, antes del cierre: el factor del día
+    es valores[d] / (valores[d-1] + flujos[d]). Así los costes de compra cuentan
+    como pérdida y el momento de las aportaciones no influye.
+    """
+    valores = np.asarray(valores, dtype=float)
+    flujos = np.broadcast_to(np.asarray(flujos, dtype=float), valores.shape)
+    unidimensional = valores.ndim == 1
+    valores = np.atleast_2d(valores)
+    flujos = np.atleast_2d(flujos)
+    
+    anterior = np.concatenate((np.zeros((valores.shape[0], 1)), valores[:, :-1]), axis=1)
+    base = anterior + flujos
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factores = np.where(base > 0, valores / base, 1.0)
+    twr = (np.prod(factores, axis=1) - 1) * 100
+    return twr[0].item() if unidimensional else twr
+
+
+def calcular_twr(valores: pd.Series, flujos: list, indices_flujo: list) -> float:
+    """
+    Calcula Time-Weighted Return (TWR).
+    Elimina el efecto del timing de los flujos de caja.
+    """
+    if len(flujos) == 0 or len(valores) < 2:
+        return 0.0
+    
+    flujos_diarios = np.zeros(len(valores))
+    np.add.at(flujos_diarios, np.asarray(indices_flujo, dtype=np.int64), np.asarray(flujos, dtype=float))
+    return calcular_twr_diario(valores.to_numpy(dtype=float), flujos_diarios)
+
+
+def calcular_tir(flujos: np.ndarray, tiempos: np.ndarray, max_iteraciones: int = 100, tolerancia: float = 1e-12):
+    """
+    TIR anualizada (%) ponderada por dinero (XIRR), vectorizada sobre muchos escenarios.
+    
+    flujos: (..., K) importes (negativos = aportaciones, positivos = reembolsos).
+    tiempos: años desde el inicio de cada flujo, con forma compatible con flujos.
+    Resuelve sum(F_k · (1 + r)^-t_k) = 0 con Newton sobre ln(1 + r), protegido
+    por bisección dentro de [-99,3 %, +14.700 %]. NaN si no hay cambio de signo.
+    Cada escenario deja de iterar al converger, así su TIR no depende de con
+    qué otros escenarios se resuelva (lotes, procesos).
+    """
+    flujos = np.asarray(flujos, dtype=float)
+    tiempos = np.broadcast_to(np.asarray(tiempos, dtype=float), flujos.shape)
+    forma = flujos.shape[:-1]
+    flujos = flujos.reshape(-1, flujos.shape[-1])
+    tiempos = tiempos.reshape(-1, tiempos.shape[-1])
+    
+    def valor_actual(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        descuento = flujos * np.exp(-x[:, None] * tiempos)
+        return descuento.sum(axis=1), -(descuento * tiempos).sum(axis=1)
+    
+    bajo = np.full(len(flujos), -5.0)
+    alto = np.full(len(flujos), 5.0)
+    signo_bajo = np.sign(valor_actual(bajo)[0])
+    valido = signo_bajo * np.sign(valor_actual(alto)[0]) < 0
+    
+    x = np.zeros(len(flujos))
+    activos = valido.copy()
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for _ in range(max_iteraciones):
+            f, derivada = valor_actual(x)
+            mismo_signo = np.sign(f) == signo_bajo
+            bajo = np.where(mismo_signo, x, bajo)
+            alto = np.where(mismo_signo, alto, x)
+            newton = x - f / derivada
+            fuera = ~np.isfinite(newton) | (newton <= bajo) | (newton >= alto)
+            x_nuevo = np.where(fuera, (bajo + alto) / 2, newton)
+            convergido = np.abs(x_nuevo - x) < tolerancia
+            # Los convergidos se congelan: seguir iterando movería sus últimos bits
+            x = np.where(activos, x_nuevo, x)
+            activos &= ~convergido
+            if not activos.any():
+                break
+    
+    tir = np.where(valido, np.expm1(x) * 100, np.nan).reshape(forma)
+    return tir.item() if tir.ndim == 0 else tir
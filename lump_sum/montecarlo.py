@@ -0,0 +1,185 @@
+"""
+Monte Carlo LS vs DCA sobre caminos sintéticos (block bootstrap).
+
+Un backtest histórico es un único camino. Aquí se generan caminos de precios
+remuestreando bloques de retornos logarítmicos diarios del activo (bootstrap por
+bloques circular: conserva la autocorrelación y los episodios de volatilidad
+dentro de cada bloque) y se evalúan LS y DCA sobre todos a la vez con el núcleo
+vectorizado de los estudios, en una matriz (caminos × días).
+
+Los caminos empiezan en el último precio y siguen un calendario de días
+laborables desde la última fecha (sin festivos). Se procesan por lotes para
+acotar la memoria; los bloques de todos los caminos se sortean antes de empezar,
+así una misma semilla da el mismo resultado con cualquier tamaño de lote.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .calendario import posiciones_compra, regla_por_momento
+from .estudios import _rentabilidades_ls_dca
+from .paralelo import EjecutorProcesos
+
+
+# Memoria aproximada por lote: precios, retornos, índices y tiempos de cada camino (8 bytes por valor)
+MEMORIA_LOTE_MB = 64
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def sortear_bloques(num_caminos: int, dias_horizonte: int, tamaño_bloque: int, n_retornos: int, semilla=None) -> np.ndarray:
+    """Inicio de cada bloque de cada camino (num_caminos, bloques por camino), reproducible con semilla."""
+    if tamaño_bloque < 1:
+        raise ValueError("tamaño_bloque debe ser al menos 1")
+    n_bloques = -(-dias_horizonte // tamaño_bloque)
+    return np.random.default_rng(semilla).integers(0, n_retornos, size=(num_caminos, n_bloques))
+
+
+def caminos_bootstrap(
+    retornos_log: np.ndarray,
+    inicios_bloques: np.ndarray,
+    dias_horizonte: int,
+    tamaño_bloque: int,
+    precio_inicial: float = 1.0
+) -> np.ndarray:
+    """
+    Caminos de precios (caminos × dias_horizonte + 1) a partir de los bloques sorteados.
+    
+    Cada bloque son tamaño_bloque retornos consecutivos desde su inicio, dando la
+    vuelta al final de la serie; los bloques se encadenan y se recortan al horizonte.
+    """
+    retornos_log = np.asarray(retornos_log, dtype=float)
+    posiciones = (inicios_bloques[:, :, None] + np.arange(tamaño_bloque)) % len(retornos_log)
+    retornos = retornos_log[posiciones.reshape(len(inicios_bloques), -1)[:, :dias_horizonte]]
+    caminos = np.empty((len(inicios_bloques), dias_horizonte + 1))
+    caminos[:, 0] = 0.0
+    np.cumsum(retornos, axis=1, out=caminos[:, 1:])
+    return precio_inicial * np.exp(caminos)
+
+
+def simular_caminos(
+    caminos: np.ndarray,
+    fechas: pd.DatetimeIndex,
+    capital: float,
+    meses_dca: int,
+    comision: float,
+    slippage: float,
+    tasa_monetario: float = 0.0,
+    modo_dca: str = 'capital_disponible',
+    calendario: str = 'primer_dia_mes',
+    aportacion_mensual: float = None
+) -> dict:
+    """
+    LS y DCA sobre cada fila de caminos (caminos × días), todas con el calendario fechas.
+    
+    Devuelve arrays de longitud num_caminos: rentabilidad_ls, rentabilidad_dca,
+    tir_ls y tir_dca, con la misma lógica de costes e IRPF que los simuladores.
+    """
+    num_caminos, n_dias = caminos.shape
+    dias_horizonte = n_dias - 1
+    inicios = np.arange(num_caminos) * n_dias
+    
+    # Mismas compras en todos los caminos, desplazadas a la fila de cada uno
+    posiciones_camino = posiciones_compra(fechas, np.array([0]), meses_dca, calendario)[0]
+    posiciones = np.where(
+        posiciones_camino[None, :] < n_dias, inicios[:, None] + posiciones_camino[None, :], caminos.size
+    )
+    tiempos = np.tile((fechas - fechas[0]).days.to_numpy() / 365.25, num_caminos)
+    
+    resultado = _rentabilidades_ls_dca(
+        caminos.ravel(), inicios, dias_horizonte, np.array([meses_dca]), np.array([comision + slippage]),
+        capital, tasa_monetario, modo_dca, posiciones, aportacion_mensual, tiempos=tiempos
+    )
+    return {clave: valor[0, :, 0] for clave, valor in resultado.items()}
+
+
+def _lote_caminos(arrays: dict, tarea: tuple) -> dict:
+    """Tarea del pool: genera un lote de caminos con los retornos compartidos y lo simula."""
+    inicios_bloques, dias_horizonte, tamaño_bloque, fechas, parametros = tarea
+    caminos = caminos_bootstrap(
+        arrays['retornos_log'], inicios_bloques, dias_horizonte, tamaño_bloque, float(arrays['precio_inicial'][0])
+    )
+    return simular_caminos(caminos, fechas, **parametros)
+
+
+def _percentiles(valores: np.ndarray) -> dict:
+    return {p: float(v) for p, v in zip(PERCENTILES, np.percentile(valores, PERCENTILES))}
+
+
+def monte_carlo_ls_dca(
+    precios: pd.Series,
+    dias_horizonte: int,
+    capital: float,
+    meses_dca: int,
+    comision: float,
+    slippage: float,
+    tasa_monetario: float = 0.0,
+    modo_dca: str = 'capital_disponible',
+    aportacion_inicio_mes: bool = True,
+    aportacion_mensual: float = None,
+    calendario: str = None,
+    num_caminos: int = 1000,
+    tamaño_bloque: int = 21,
+    semilla: int = None,
+    caminos_por_lote: int = None,
+    num_procesos: int = 1
+) -> dict:
+    """
+    Distribución de LS vs DCA sobre num_caminos caminos sintéticos de dias_horizonte sesiones.
+    
+    Parámetros de la estrategia como en estudio_ventanas_moviles. tamaño_bloque
+    son las sesiones de cada bloque del bootstrap (21 ≈ un mes); caminos_por_lote
+    acota la memoria (por defecto, unos MEMORIA_LOTE_MB por lote). Con
+    num_procesos > 1 (None = todos los núcleos) los lotes se reparten en un pool
+    de procesos; el resultado es idéntico con cualquier lote o número de procesos.
+    
+    Devuelve arrays por camino (rentabilidad_ls, rentabilidad_dca, diferencia_pp,
+    tir_ls, tir_dca), la probabilidad de que LS gane (win_rate_ls, %) y
+    percentiles 5/25/50/75/95 de rentabilidades y ventaja de LS.
+    """
+    valores_precio = precios.to_numpy(dtype=float)
+    if len(valores_precio) < 2 or dias_horizonte < 1:
+        raise ValueError("Hacen falta al menos dos precios y un horizonte de al menos un día")
+    if num_caminos < 1:
+        raise ValueError("num_caminos debe ser al menos 1")
+    
+    retornos_log = np.diff(np.log(valores_precio))
+    inicios_bloques = sortear_bloques(num_caminos, dias_horizonte, tamaño_bloque, len(retornos_log), semilla)
+    fechas = pd.bdate_range(precios.index[-1], periods=dias_horizonte + 1)
+    regla = calendario or regla_por_momento(aportacion_inicio_mes)
+    ejecutor = EjecutorProcesos(num_procesos, {'retornos_log': retornos_log, 'precio_inicial': valores_precio[-1:]})
+    if caminos_por_lote is None:
+        caminos_por_lote = max(1, MEMORIA_LOTE_MB * 2**20 // (4 * 8 * (dias_horizonte + 1)))
+        if ejecutor.num_procesos > 1:
+            # Varios lotes por proceso para repartir bien la carga
+            caminos_por_lote = min(caminos_por_lote, -(-num_caminos // (4 * ejecutor.num_procesos)))
+    
+    parametros = {
+        'capital': capital, 'meses_dca': meses_dca, 'comision': comision, 'slippage': slippage,
+        'tasa_monetario': tasa_monetario, 'modo_dca': modo_dca, 'calendario': regla,
+        'aportacion_mensual': aportacion_mensual
+    }
+    lotes = [slice(inicio, inicio + caminos_por_lote) for inicio in range(0, num_caminos, caminos_por_lote)]
+    tareas = ((inicios_bloques[lote], dias_horizonte, tamaño_bloque, fechas, parametros) for lote in lotes)
+    
+    claves = ('rentabilidad_ls', 'rentabilidad_dca', 'tir_ls', 'tir_dca')
+    resultados = {clave: np.empty(num_caminos) for clave in claves}
+    for lote, resultado_lote in zip(lotes, ejecutor.mapear(_lote_caminos, tareas)):
+        for clave in claves:
+            resultados[clave][lote] = resultado_lote[clave]
+    
+    diferencia_pp = resultados['rentabilidad_ls'] - resultados['rentabilidad_dca']
+    return {
+        **resultados,
+        'diferencia_pp': diferencia_pp,
+        'num_caminos': num_caminos,
+        'win_rate_ls': float((diferencia_pp > 0).mean() * 100),
+        'diferencia_media': float(diferencia_pp.mean()),
+        'diferencia_mediana': float(np.median(diferencia_pp)),
+        'percentiles_pp': _percentiles(diferencia_pp),
+        'percentiles_ls': _percentiles(resultados['rentabilidad_ls']),
+        'percentiles_dca': _percentiles(resultados['rentabilidad_dca']),
+        'dias_horizonte': dias_horizonte,
+        'tamaño_bloque': tamaño_bloque,
+        'semilla': semilla,
+        'modo': modo_dca
+    }
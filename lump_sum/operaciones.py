@@ -0,0 +1,195 @@
+"""
+Libro de operaciones con lotes FIFO (criterio fiscal español).
+
+Cada compra es un lote con su precio, participaciones, importe pagado
+(comisión y slippage incluidos, que forman parte del valor de adquisición) y
+costes. En España las participaciones homogéneas se venden por orden de
+adquisición (FIFO): una venta consume primero los lotes más antiguos y su
+ganancia es el importe neto de la venta menos el coste de la parte consumida
+de cada lote.
+
+Las compras y ventas se guardan en arrays estructurados numpy y el reparto de
+cada venta entre lotes se calcula sobre las participaciones acumuladas, sin
+recorrer los lotes uno a uno.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+DTYPE_COMPRA = np.dtype([
+    ('dia', np.int64),
+    ('precio', np.float64),
+    ('participaciones', np.float64),
+    ('importe', np.float64),
+    ('comision', np.float64),
+    ('slippage', np.float64),
+])
+
+DTYPE_VENTA = np.dtype([
+    ('dia', np.int64),
+    ('precio', np.float64),
+    ('participaciones', np.float64),
+    ('importe_bruto', np.float64),
+    ('comision', np.float64),
+    ('slippage', np.float64),
+    ('importe_neto', np.float64),
+    ('coste_adquisicion', np.float64),
+    ('ganancia', np.float64),
+])
+
+
+def fracciones_fifo(participaciones_lotes: np.ndarray, vendidas: np.ndarray) -> np.ndarray:
+    """
+    Fracción consumida de cada lote tras vender, en total, vendidas participaciones.
+    
+    vendidas admite un array de acumulados (uno por fila del resultado, forma
+    vendidas × lotes). Los lotes que terminan antes del acumulado cuentan como
+    consumidos del todo (fracción exactamente 1, sin error de redondeo).
+    """
+    participaciones_lotes = np.asarray(participaciones_lotes, dtype=float)
+    vendidas = np.asarray(vendidas, dtype=float)[..., None]
+    fin_lote = np.cumsum(participaciones_lotes)
+    inicio_lote = fin_lote - participaciones_lotes
+    with np.errstate(divide='ignore', invalid='ignore'):
+        parcial = np.clip((vendidas - inicio_lote) / participaciones_lotes, 0.0, 1.0)
+    # Un lote vacío (0/0) siempre cae en la primera condición
+    return np.where(fin_lote <= vendidas, 1.0, parcial)
+
+
+class LibroOperaciones:
+    """
+    Compras (lotes) y ventas de un activo sobre un calendario de fechas.
+    
+    compras y ventas son arrays estructurados (DTYPE_COMPRA, DTYPE_VENTA) con
+    el día como posición en fechas. Las operaciones se registran en orden
+    cronológico.
+    """
+    
+    def __init__(self, fechas: pd.DatetimeIndex):
+        self.fechas = fechas
+        self.compras = np.empty(0, dtype=DTYPE_COMPRA)
+        self.ventas = np.empty(0, dtype=DTYPE_VENTA)
+    
+    def __len__(self) -> int:
+        return len(self.compras) + len(self.ventas)
+    
+    def _ultimo_dia(self) -> int:
+        dias = np.concatenate((self.compras['dia'][-1:], self.ventas['dia'][-1:]))
+        return int(dias.max()) if len(dias) else -1
+    
+    def comprar(self, dias, precios, importes, comision: float, slippage: float) -> np.ndarray:
+        """
+        Registra compras de importes (coste incluido) a precios en los días dados.
+        
+        importes admite un escalar para aportaciones iguales. Devuelve las
+        participaciones compradas en cada una.
+        """
+        dias = np.atleast_1d(np.asarray(dias, dtype=np.int64))
+        precios = np.atleast_1d(np.asarray(precios, dtype=float))
+        importes = np.broadcast_to(np.asarray(importes, dtype=float), dias.shape)
+        if len(dias) and (np.any(np.diff(dias) < 0) or dias[0] < self._ultimo_dia()):
+            raise ValueError("Las operaciones deben registrarse en orden cronológico")
+        
+        nuevas = np.empty(len(dias), dtype=DTYPE_COMPRA)
+        nuevas['dia'] = dias
+        nuevas['precio'] = precios
+        nuevas['participaciones'] = (importes - importes * (comision + slippage)) / precios
+        nuevas['importe'] = importes
+        nuevas['comision'] = importes * comision
+        nuevas['slippage'] = importes * slippage
+        self.compras = np.concatenate((self.compras, nuevas)) if len(self.compras) else nuevas
+        return nuevas['participaciones']
+    
+    def participaciones_abiertas(self) -> float:
+        """Participaciones compradas y aún no vendidas."""
+        return float(self.compras['participaciones'].sum() - self.ventas['participaciones'].sum())
+    
+    def _vendidas_acumuladas(self) -> np.ndarray:
+        return np.concatenate(([0.0], np.cumsum(self.ventas['participaciones'])))
+    
+    def vender(self, dia: int, precio: float, participaciones: float, comision: float, slippage: float) -> np.void:
+        """
+        Registra una venta y calcula su coste de adquisición FIFO y su ganancia.
+        
+        Devuelve la fila de la venta (importe_bruto, importe_neto, coste_adquisicion, ganancia...).
+        """
+        if dia < self._ultimo_dia():
+            raise ValueError("Las operaciones deben registrarse en orden cronológico")
+        vendidas_antes = self._vendidas_acumuladas()[-1]
+        compradas_hasta = self.compras['participaciones'][self.compras['dia'] <= dia].sum()
+        if participaciones > compradas_hasta - vendidas_antes + 1e-9 * max(1.0, compradas_hasta):
+            raise ValueError(f"Venta de {participaciones} participaciones con {compradas_hasta - vendidas_antes} abiertas")
+        
+        # Parte de cada lote que consume la venta: diferencia de fracciones antes y después
+        fracciones = fracciones_fifo(self.compras['participaciones'], [vendidas_antes, vendidas_antes + participaciones])
+        coste_adquisicion = float(((fracciones[1] - fracciones[0]) * self.compras['importe']).sum())
+        
+        importe_bruto = participaciones * precio
+        coste_venta = importe_bruto * (comision + slippage)
+        venta = np.zeros(1, dtype=DTYPE_VENTA)
+        venta['dia'] = dia
+        venta['precio'] = precio
+        venta['participaciones'] = participaciones
+        venta['importe_bruto'] = importe_bruto
+        venta['comision'] = importe_bruto * comision
+        venta['slippage'] = importe_bruto * slippage
+        venta['importe_neto'] = importe_bruto - coste_venta
+        venta['coste_adquisicion'] = coste_adquisicion
+        venta['ganancia'] = venta['importe_neto'] - coste_adquisicion
+        self.ventas = np.concatenate((self.ventas, venta)) if len(self.ventas) else venta
+        return self.ventas[-1]
+    
+    def consumo_lotes(self) -> np.ndarray:
+        """Participaciones de cada lote (columnas) que consume cada venta (filas), según FIFO."""
+        fracciones = fracciones_fifo(self.compras['participaciones'], self._vendidas_acumuladas())
+        return np.diff(fracciones, axis=0) * self.compras['participaciones']
+    
+    def lotes_abiertos(self) -> pd.DataFrame:
+        """Lotes con participaciones pendientes de vender y su coste de adquisición pendiente."""
+        pendiente = 1.0 - fracciones_fifo(self.compras['participaciones'], self._vendidas_acumuladas()[-1])
+        abiertos = pendiente > 0
+        return pd.DataFrame({
+            'fecha': self.fechas[self.compras['dia'][abiertos]],
+            'precio': self.compras['precio'][abiertos],
+            'participaciones': (pendiente * self.compras['participaciones'])[abiertos],
+            'coste_adquisicion': (pendiente * self.compras['importe'])[abiertos],
+        })
+    
+    def precio_medio(self) -> float:
+        """Precio medio de compra ponderado por participaciones (0 sin compras)."""
+        if not len(self.compras):
+            return 0
+        return float(np.dot(self.compras['precio'], self.compras['participaciones']) / self.compras['participaciones'].sum())
+    
+    def a_dataframe(self) -> pd.DataFrame:
+        """
+        Libro completo en orden cronológico (a igualdad de día, compras antes que ventas).
+        
+        Columnas: fecha, tipo ('compra' / 'venta'), precio, participaciones,
+        importe (pagado en compras, neto en ventas), comision, slippage,
+        coste_adquisicion y ganancia (solo ventas).
+        """
+        compras = pd.DataFrame({
+            'dia': self.compras['dia'],
+            'tipo': 'compra',
+            'precio': self.compras['precio'],
+            'participaciones': self.compras['participaciones'],
+            'importe': self.compras['importe'],
+            'comision': self.compras['comision'],
+            'slippage': self.compras['slippage'],
+        })
+        ventas = pd.DataFrame({
+            'dia': self.ventas['dia'],
+            'tipo': 'venta',
+            'precio': self.ventas['precio'],
+            'participaciones': self.ventas['participaciones'],
+            'importe': self.ventas['importe_neto'],
+            'comision': self.ventas['comision'],
+            'slippage': self.ventas['slippage'],
+            'coste_adquisicion': self.ventas['coste_adquisicion'],
+            'ganancia': self.ventas['ganancia'],
+        })
+        libro = pd.concat([compras, ventas], ignore_index=True).sort_values('dia', kind='stable')
+        libro.insert(0, 'fecha', self.fechas[libro['dia'].to_numpy()])
+        return libro.drop(columns='dia').reset_index(drop=True)
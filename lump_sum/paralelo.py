@@ -0,0 +1,125 @@
+"""
+Ejecución en paralelo de lotes independientes con un pool de procesos.
+
+Los arrays grandes (precios, fechas, tiempos, retornos) se publican una sola vez
+en memoria compartida (multiprocessing.shared_memory) y cada worker los abre al
+arrancar como vistas numpy de solo lectura: las tareas solo llevan parámetros y
+rangos de posiciones, nunca copias de los precios. Los resultados se devuelven
+en el orden de las tareas, a medida que terminan las anteriores.
+
+Con num_procesos=1 todo se ejecuta en el proceso actual, sin pool ni memoria
+compartida (mismo resultado, útil para depurar).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# Arrays compartidos abiertos en cada worker (los rellena _inicializar_worker)
+_ARRAYS_WORKER: dict = {}
+_MEMORIA_WORKER = None
+
+ALINEACION = 64
+
+
+class ArraysCompartidos:
+    """
+    Copia un diccionario de arrays a un único bloque de memoria compartida.
+
+    descriptor es lo único que viaja a los workers (nombre del bloque, tipo,
+    forma y desplazamiento de cada array). El bloque se libera con cerrar() o al
+    salir del with.
+    """
+    
+    def __init__(self, arrays: dict):
+        arrays = {clave: np.ascontiguousarray(valor) for clave, valor in arrays.items()}
+        desplazamientos = {}
+        tamaño = 0
+        for clave, valor in arrays.items():
+            desplazamientos[clave] = tamaño
+            tamaño += -(-valor.nbytes // ALINEACION) * ALINEACION
+        
+        self._memoria = shared_memory.SharedMemory(create=True, size=max(tamaño, 1))
+        self.descriptor = {
+            'nombre': self._memoria.name,
+            'arrays': {clave: (valor.dtype.str, valor.shape, desplazamientos[clave]) for clave, valor in arrays.items()}
+        }
+        for clave, vista in _vistas(self._memoria, self.descriptor).items():
+            vista[...] = arrays[clave]
+    
+    def cerrar(self):
+        if self._memoria is not None:
+            self._memoria.close()
+            self._memoria.unlink()
+            self._memoria = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def _vistas(memoria: shared_memory.SharedMemory, descriptor: dict) -> dict:
+    """Vistas numpy sobre el bloque compartido según el descriptor."""
+    return {
+        clave: np.ndarray(forma, dtype=np.dtype(tipo), buffer=memoria.buf, offset=desplazamiento)
+        for clave, (tipo, forma, desplazamiento) in descriptor['arrays'].items()
+    }
+
+
+def abrir_arrays(descriptor: dict) -> tuple[shared_memory.SharedMemory, dict]:
+    """Abre un bloque ya creado y devuelve (memoria, vistas de solo lectura)."""
+    memoria = shared_memory.SharedMemory(name=descriptor['nombre'])
+    vistas = _vistas(memoria, descriptor)
+    for vista in vistas.values():
+        vista.flags.writeable = False
+    return memoria, vistas
+
+
+def _inicializar_worker(descriptor: dict):
+    global _MEMORIA_WORKER, _ARRAYS_WORKER
+    _MEMORIA_WORKER, _ARRAYS_WORKER = abrir_arrays(descriptor)
+
+
+def _ejecutar_tarea(funcion, tarea):
+    return funcion(_ARRAYS_WORKER, tarea)
+
+
+class EjecutorProcesos:
+    """
+    Reparte tareas independientes entre num_procesos procesos (por defecto, todos los núcleos).
+
+    mapear(funcion, tareas) llama a funcion(arrays, tarea) para cada tarea, con
+    arrays el diccionario compartido, y devuelve los resultados en orden. funcion
+    debe poder importarse desde un módulo (no lambdas ni funciones locales).
+    """
+    
+    def __init__(self, num_procesos: int = None, arrays: dict = None):
+        if num_procesos is not None and num_procesos < 1:
+            raise ValueError("num_procesos debe ser al menos 1")
+        self.num_procesos = num_procesos or os.cpu_count() or 1
+        self.arrays = arrays or {}
+    
+    def mapear(self, funcion, tareas, tareas_por_envio: int = 1):
+        """Iterador de resultados en el orden de tareas."""
+        if self.num_procesos == 1:
+            for tarea in tareas:
+                yield funcion(self.arrays, tarea)
+            return
+        
+        with ArraysCompartidos(self.arrays) as compartidos, ProcessPoolExecutor(
+            max_workers=self.num_procesos, initializer=_inicializar_worker, initargs=(compartidos.descriptor,)
+        ) as pool:
+            yield from pool.map(_ejecutar_tarea, repeat(funcion), tareas, chunksize=tareas_por_envio)
+
+
+def lotes(n: int, num_procesos: int, lotes_por_proceso: int = 4) -> list:
+    """Parte range(n) en slices contiguos: varios por proceso para equilibrar la carga."""
+    num_lotes = max(1, min(n, num_procesos * lotes_por_proceso if num_procesos > 1 else 1))
+    limites = np.linspace(0, n, num_lotes + 1).astype(np.int64)
+    return [slice(int(a), int(b)) for a, b in zip(limites[:-1], limites[1:])]
@@ -0,0 +1,157 @@
+"""
+Proveedores de precios y metadatos.
+
+Toda la aplicación (dashboard, CLI, benchmarks) obtiene los datos a través de
+un ProveedorPrecios, de modo que la fuente se puede cambiar sin tocar el resto:
+
+- ProveedorYFinance: Yahoo Finance (yfinance se importa solo al usarlo).
+- ProveedorFicheros: directorio local con <TICKER>.parquet / <TICKER>.csv y,
+  opcionalmente, <TICKER>.json con los metadatos. Funciona sin red.
+
+Los fallos se señalan con excepciones de ErrorDatos, nunca con None.
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import pandas as pd
+
+
+class ErrorDatos(Exception):
+    """Error base al obtener datos de mercado."""
+
+
+class TickerNoEncontrado(ErrorDatos):
+    """La fuente no tiene datos para el ticker."""
+
+
+class ErrorProveedor(ErrorDatos):
+    """Fallo de la fuente (red, formato, límite de peticiones...)."""
+
+
+class ProveedorPrecios(ABC):
+    """Interfaz común de las fuentes de precios y metadatos."""
+    
+    @abstractmethod
+    def precios(self, ticker: str, fecha_inicio: str = None) -> pd.Series:
+        """
+        Cierres ajustados desde fecha_inicio (toda la historia si es None),
+        con índice diario sin zona horaria. Puede estar vacía si no hay sesiones
+        en el rango; lanza TickerNoEncontrado si el ticker no existe.
+        """
+    
+    @abstractmethod
+    def metadatos(self, ticker: str) -> dict:
+        """Metadatos del activo (shortName, currency, quoteType...)."""
+
+
+class ProveedorYFinance(ProveedorPrecios):
+    """Yahoo Finance vía yfinance."""
+    
+    def precios(self, ticker: str, fecha_inicio: str = None) -> pd.Series:
+        import yfinance as yf
+        
+        try:
+            activo = yf.Ticker(ticker)
+            if fecha_inicio is None:
+                data = activo.history(period='max', auto_adjust=True)
+            else:
+                data = activo.history(start=fecha_inicio, auto_adjust=True)
+        except Exception as e:
+            raise ErrorProveedor(f"yfinance falló descargando {ticker}: {e}") from e
+        if data.empty:
+            if fecha_inicio is None:
+                raise TickerNoEncontrado(ticker)
+            return pd.Series(dtype=float, name='Close')
+        return normalizar_serie(data['Close'])
+    
+    def metadatos(self, ticker: str) -> dict:
+        import yfinance as yf
+        
+        try:
+            info = yf.Ticker(ticker).info
+        except Exception as e:
+            raise ErrorProveedor(f"yfinance falló leyendo metadatos de {ticker}: {e}") from e
+        if not info:
+            raise TickerNoEncontrado(ticker)
+        return info
+
+
+class ProveedorFicheros(ProveedorPrecios):
+    """Directorio local de ficheros <TICKER>.parquet|.csv (+ <TICKER>.json opcional)."""
+    
+    def __init__(self, directorio: str):
+        self.directorio = Path(directorio)
+    
+    def _ruta(self, ticker: str, extensiones: tuple) -> Path | None:
+        for extension in extensiones:
+            ruta = self.directorio / f"{ticker.upper()}{extension}"
+            if ruta.exists():
+                return ruta
+        return None
+    
+    def precios(self, ticker: str, fecha_inicio: str = None) -> pd.Series:
+        ruta = self._ruta(ticker, ('.parquet', '.csv'))
+        if ruta is None:
+            raise TickerNoEncontrado(f"{ticker} no está en {self.directorio}")
+        try:
+            if ruta.suffix == '.parquet':
+                tabla = pd.read_parquet(ruta)
+            else:
+                tabla = pd.read_csv(ruta, index_col=0, parse_dates=True)
+        except Exception as e:
+            raise ErrorProveedor(f"No se pudo leer {ruta}: {e}") from e
+        
+        columna = next((c for c in ('Close', 'cierre', 'close') if c in tabla.columns), tabla.columns[0])
+        serie = normalizar_serie(tabla[columna])
+        if fecha_inicio is not None:
+            serie = serie.loc[pd.Timestamp(fecha_inicio):]
+        return serie
+    
+    def metadatos(self, ticker: str) -> dict:
+        ruta = self._ruta(ticker, ('.json',))
+        if ruta is None:
+            if self._ruta(ticker, ('.parquet', '.csv')) is None:
+                raise TickerNoEncontrado(ticker)
+            return {'symbol': ticker.upper()}
+        try:
+            return json.loads(ruta.read_text(encoding='utf-8'))
+        except Exception as e:
+            raise ErrorProveedor(f"No se pudo leer {ruta}: {e}") from e
+    
+    def guardar(self, ticker: str, precios: pd.Series, metadatos: dict = None):
+        """Escribe un ticker en el directorio (útil para preparar datos offline)."""
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        normalizar_serie(precios).to_frame().to_csv(self.directorio / f"{ticker.upper()}.csv", index_label='Date')
+        if metadatos is not None:
+            (self.directorio / f"{ticker.upper()}.json").write_text(
+                json.dumps(metadatos, ensure_ascii=False, default=str), encoding='utf-8'
+            )
+
+
+def normalizar_serie(serie: pd.Series) -> pd.Series:
+    """Índice diario sin zona horaria, ordenado y sin duplicados."""
+    serie = serie.dropna().astype(float)
+    indice = pd.DatetimeIndex(serie.index)
+    if indice.tz is not None:
+        indice = indice.tz_localize(None)
+    serie = pd.Series(serie.values, index=indice.normalize(), name='Close')
+    return serie[~serie.index.duplicated(keep='last')].sort_index()
+
+
+def crear_proveedor(especificacion: str = None) -> ProveedorPrecios:
+    """
+    Crea un proveedor a partir de 'yfinance' o 'ficheros:<directorio>'.
+    Por defecto usa $LUMP_SUM_PROVEEDOR y, si no existe, yfinance.
+    """
+    especificacion = especificacion or os.environ.get('LUMP_SUM_PROVEEDOR', 'yfinance')
+    nombre, _, argumento = especificacion.partition(':')
+    if nombre == 'yfinance':
+        return ProveedorYFinance()
+    if nombre == 'ficheros':
+        if not argumento:
+            raise ValueError("El proveedor 'ficheros' necesita un directorio: ficheros:<directorio>")
+        return ProveedorFicheros(argumento)
+    raise ValueError(f"Proveedor desconocido: {especificacion!r}")
@@ -0,0 +1,185 @@
+"""
+Resultado compacto de una simulación.
+
+Los simuladores devuelven un diccionario de unas 30 claves con dos pd.Series
+diarias (valores y valores_solo_activo) y las curvas por nivel de coste. Para
+guardar miles de resultados (barridos, universos, lotes) ResultadoSimulacion
+conserva las métricas como campos de una clase con __slots__ y las curvas solo
+si se piden, como arrays float que comparten un único índice de fechas (junto
+con las curvas se conserva el libro de operaciones).
+
+Admite la lectura por clave de los diccionarios (resultado['rentabilidad'],
+resultado['valores']...), así el código que consume resultados funciona con
+ambos formatos.
+
+fila_resumen aplana un par LS/DCA en la fila de los resúmenes por escenario.
+"""
+
+from dataclasses import dataclass, fields
+
+import numpy as np
+import pandas as pd
+
+from .operaciones import LibroOperaciones
+
+
+# Claves que solo tienen los resultados DCA (None en Lump Sum)
+_CLAVES_DCA = ('impuestos_activo', 'aportacion_mensual', 'dias_dca', 'modo')
+# Detalle que solo se guarda con las curvas
+_CLAVES_DETALLE = ('curvas_coste', 'operaciones')
+
+
+@dataclass(slots=True)
+class ResultadoSimulacion:
+    """
+    Métricas de simular_lump_sum / simular_dca_* y, opcionalmente, sus curvas.
+    
+    curva y curva_solo_activo son los valores diarios sobre fechas (None sin
+    curvas); curva_solo_activo es None cuando coincide con curva (Lump Sum y
+    aportación periódica).
+    """
+    
+    valor_bruto: float
+    valor_tras_venta: float
+    valor_neto: float
+    rentabilidad: float
+    cagr: float
+    tir: float
+    twr: float
+    max_drawdown: float
+    fecha_pico_dd: pd.Timestamp
+    fecha_valle_dd: pd.Timestamp
+    volatilidad: float
+    sharpe: float
+    base_coste: float
+    plusvalia: float
+    impuestos: float
+    impuestos_intereses: float
+    desglose_impuestos: dict
+    tipo_efectivo: float
+    comision_compra: float
+    slippage_compra: float
+    comision_venta: float
+    slippage_venta: float
+    costes_transaccion: float
+    coste_total: float
+    num_operaciones: int
+    precio_medio: float
+    años: float
+    intereses_monetario: float
+    capital_invertido: float
+    capital_total_aportado: float
+    impuestos_activo: float = None
+    aportacion_mensual: float = None
+    dias_dca: int = None
+    modo: str = None
+    fechas: pd.DatetimeIndex = None
+    curva: np.ndarray = None
+    curva_solo_activo: np.ndarray = None
+    curvas_coste: dict = None
+    operaciones: LibroOperaciones = None
+    
+    @classmethod
+    def desde_dict(cls, resultado: dict, con_curvas: bool = False, fechas: pd.DatetimeIndex = None):
+        """
+        Compacta el diccionario de un simulador.
+        
+        Sin con_curvas solo se guardan las métricas. fechas permite compartir
+        un mismo índice entre muchos resultados (debe ser el de las curvas).
+        """
+        metricas = {campo: resultado.get(campo) for campo in _CAMPOS_METRICAS}
+        if not con_curvas:
+            return cls(**metricas)
+        
+        valores = resultado['valores']
+        solo_activo = resultado['valores_solo_activo']
+        return cls(
+            **metricas,
+            fechas=valores.index if fechas is None else fechas,
+            curva=valores.to_numpy(dtype=float),
+            curva_solo_activo=None if solo_activo is valores else solo_activo.to_numpy(dtype=float),
+            curvas_coste=resultado['curvas_coste'],
+            operaciones=resultado.get('operaciones')
+        )
+    
+    @property
+    def tiene_curvas(self) -> bool:
+        return self.curva is not None
+    
+    def _serie(self, valores: np.ndarray) -> pd.Series:
+        if valores is None:
+            raise KeyError("Resultado sin curvas: crear con con_curvas=True")
+        return pd.Series(valores, index=self.fechas)
+    
+    def __getitem__(self, clave: str):
+        """Lectura como el diccionario del simulador (valores y valores_solo_activo como pd.Series)."""
+        if clave == 'valores':
+            return self._serie(self.curva)
+        if clave == 'valores_solo_activo':
+            return self._serie(self.curva if self.curva_solo_activo is None else self.curva_solo_activo)
+        if clave in _CLAVES_DETALLE:
+            valor = getattr(self, clave)
+            if valor is None:
+                raise KeyError("Resultado sin curvas: crear con con_curvas=True")
+            return valor
+        if clave in ('fechas', 'curva', 'curva_solo_activo') or clave not in self.__slots__:
+            raise KeyError(clave)
+        valor = getattr(self, clave)
+        if valor is None and clave in _CLAVES_DCA:
+            raise KeyError(clave)
+        return valor
+    
+    def __contains__(self, clave: str) -> bool:
+        try:
+            self[clave]
+        except KeyError:
+            return False
+        return True
+    
+    def get(self, clave: str, defecto=None):
+        try:
+            return self[clave]
+        except KeyError:
+            return defecto
+    
+    def a_dict(self) -> dict:
+        """Diccionario con las claves del simulador (sin las curvas si no se guardaron)."""
+        claves = [c for c in self.__slots__ if c not in ('fechas', 'curva', 'curva_solo_activo')]
+        if self.tiene_curvas:
+            claves += ['valores', 'valores_solo_activo']
+        return {clave: self[clave] for clave in claves if clave in self}
+
+
+_CAMPOS_METRICAS = tuple(
+    campo.name for campo in fields(ResultadoSimulacion)
+    if campo.name not in ('fechas', 'curva', 'curva_solo_activo') + _CLAVES_DETALLE
+)
+
+
+def fila_resumen(
+    escenario: dict, precios: pd.Series, resultado_ls: ResultadoSimulacion, resultado_dca: ResultadoSimulacion
+) -> dict:
+    """
+    Fila plana con los parámetros del escenario y las métricas LS/DCA (la de los
+    resúmenes de la línea de comandos y del ranking de universos).
+    """
+    fila = dict(escenario)
+    fila['fecha_inicio_real'] = precios.index[0]
+    fila['fecha_fin'] = precios.index[-1]
+    for nombre, r in (('ls', resultado_ls), ('dca', resultado_dca)):
+        fila[f'rentabilidad_{nombre}'] = r['rentabilidad']
+        fila[f'cagr_{nombre}'] = r['cagr']
+        fila[f'tir_{nombre}'] = r['tir']
+        fila[f'twr_{nombre}'] = r['twr']
+        fila[f'valor_neto_{nombre}'] = r['valor_neto']
+        fila[f'capital_{nombre}'] = r['capital_total_aportado']
+        fila[f'max_drawdown_{nombre}'] = r['max_drawdown']
+        fila[f'volatilidad_{nombre}'] = r['volatilidad']
+        fila[f'sharpe_{nombre}'] = r['sharpe']
+        fila[f'impuestos_{nombre}'] = r['impuestos']
+        fila[f'costes_transaccion_{nombre}'] = r['costes_transaccion']
+    fila['num_compras_dca'] = resultado_dca['num_operaciones'] - 1
+    fila['intereses_monetario'] = resultado_dca['intereses_monetario']
+    fila['diferencia_pp'] = resultado_ls['rentabilidad'] - resultado_dca['rentabilidad']
+    fila['ganador'] = 'LS' if fila['diferencia_pp'] > 0 else 'DCA'
+    return fila
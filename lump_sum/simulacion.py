@@ -0,0 +1,555 @@
+"""
+Simuladores Lump Sum y DCA (capital disponible y aportación periódica).
+"""
+
+import pandas as pd
+import numpy as np
+
+from .calendario import indices_compra as calcular_indices_compra, regla_por_momento
+from .fiscalidad import calcular_impuestos_españa
+from .metricas import calcular_metricas, calcular_tir, calcular_twr
+from .operaciones import LibroOperaciones
+
+
+def _drawdown_post_dca(metricas: dict, precios: pd.Series, ultimo_dia_dca: int, valores_post_dca: np.ndarray) -> tuple:
+    """Max DD post-DCA con fechas absolutas; sin tramo válido, 0 y la fecha de inicio."""
+    if len(valores_post_dca) > 1 and valores_post_dca[0] > 0:
+        return (
+            metricas['max_drawdown'],
+            precios.index[ultimo_dia_dca + metricas['idx_pico']],
+            precios.index[ultimo_dia_dca + metricas['idx_valle']]
+        )
+    return 0.0, precios.index[0], precios.index[0]
+
+
+def _tir_aportaciones(precios: pd.Series, indices_compra: list, aportacion: float, valor_final: float) -> float:
+    """TIR (%) de aportaciones iguales en indices_compra recuperando valor_final el último día."""
+    if not indices_compra:
+        return 0.0
+    fechas = precios.index[indices_compra].append(precios.index[-1:])
+    tiempos = (fechas - precios.index[0]).days.to_numpy() / 365.25
+    flujos = np.append(np.full(len(indices_compra), -aportacion), valor_final)
+    return calcular_tir(flujos, tiempos)
+
+
+def _efectivo_pendiente(
+    n_dias: int,
+    indices_compra,
+    capital: float,
+    aportacion: float,
+    tasa_diaria: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cash pendiente de invertir e intereses acumulados de cada día (DCA con capital disponible).
+    
+    Los intereses se devengan antes de la compra del día sobre el capital pendiente.
+    """
+    indices = np.asarray(indices_compra, dtype=np.int64)
+    dias = np.arange(n_dias)
+    pendiente_tras_k = np.subtract.accumulate(np.concatenate(([capital], np.full(len(indices), aportacion))))
+    pendiente_previo = pendiente_tras_k[np.searchsorted(indices, dias, side='left')]
+    interes_dia = np.where(pendiente_previo > 0, pendiente_previo * tasa_diaria, 0.0)
+    return pendiente_tras_k[np.searchsorted(indices, dias, side='right')], np.cumsum(interes_dia)
+
+
+def _curvas_por_coste(
+    precios: pd.Series,
+    indices_compra: list,
+    aportacion: float,
+    niveles_coste,
+    efectivo: np.ndarray = None
+) -> dict:
+    """
+    Curvas de valor para varios niveles de coste por operación (comisión + slippage).
+    
+    Las participaciones compradas son proporcionales a (1 - coste), así que todas
+    las curvas salen de una única curva sin costes: matrices (niveles × días).
+    efectivo (cash pendiente + intereses) no depende del coste y se suma aparte.
+    """
+    niveles = np.atleast_1d(np.asarray(niveles_coste, dtype=float))
+    indices = np.asarray(indices_compra, dtype=np.int64)
+    valores_precio = precios.to_numpy(dtype=float)
+    
+    participaciones_tras_k = np.concatenate(([0.0], np.cumsum(aportacion / valores_precio[indices])))
+    compras_hasta = np.searchsorted(indices, np.arange(len(valores_precio)), side='right')
+    activo_sin_costes = participaciones_tras_k[compras_hasta] * valores_precio
+    
+    solo_activo = (1 - niveles)[:, None] * activo_sin_costes[None, :]
+    return {
+        'niveles': niveles,
+        'valores': solo_activo if efectivo is None else solo_activo + efectivo[None, :],
+        'valores_solo_activo': solo_activo
+    }
+
+
+def simular_lump_sum(
+    precios: pd.Series,
+    capital: float,
+    comision: float,
+    slippage: float,
+    niveles_coste=(0.0,)
+) -> dict:
+    """
+    Simula Lump Sum: invertir todo al inicio.
+    
+    niveles_coste: costes por operación (comisión + slippage) de las curvas de
+    referencia en 'curvas_coste'; por defecto solo la curva sin costes.
+    """
+    
+    # COMPRA: un único lote el primer día
+    coste_compra = capital * (comision + slippage)
+    precio_compra = precios.iloc[0]
+    libro = LibroOperaciones(precios.index)
+    participaciones = libro.comprar(0, precio_compra, capital, comision, slippage)[0]
+    
+    # EVOLUCIÓN
+    valores = participaciones * precios
+    
+    # VENTA de todo el último día (ganancia FIFO del libro)
+    venta = libro.vender(len(precios) - 1, precios.iloc[-1], participaciones, comision, slippage)
+    valor_bruto_final = venta['importe_bruto']
+    coste_venta = valor_bruto_final * (comision + slippage)
+    valor_tras_venta = venta['importe_neto']
+    
+    # IMPUESTOS
+    plusvalia = venta['ganancia']
+    impuestos, desglose_imp = calcular_impuestos_españa(plusvalia)
+    valor_neto = valor_tras_venta - impuestos
+    
+    # MÉTRICAS
+    dias = (precios.index[-1] - precios.index[0]).days
+    años = dias / 365.25
+    rentabilidad = (valor_neto / capital - 1) * 100
+    
+    # Max DD, volatilidad anualizada, CAGR y Sharpe (rf = 0) en una pasada
+    metricas = calcular_metricas(valores.to_numpy(), años, capital, valor_neto)
+    cagr = metricas['cagr']
+    max_dd = metricas['max_drawdown']
+    fecha_pico = precios.index[metricas['idx_pico']]
+    fecha_valle = precios.index[metricas['idx_valle']]
+    volatilidad = metricas['volatilidad']
+    sharpe = metricas['sharpe']
+    
+    # Con una sola aportación la TIR coincide con el CAGR; el TWR va antes de venta e impuestos
+    tir = _tir_aportaciones(precios, [0], capital, valor_neto)
+    twr = calcular_twr(valores, [capital], [0])
+    
+    return {
+        'valores': valores,
+        'valores_solo_activo': valores,
+        'valor_bruto': valor_bruto_final,
+        'valor_tras_venta': valor_tras_venta,
+        'valor_neto': valor_neto,
+        'rentabilidad': rentabilidad,
+        'cagr': cagr,
+        'tir': tir,
+        'twr': twr,
+        'max_drawdown': max_dd,
+        'fecha_pico_dd': fecha_pico,
+        'fecha_valle_dd': fecha_valle,
+        'volatilidad': volatilidad,
+        'sharpe': sharpe,
+        'base_coste': capital,
+        'plusvalia': plusvalia,
+        'impuestos': impuestos,
+        'desglose_impuestos': desglose_imp,
+        'tipo_efectivo': (impuestos / plusvalia * 100) if plusvalia > 0 else 0,
+        'comision_compra': capital * comision,
+        'slippage_compra': capital * slippage,
+        'comision_venta': valor_bruto_final * comision,
+        'slippage_venta': valor_bruto_final * slippage,
+        'costes_transaccion': coste_compra + coste_venta,
+        'coste_total': coste_compra + coste_venta + impuestos,
+        'num_operaciones': 2,
+        'precio_medio': precio_compra,
+        'años': años,
+        'intereses_monetario': 0.0,
+        'impuestos_intereses': 0.0,
+        'capital_invertido': capital,
+        'capital_total_aportado': capital,
+        'curvas_coste': _curvas_por_coste(precios, [0], capital, niveles_coste),
+        'operaciones': libro
+    }
+
+
+def _estado_capital_disponible_bucle(
+    precios: pd.Series,
+    indices_compra: list,
+    capital: float,
+    aportacion: float,
+    comision: float,
+    slippage: float,
+    tasa_diaria: float
+) -> dict:
+    """
+    Motor de referencia: recorre la serie día a día.
+    Se mantiene para contrastar el motor vectorizado.
+    """
+    participaciones_acumuladas = np.zeros(len(precios))
+    capital_pendiente_diario = np.zeros(len(precios))
+    intereses_acumulados_diario = np.zeros(len(precios))
+    capital_invertido_acumulado = np.zeros(len(precios))
+    
+    participaciones = 0.0
+    capital_invertido_total = 0.0
+    comisiones_compra = 0.0
+    slippage_compra = 0.0
+    intereses_acumulados = 0.0
+    precios_compra = []
+    cantidades_compra = []
+    num_compras = 0
+    capital_pendiente = capital
+    
+    proxima_compra_idx = 0
+    
+    for dia in range(len(precios)):
+        # Acumular intereses diarios sobre capital pendiente
+        if capital_pendiente > 0:
+            interes_dia = capital_pendiente * tasa_diaria
+            intereses_acumulados += interes_dia
+        
+        # ¿Toca compra hoy? (varias si el calendario agrupa aportaciones en la misma sesión)
+        while proxima_compra_idx < len(indices_compra) and dia == indices_compra[proxima_compra_idx]:
+            coste_op = aportacion * (comision + slippage)
+            capital_efectivo = aportacion - coste_op
+            precio = precios.iloc[dia]
+            nuevas_part = capital_efectivo / precio
+            
+            participaciones += nuevas_part
+            capital_invertido_total += aportacion
+            capital_pendiente -= aportacion
+            comisiones_compra += aportacion * comision
+            slippage_compra += aportacion * slippage
+            num_compras += 1
+            precios_compra.append(precio)
+            cantidades_compra.append(nuevas_part)
+            proxima_compra_idx += 1
+        
+        # Guardar estado del día
+        participaciones_acumuladas[dia] = participaciones
+        capital_pendiente_diario[dia] = capital_pendiente
+        intereses_acumulados_diario[dia] = intereses_acumulados
+        capital_invertido_acumulado[dia] = capital_invertido_total
+    
+    return {
+        'participaciones_acumuladas': participaciones_acumuladas,
+        'capital_pendiente_diario': capital_pendiente_diario,
+        'intereses_acumulados_diario': intereses_acumulados_diario,
+        'capital_invertido_acumulado': capital_invertido_acumulado,
+        'capital_invertido_total': capital_invertido_total,
+        'comisiones_compra': comisiones_compra,
+        'slippage_compra': slippage_compra,
+        'intereses_acumulados': intereses_acumulados,
+        'precios_compra': np.asarray(precios_compra, dtype=float),
+        'cantidades_compra': np.asarray(cantidades_compra, dtype=float),
+        'num_compras': num_compras
+    }
+
+
+def _estado_capital_disponible_vectorizado(
+    precios: pd.Series,
+    indices_compra: list,
+    capital: float,
+    aportacion: float,
+    comision: float,
+    slippage: float,
+    tasa_diaria: float
+) -> dict:
+    """
+    Motor vectorizado: mismo estado diario que el bucle con operaciones de array.
+    Las acumulaciones diarias usan cumsum para sumar en el mismo orden que el bucle;
+    los totales de comisión y slippage son productos (iguales salvo redondeo).
+    """
+    n_dias = len(precios)
+    indices = np.asarray(indices_compra, dtype=np.int64)
+    num_compras = len(indices)
+    
+    precios_compra = precios.to_numpy(dtype=float)[indices]
+    capital_efectivo = aportacion - aportacion * (comision + slippage)
+    cantidades_compra = capital_efectivo / precios_compra
+    
+    # Compras realizadas hasta el día (incluido)
+    compras_hasta = np.searchsorted(indices, np.arange(n_dias), side='right')
+    
+    # Funciones escalón: valor tras k compras (posición 0 = ninguna compra)
+    part_tras_k = np.concatenate(([0.0], np.cumsum(cantidades_compra)))
+    invertido_tras_k = np.concatenate(([0.0], np.cumsum(np.full(num_compras, aportacion))))
+    
+    participaciones_acumuladas = part_tras_k[compras_hasta]
+    capital_invertido_acumulado = invertido_tras_k[compras_hasta]
+    capital_pendiente_diario, intereses_acumulados_diario = _efectivo_pendiente(
+        n_dias, indices, capital, aportacion, tasa_diaria
+    )
+    
+    return {
+        'participaciones_acumuladas': participaciones_acumuladas,
+        'capital_pendiente_diario': capital_pendiente_diario,
+        'intereses_acumulados_diario': intereses_acumulados_diario,
+        'capital_invertido_acumulado': capital_invertido_acumulado,
+        'capital_invertido_total': invertido_tras_k[-1],
+        'comisiones_compra': num_compras * aportacion * comision,
+        'slippage_compra': num_compras * aportacion * slippage,
+        'intereses_acumulados': intereses_acumulados_diario[-1] if n_dias else 0.0,
+        'precios_compra': precios_compra,
+        'cantidades_compra': cantidades_compra,
+        'num_compras': num_compras
+    }
+
+
+MOTORES_CAPITAL_DISPONIBLE = {
+    'vectorizado': _estado_capital_disponible_vectorizado,
+    'bucle': _estado_capital_disponible_bucle,
+}
+
+
+def simular_dca_capital_disponible(
+    precios: pd.Series,
+    capital: float,
+    meses_dca: int,
+    comision: float,
+    slippage: float,
+    tasa_monetario: float,
+    aportacion_inicio_mes: bool = True,
+    motor: str = 'vectorizado',
+    indices_compra: np.ndarray = None,
+    niveles_coste=(0.0,)
+) -> dict:
+    """
+    DCA Modo 1: Capital disponible desde el día 1.
+    El capital pendiente genera intereses en monetario.
+    
+    motor: 'vectorizado' (por defecto) o 'bucle' (implementación de referencia día a día).
+    indices_compra: posiciones de compra ya calculadas con lump_sum.calendario (como
+    mucho meses_dca); por defecto, primer o último día hábil de cada mes.
+    niveles_coste: como en simular_lump_sum (el cash y sus intereses no cambian).
+    """
+    if motor not in MOTORES_CAPITAL_DISPONIBLE:
+        raise ValueError(f"Motor desconocido: {motor!r}. Opciones: {list(MOTORES_CAPITAL_DISPONIBLE)}")
+    
+    aportacion = capital / meses_dca
+    tasa_diaria = tasa_monetario / 252
+    
+    # Índices de compra
+    if indices_compra is None:
+        indices_compra = calcular_indices_compra(precios.index, meses_dca, regla_por_momento(aportacion_inicio_mes))
+    indices_compra = [int(i) for i in indices_compra[:meses_dca]]
+    
+    # Encontrar el último día del período DCA
+    ultimo_dia_dca = indices_compra[-1] if indices_compra else 0
+    
+    # Estado diario (participaciones, cash pendiente, intereses)
+    estado = MOTORES_CAPITAL_DISPONIBLE[motor](
+        precios, indices_compra, capital, aportacion, comision, slippage, tasa_diaria
+    )
+    participaciones_acumuladas = estado['participaciones_acumuladas']
+    capital_pendiente_diario = estado['capital_pendiente_diario']
+    intereses_acumulados_diario = estado['intereses_acumulados_diario']
+    capital_invertido_total = estado['capital_invertido_total']
+    comisiones_compra = estado['comisiones_compra']
+    slippage_compra = estado['slippage_compra']
+    intereses_acumulados = estado['intereses_acumulados']
+    num_compras = estado['num_compras']
+    
+    # LIBRO DE OPERACIONES: un lote por aportación
+    libro = LibroOperaciones(precios.index)
+    libro.comprar(indices_compra, estado['precios_compra'], aportacion, comision, slippage)
+    
+    # EVOLUCIÓN
+    valor_participaciones = pd.Series(participaciones_acumuladas * precios.values, index=precios.index)
+    valor_cash = pd.Series(capital_pendiente_diario, index=precios.index)
+    valor_intereses = pd.Series(intereses_acumulados_diario, index=precios.index)
+    
+    # Patrimonio total
+    valores = valor_participaciones + valor_cash + valor_intereses
+    valores_solo_activo = valor_participaciones
+    
+    # VENTA de todo el último día: ganancia con el coste FIFO de los lotes
+    venta = libro.vender(len(precios) - 1, precios.iloc[-1], libro.participaciones_abiertas(), comision, slippage)
+    valor_bruto_final = venta['importe_bruto']
+    coste_venta = valor_bruto_final * (comision + slippage)
+    valor_tras_venta = venta['importe_neto']
+    
+    intereses_monetario = intereses_acumulados
+    
+    # IMPUESTOS
+    plusvalia = venta['ganancia']
+    impuestos_activo, desglose_imp = calcular_impuestos_españa(plusvalia)
+    impuestos_intereses, _ = calcular_impuestos_españa(intereses_monetario)
+    impuestos_totales = impuestos_activo + impuestos_intereses
+    
+    valor_neto = valor_tras_venta + intereses_monetario - impuestos_totales
+    
+    # MÉTRICAS
+    dias = (precios.index[-1] - precios.index[0]).days
+    años = dias / 365.25
+    rentabilidad = (valor_neto / capital - 1) * 100
+    
+    # MAX DRAWDOWN y volatilidad - Calculados SOLO sobre participaciones después del período DCA
+    # Durante el DCA el cash "protege" artificialmente el DD, lo cual no es comparable con LS
+    valores_post_dca = valores_solo_activo.to_numpy()[ultimo_dia_dca:]
+    metricas = calcular_metricas(valores_post_dca, años, capital, valor_neto)
+    cagr = metricas['cagr']
+    max_dd, fecha_pico, fecha_valle = _drawdown_post_dca(metricas, precios, ultimo_dia_dca, valores_post_dca)
+    volatilidad = metricas['volatilidad']
+    sharpe = metricas['sharpe']
+    
+    precio_medio = libro.precio_medio()
+    
+    # TIR y TWR de lo invertido en el activo: cada compra es una aportación y al final
+    # se recupera la venta neta de su IRPF (el monetario queda fuera, como en el DD)
+    tir = _tir_aportaciones(precios, indices_compra, aportacion, valor_tras_venta - impuestos_activo)
+    twr = calcular_twr(valores_solo_activo, [aportacion] * num_compras, indices_compra)
+    
+    return {
+        'valores': valores,
+        'valores_solo_activo': valores_solo_activo,
+        'valor_bruto': valor_bruto_final,
+        'valor_tras_venta': valor_tras_venta,
+        'valor_neto': valor_neto,
+        'rentabilidad': rentabilidad,
+        'cagr': cagr,
+        'tir': tir,
+        'twr': twr,
+        'max_drawdown': max_dd,
+        'fecha_pico_dd': fecha_pico,
+        'fecha_valle_dd': fecha_valle,
+        'volatilidad': volatilidad,
+        'sharpe': sharpe,
+        'base_coste': capital_invertido_total,
+        'plusvalia': plusvalia,
+        'impuestos': impuestos_totales,
+        'impuestos_activo': impuestos_activo,
+        'impuestos_intereses': impuestos_intereses,
+        'desglose_impuestos': desglose_imp,
+        'tipo_efectivo': (impuestos_activo / plusvalia * 100) if plusvalia > 0 else 0,
+        'comision_compra': comisiones_compra,
+        'slippage_compra': slippage_compra,
+        'comision_venta': valor_bruto_final * comision,
+        'slippage_venta': valor_bruto_final * slippage,
+        'costes_transaccion': comisiones_compra + slippage_compra + coste_venta,
+        'coste_total': comisiones_compra + slippage_compra + coste_venta + impuestos_totales,
+        'num_operaciones': num_compras + 1,
+        'precio_medio': precio_medio,
+        'años': años,
+        'dias_dca': ultimo_dia_dca,
+        'intereses_monetario': intereses_monetario,
+        'capital_invertido': capital_invertido_total,
+        'capital_total_aportado': capital,
+        'aportacion_mensual': aportacion,
+        'modo': 'capital_disponible',
+        'curvas_coste': _curvas_por_coste(
+            precios, indices_compra, aportacion, niveles_coste, capital_pendiente_diario + intereses_acumulados_diario
+        ),
+        'operaciones': libro
+    }
+
+
+def simular_dca_aportacion_periodica(
+    precios: pd.Series,
+    aportacion_mensual: float,
+    meses_dca: int,
+    comision: float,
+    slippage: float,
+    aportacion_inicio_mes: bool = True,
+    indices_compra: np.ndarray = None,
+    niveles_coste=(0.0,)
+) -> dict:
+    """
+    DCA Modo 2: Aportación periódica (ej: del sueldo).
+    NO hay coste de oportunidad porque el dinero no existe hasta que llega.
+    
+    indices_compra y niveles_coste: igual que en simular_dca_capital_disponible.
+    """
+    if indices_compra is None:
+        indices_compra = calcular_indices_compra(precios.index, meses_dca, regla_por_momento(aportacion_inicio_mes))
+    indices_compra = [int(i) for i in indices_compra[:meses_dca]]
+    
+    # LIBRO DE OPERACIONES: un lote por aportación
+    libro = LibroOperaciones(precios.index)
+    cantidades_compra = libro.comprar(
+        indices_compra, precios.to_numpy(dtype=float)[indices_compra], aportacion_mensual, comision, slippage
+    )
+    num_compras = len(indices_compra)
+    capital_invertido_total = float(libro.compras['importe'].sum())
+    comisiones_compra = float(libro.compras['comision'].sum())
+    slippage_compra = float(libro.compras['slippage'].sum())
+    
+    # Participaciones tras cada compra, mantenidas hasta la siguiente
+    participaciones_tras_k = np.concatenate(([0.0], np.cumsum(cantidades_compra)))
+    participaciones_acumuladas = participaciones_tras_k[np.searchsorted(indices_compra, np.arange(len(precios)), side='right')]
+    ultimo_dia_dca = indices_compra[-1] if indices_compra else 0
+    
+    # EVOLUCIÓN
+    valores = pd.Series(participaciones_acumuladas * precios.values, index=precios.index)
+    
+    # VENTA de todo el último día: ganancia con el coste FIFO de los lotes
+    venta = libro.vender(len(precios) - 1, precios.iloc[-1], libro.participaciones_abiertas(), comision, slippage)
+    valor_bruto_final = venta['importe_bruto']
+    coste_venta = valor_bruto_final * (comision + slippage)
+    valor_tras_venta = venta['importe_neto']
+    
+    # IMPUESTOS
+    plusvalia = venta['ganancia']
+    impuestos, desglose_imp = calcular_impuestos_españa(plusvalia)
+    valor_neto = valor_tras_venta - impuestos
+    
+    # MÉTRICAS
+    dias = (precios.index[-1] - precios.index[0]).days
+    años = dias / 365.25
+    # Sin compras (serie anterior a la primera aportación) no hay capital sobre el que medir
+    rentabilidad = (valor_neto / capital_invertido_total - 1) * 100 if capital_invertido_total > 0 else np.nan
+    
+    # Max DD y volatilidad calculados SOLO desde el último día del DCA (comparable con LS)
+    valores_post_dca = valores.to_numpy()[ultimo_dia_dca:]
+    metricas = calcular_metricas(valores_post_dca, años, capital_invertido_total, valor_neto)
+    cagr = metricas['cagr']
+    max_dd, fecha_pico, fecha_valle = _drawdown_post_dca(metricas, precios, ultimo_dia_dca, valores_post_dca)
+    volatilidad = metricas['volatilidad']
+    sharpe = metricas['sharpe']
+    
+    precio_medio = libro.precio_medio()
+    
+    # TIR: tiene en cuenta cuándo entró cada aportación (el CAGR supone todo el capital desde el día 1)
+    tir = _tir_aportaciones(precios, indices_compra, aportacion_mensual, valor_neto)
+    twr = calcular_twr(valores, [aportacion_mensual] * num_compras, indices_compra)
+    
+    return {
+        'valores': valores,
+        'valores_solo_activo': valores,  # En este modo son iguales (no hay cash pendiente)
+        'valor_bruto': valor_bruto_final,
+        'valor_tras_venta': valor_tras_venta,
+        'valor_neto': valor_neto,
+        'rentabilidad': rentabilidad,
+        'cagr': cagr,
+        'tir': tir,
+        'twr': twr,
+        'max_drawdown': max_dd,
+        'fecha_pico_dd': fecha_pico,
+        'fecha_valle_dd': fecha_valle,
+        'volatilidad': volatilidad,
+        'sharpe': sharpe,
+        'base_coste': capital_invertido_total,
+        'plusvalia': plusvalia,
+        'impuestos': impuestos,
+        'impuestos_activo': impuestos,
+        'impuestos_intereses': 0.0,
+        'desglose_impuestos': desglose_imp,
+        'tipo_efectivo': (impuestos / plusvalia * 100) if plusvalia > 0 else 0,
+        'comision_compra': comisiones_compra,
+        'slippage_compra': slippage_compra,
+        'comision_venta': valor_bruto_final * comision,
+        'slippage_venta': valor_bruto_final * slippage,
+        'costes_transaccion': comisiones_compra + slippage_compra + coste_venta,
+        'coste_total': comisiones_compra + slippage_compra + coste_venta + impuestos,
+        'num_operaciones': num_compras + 1,
+        'precio_medio': precio_medio,
+        'años': años,
+        'dias_dca': ultimo_dia_dca,
+        'intereses_monetario': 0.0,
+        'capital_invertido': capital_invertido_total,
+        'capital_total_aportado': capital_invertido_total,
+        'aportacion_mensual': aportacion_mensual,
+        'modo': 'aportacion_periodica',
+        'curvas_coste': _curvas_por_coste(precios, indices_compra, aportacion_mensual, niveles_coste),
+        'operaciones': libro
+    }
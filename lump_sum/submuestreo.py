@@ -0,0 +1,52 @@
+"""
+Submuestreo de curvas para gráficos (Largest-Triangle-Three-Buckets).
+
+LTTB conserva la forma visual de una serie con muchos menos puntos: en cada
+tramo elige el punto que forma el triángulo de mayor área con el punto anterior
+elegido y la media del tramo siguiente. Los puntos obligatorios (pico y valle
+del drawdown, fechas de compra...) se añaden siempre con su valor exacto.
+"""
+
+import numpy as np
+
+
+def lttb(valores: np.ndarray, n_puntos: int, obligatorios=None) -> np.ndarray:
+    """
+    Posiciones (ordenadas, sin repetir) de como mucho n_puntos puntos de valores,
+    más los obligatorios. El primer y el último punto se conservan siempre.
+    """
+    valores = np.asarray(valores, dtype=float)
+    n = len(valores)
+    obligatorios = np.unique(np.asarray([] if obligatorios is None else obligatorios, dtype=np.int64))
+    obligatorios = obligatorios[(obligatorios >= 0) & (obligatorios < n)]
+    
+    n_lttb = max(n_puntos - len(obligatorios), 3)
+    if n <= n_lttb:
+        return np.arange(n)
+    
+    # Tramos interiores: el primero y el último punto van aparte
+    bordes = np.floor(np.linspace(1, n - 1, n_lttb - 1)).astype(np.int64)
+    tamaños = np.diff(bordes)
+    
+    # Media de cada tramo (x, y) en una pasada; el "siguiente" del último tramo es el último punto
+    x_medio = np.append((bordes[:-1] + bordes[1:] - 1) / 2, n - 1)[1:].tolist()
+    y_medio = np.append(np.add.reduceat(valores[:-1], bordes[:-1]) / tamaños, valores[-1])[1:].tolist()
+    
+    # La elección depende del punto anterior: bucle en Python sobre listas (más rápido que
+    # operaciones numpy sobre tramos de pocos puntos)
+    y = valores.tolist()
+    bordes = bordes.tolist()
+    elegidos = [0]
+    anterior = 0
+    for i in range(n_lttb - 2):
+        x_a, y_a = anterior, y[anterior]
+        dx, dy = x_a - x_medio[i], y_medio[i] - y_a
+        mejor_area = -1.0
+        for j in range(bordes[i], bordes[i + 1]):
+            area = abs(dx * (y[j] - y_a) - (x_a - j) * dy)
+            if area > mejor_area:
+                mejor_area, anterior = area, j
+        elegidos.append(anterior)
+    elegidos.append(n - 1)
+    
+    return np.union1d(np.asarray(elegidos, dtype=np.int64), obligatorios)
@@ -0,0 +1,105 @@
+"""
+LS vs DCA sobre un universo de activos.
+
+Misma configuración para muchos tickers (miembros de un índice, una lista de
+ETFs...): los precios se piden en paralelo con un pool de hilos acotado (la
+descarga es E/S) y cada ticker se simula en cuanto llegan sus datos. El fallo
+de un ticker (no existe, fuente caída, historia insuficiente) se anota en la
+tabla de errores y no detiene el resto.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from .cli import ejecutar_escenario
+from .resultado import fila_resumen
+from .proveedores import ErrorDatos, ProveedorPrecios, TickerNoEncontrado
+
+
+# Universos predefinidos (composición del Euro Stoxx 50 aproximada: revisar ante cambios del índice)
+UNIVERSOS = {
+    'eurostoxx50': (
+        'ABI.BR', 'AD.AS', 'ADS.DE', 'ADYEN.AS', 'AI.PA', 'AIR.PA', 'ALV.DE', 'ASML.AS', 'BAS.DE', 'BAYN.DE',
+        'BBVA.MC', 'BMW.DE', 'BN.PA', 'BNP.PA', 'CS.PA', 'DB1.DE', 'DG.PA', 'DHL.DE', 'DTE.DE', 'EL.PA',
+        'ENEL.MI', 'ENI.MI', 'IBE.MC', 'IFX.DE', 'INGA.AS', 'ISP.MI', 'ITX.MC', 'KER.PA', 'MBG.DE', 'MC.PA',
+        'MUV2.DE', 'NDA-FI.HE', 'NOKIA.HE', 'OR.PA', 'PRX.AS', 'RACE.MI', 'RI.PA', 'RMS.PA', 'SAF.PA', 'SAN.MC',
+        'SAN.PA', 'SAP.DE', 'SGO.PA', 'SIE.DE', 'STLAM.MI', 'SU.PA', 'TTE.PA', 'UCG.MI', 'VOW3.DE', 'WKL.AS',
+    ),
+    'etfs': ('SPY', 'QQQ', 'IWM', 'VT', 'VEA', 'VWO', 'EEM', 'EFA', 'AGG', 'TLT', 'GLD', 'VNQ'),
+}
+
+MAX_HILOS_DESCARGA = 8
+
+
+def _normalizar(tickers) -> list:
+    """Tickers en mayúsculas, sin espacios ni repetidos, en el orden recibido."""
+    return list(dict.fromkeys(t.upper().strip() for t in tickers if t.strip()))
+
+
+def _descripcion_error(error: Exception) -> str:
+    if isinstance(error, TickerNoEncontrado):
+        return "Ticker no encontrado"
+    if isinstance(error, ErrorDatos):
+        return str(error)
+    return f"{type(error).__name__}: {error}"
+
+
+def ejecutar_universo(
+    proveedor: ProveedorPrecios,
+    tickers,
+    fecha_inicio,
+    escenario: dict,
+    max_hilos: int = MAX_HILOS_DESCARGA
+) -> dict:
+    """
+    LS vs DCA con la misma configuración en cada ticker.
+    
+    escenario tiene las claves de los escenarios de la línea de comandos
+    (horizonte en años, modo, meses_dca, momento, comision, slippage,
+    tasa_monetario, capital, aportacion_mensual y, opcionalmente, capital_ls).
+    Devuelve:
+        {'ranking': DataFrame ordenado por ventaja de LS (diferencia_pp) con una
+         fila resumen por ticker, 'errores': DataFrame (ticker, error),
+         'win_rate_ls': % de activos en los que gana LS, 'diferencia_mediana': pp}
+    """
+    tickers = _normalizar(tickers)
+    dias_horizonte = escenario['horizonte'] * 252
+    filas = []
+    errores = []
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_hilos, len(tickers))), thread_name_prefix='universo') as pool:
+        futuros = {pool.submit(proveedor.precios, ticker, fecha_inicio): ticker for ticker in tickers}
+        # Se simula cada ticker en cuanto llegan sus precios, mientras siguen las descargas
+        for futuro in as_completed(futuros):
+            ticker = futuros[futuro]
+            try:
+                precios_full = futuro.result()
+                if precios_full is None or precios_full.empty:
+                    raise TickerNoEncontrado(ticker)
+                if len(precios_full) <= dias_horizonte:
+                    errores.append({'ticker': ticker, 'error': f"Historia insuficiente: {len(precios_full)} sesiones de {dias_horizonte + 1}"})
+                    continue
+                precios = precios_full.iloc[:dias_horizonte + 1]
+                resultado_ls, resultado_dca = ejecutar_escenario(precios, escenario)
+                filas.append(fila_resumen(dict(escenario, ticker=ticker), precios, resultado_ls, resultado_dca))
+            except Exception as e:
+                errores.append({'ticker': ticker, 'error': _descripcion_error(e)})
+    
+    # Orden estable: ventaja de LS y, a igualdad, el orden de entrada
+    orden = {ticker: i for i, ticker in enumerate(tickers)}
+    ranking = pd.DataFrame(filas)
+    if not ranking.empty:
+        ranking['_orden'] = ranking['ticker'].map(orden)
+        ranking = ranking.sort_values(['diferencia_pp', '_orden'], ascending=[False, True]).drop(columns='_orden')
+        ranking.insert(0, 'posicion', range(1, len(ranking) + 1))
+        ranking = ranking.reset_index(drop=True)
+    errores = sorted(errores, key=lambda e: orden[e['ticker']])
+    
+    return {
+        'ranking': ranking,
+        'errores': pd.DataFrame(errores, columns=['ticker', 'error']),
+        'num_tickers': len(tickers),
+        'win_rate_ls': float((ranking['diferencia_pp'] > 0).mean() * 100) if not ranking.empty else 0.0,
+        'diferencia_mediana': float(ranking['diferencia_pp'].median()) if not ranking.empty else 0.0,
+    }
@@ -7,16 +7,34 @@ Comparativa realista con:
 - Coste de oportunidad (solo modo capital disponible)
 - Ticker libre + IRPF España 2024
 
+El motor de cálculo vive en el paquete `lump_sum`; este script es solo la interfaz.
+
 Autor: BQuant Finance
 """
 
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+import logging
+import sys
 import warnings
+
+from lump_sum import (
+    estudio_ventanas_moviles,
+    barrido_parametros,
+)
+from lump_sum.almacen import AlmacenPrecios
+from lump_sum.cache import CacheLRU, huella_serie
+from lump_sum.calendario import num_aportaciones
+from lump_sum.horizontes import PrefijosSimulacion
+from lump_sum.instrumentacion import REGISTRO, Cronometro, anotar
+from lump_sum.montecarlo import monte_carlo_ls_dca
+from lump_sum.submuestreo import lttb
+from lump_sum.universo import UNIVERSOS, ejecutar_universo
+from lump_sum.metadatos import CargadorMetadatos
+from lump_sum.proveedores import ProveedorPrecios, ErrorDatos, TickerNoEncontrado, crear_proveedor
 warnings.filterwarnings('ignore')
 
 # =============================================================================
@@ -226,484 +244,50 @@ st.markdown("""
 
 
 # =============================================================================
-# CONSTANTES Y FUNCIONES
+# DATOS
 # =============================================================================
 
-TRAMOS_IRPF_2024 = [
-    (6_000, 0.19),
-    (50_000, 0.21),
-    (200_000, 0.23),
-    (300_000, 0.27),
-    (float('inf'), 0.28)
-]
+@st.cache_resource
+def obtener_proveedor() -> ProveedorPrecios:
+    """Proveedor de datos compartido por todas las sesiones: almacén en disco sobre la fuente configurada."""
+    return AlmacenPrecios(proveedor=crear_proveedor())
 
 
-def calcular_impuestos_españa(plusvalia: float) -> tuple[float, dict]:
-    """Calcula impuestos sobre plusvalías según tramos IRPF España 2024."""
-    if plusvalia <= 0:
-        return 0.0, {}
-    
-    impuesto_total = 0.0
-    restante = plusvalia
-    limite_anterior = 0.0
-    desglose = {}
-    
-    for limite_superior, tipo in TRAMOS_IRPF_2024:
-        ancho_tramo = limite_superior - limite_anterior
-        base_en_tramo = min(restante, ancho_tramo)
-        
-        if base_en_tramo > 0:
-            impuesto_tramo = base_en_tramo * tipo
-            impuesto_total += impuesto_tramo
-            desglose[f"{int(tipo * 100)}%"] = {
-                'base': base_en_tramo,
-                'impuesto': impuesto_tramo
-            }
-            restante -= base_en_tramo
-            limite_anterior = limite_superior
-        
-        if restante <= 0:
-            break
-    
-    return impuesto_total, desglose
-
-
-def calcular_max_drawdown(serie: pd.Series) -> tuple[float, datetime, datetime]:
-    """Calcula Maximum Drawdown sobre una serie."""
-    if len(serie) < 2 or serie.iloc[0] == 0:
-        return 0.0, serie.index[0], serie.index[0]
-    
-    rolling_max = serie.expanding().max()
-    drawdowns = (serie - rolling_max) / rolling_max
-    max_dd = drawdowns.min()
-    idx_valle = drawdowns.idxmin()
-    idx_pico = serie.loc[:idx_valle].idxmax()
-    return max_dd * 100, idx_pico, idx_valle
-
-
-def calcular_cagr(valor_inicial: float, valor_final: float, años: float) -> float:
-    """Calcula CAGR."""
-    if valor_inicial <= 0 or años <= 0 or valor_final <= 0:
-        return 0.0
-    return ((valor_final / valor_inicial) ** (1 / años) - 1) * 100
-
-
-def calcular_twr(valores: pd.Series, flujos: list, indices_flujo: list) -> float:
-    """
-    Calcula Time-Weighted Return (TWR).
-    Elimina el efecto del timing de los flujos de caja.
-    """
-    if len(flujos) == 0 or len(valores) < 2:
-        return 0.0
-    
-    retornos_periodo = []
-    valor_inicio_periodo = valores.iloc[0]
-    
-    for i, idx in enumerate(indices_flujo):
-        if idx > 0 and idx < len(valores):
-            valor_antes_flujo = valores.iloc[idx]
-            if valor_inicio_periodo > 0:
-                retorno = valor_antes_flujo / valor_inicio_periodo
-                retornos_periodo.append(retorno)
-            valor_inicio_periodo = valores.iloc[idx]
-    
-    # Último período hasta el final
-    if valor_inicio_periodo > 0:
-        retorno_final = valores.iloc[-1] / valor_inicio_periodo
-        retornos_periodo.append(retorno_final)
-    
-    if not retornos_periodo:
-        return 0.0
-    
-    # TWR = producto de (1 + r) para cada período - 1
-    import numpy as np
-    twr = np.prod(retornos_periodo) - 1
-    return twr * 100
-
-
-def simular_lump_sum(
-    precios: pd.Series,
-    capital: float,
-    comision: float,
-    slippage: float
-) -> dict:
-    """Simula Lump Sum: invertir todo al inicio."""
-    
-    # COMPRA
-    coste_compra = capital * (comision + slippage)
-    capital_invertido = capital - coste_compra
-    precio_compra = precios.iloc[0]
-    participaciones = capital_invertido / precio_compra
-    
-    # EVOLUCIÓN
-    valores = participaciones * precios
-    
-    # VENTA
-    valor_bruto_final = valores.iloc[-1]
-    coste_venta = valor_bruto_final * (comision + slippage)
-    valor_tras_venta = valor_bruto_final - coste_venta
-    
-    # IMPUESTOS
-    plusvalia = valor_tras_venta - capital
-    impuestos, desglose_imp = calcular_impuestos_españa(plusvalia)
-    valor_neto = valor_tras_venta - impuestos
-    
-    # MÉTRICAS
-    dias = (precios.index[-1] - precios.index[0]).days
-    años = dias / 365.25
-    rentabilidad = (valor_neto / capital - 1) * 100
-    cagr = calcular_cagr(capital, valor_neto, años)
-    max_dd, fecha_pico, fecha_valle = calcular_max_drawdown(valores)
-    
-    # Volatilidad anualizada
-    retornos_diarios = valores.pct_change().dropna()
-    volatilidad = retornos_diarios.std() * np.sqrt(252) * 100 if len(retornos_diarios) > 1 else 0
-    
-    # Sharpe (asumiendo rf = 0 para simplificar)
-    sharpe = (cagr / volatilidad) if volatilidad > 0 else 0
-    
-    return {
-        'valores': valores,
-        'valores_solo_activo': valores,
-        'valor_bruto': valor_bruto_final,
-        'valor_tras_venta': valor_tras_venta,
-        'valor_neto': valor_neto,
-        'rentabilidad': rentabilidad,
-        'cagr': cagr,
-        'max_drawdown': max_dd,
-        'fecha_pico_dd': fecha_pico,
-        'fecha_valle_dd': fecha_valle,
-        'volatilidad': volatilidad,
-        'sharpe': sharpe,
-        'base_coste': capital,
-        'plusvalia': plusvalia,
-        'impuestos': impuestos,
-        'desglose_impuestos': desglose_imp,
-        'tipo_efectivo': (impuestos / plusvalia * 100) if plusvalia > 0 else 0,
-        'comision_compra': capital * comision,
-        'slippage_compra': capital * slippage,
-        'comision_venta': valor_bruto_final * comision,
-        'slippage_venta': valor_bruto_final * slippage,
-        'costes_transaccion': coste_compra + coste_venta,
-        'coste_total': coste_compra + coste_venta + impuestos,
-        'num_operaciones': 2,
-        'precio_medio': precio_compra,
-        'años': años,
-        'intereses_monetario': 0,
-        'impuestos_intereses': 0,
-        'capital_invertido': capital,
-        'capital_total_aportado': capital
-    }
+@st.cache_data(ttl=3600)
+def descargar_datos(ticker: str, fecha_inicio: str) -> pd.Series:
+    """Precios desde el almacén local (solo se descarga la cola que falte). Los errores no se cachean."""
+    # Solo se ejecuta si falla la caché de Streamlit
+    anotar(cache='fallo')
+    return obtener_proveedor().precios(ticker, fecha_inicio)
 
 
-def simular_dca_capital_disponible(
-    precios: pd.Series,
-    capital: float,
-    meses_dca: int,
-    comision: float,
-    slippage: float,
-    tasa_monetario: float,
-    aportacion_inicio_mes: bool = True
-) -> dict:
-    """
-    DCA Modo 1: Capital disponible desde el día 1.
-    El capital pendiente genera intereses en monetario.
-    """
-    aportacion = capital / meses_dca
-    dias_entre = 21
-    tasa_diaria = tasa_monetario / 252
-    offset_dias = 0 if aportacion_inicio_mes else dias_entre
-    
-    # Arrays para tracking diario
-    participaciones_acumuladas = np.zeros(len(precios))
-    capital_pendiente_diario = np.zeros(len(precios))
-    intereses_acumulados_diario = np.zeros(len(precios))
-    capital_invertido_acumulado = np.zeros(len(precios))
-    
-    participaciones = 0.0
-    capital_invertido_total = 0.0
-    comisiones_compra = 0.0
-    slippage_compra = 0.0
-    intereses_acumulados = 0.0
-    precios_compra = []
-    cantidades_compra = []
-    num_compras = 0
-    capital_pendiente = capital
-    
-    # Índices de compra
-    indices_compra = []
-    for mes in range(meses_dca):
-        idx = mes * dias_entre + offset_dias
-        if idx >= len(precios):
-            break
-        indices_compra.append(idx)
-    
-    # Encontrar el último día del período DCA
-    ultimo_dia_dca = indices_compra[-1] if indices_compra else 0
-    
-    # Simular día a día
-    proxima_compra_idx = 0
-    
-    for dia in range(len(precios)):
-        # Acumular intereses diarios sobre capital pendiente
-        if capital_pendiente > 0:
-            interes_dia = capital_pendiente * tasa_diaria
-            intereses_acumulados += interes_dia
-        
-        # ¿Toca compra hoy?
-        if proxima_compra_idx < len(indices_compra) and dia == indices_compra[proxima_compra_idx]:
-            coste_op = aportacion * (comision + slippage)
-            capital_efectivo = aportacion - coste_op
-            precio = precios.iloc[dia]
-            nuevas_part = capital_efectivo / precio
-            
-            participaciones += nuevas_part
-            capital_invertido_total += aportacion
-            capital_pendiente -= aportacion
-            comisiones_compra += aportacion * comision
-            slippage_compra += aportacion * slippage
-            num_compras += 1
-            precios_compra.append(precio)
-            cantidades_compra.append(nuevas_part)
-            proxima_compra_idx += 1
-        
-        # Guardar estado del día
-        participaciones_acumuladas[dia] = participaciones
-        capital_pendiente_diario[dia] = capital_pendiente
-        intereses_acumulados_diario[dia] = intereses_acumulados
-        capital_invertido_acumulado[dia] = capital_invertido_total
-    
-    # EVOLUCIÓN
-    valor_participaciones = pd.Series(participaciones_acumuladas * precios.values, index=precios.index)
-    valor_cash = pd.Series(capital_pendiente_diario, index=precios.index)
-    valor_intereses = pd.Series(intereses_acumulados_diario, index=precios.index)
-    
-    # Patrimonio total
-    valores = valor_participaciones + valor_cash + valor_intereses
-    valores_solo_activo = valor_participaciones
-    
-    # VENTA
-    valor_bruto_final = valor_participaciones.iloc[-1]
-    coste_venta = valor_bruto_final * (comision + slippage)
-    valor_tras_venta = valor_bruto_final - coste_venta
-    
-    intereses_monetario = intereses_acumulados
-    
-    # IMPUESTOS
-    plusvalia = valor_tras_venta - capital_invertido_total
-    impuestos_activo, desglose_imp = calcular_impuestos_españa(plusvalia)
-    impuestos_intereses, _ = calcular_impuestos_españa(intereses_monetario)
-    impuestos_totales = impuestos_activo + impuestos_intereses
-    
-    valor_neto = valor_tras_venta + intereses_monetario - impuestos_totales
-    
-    # MÉTRICAS
-    dias = (precios.index[-1] - precios.index[0]).days
-    años = dias / 365.25
-    rentabilidad = (valor_neto / capital - 1) * 100
-    cagr = calcular_cagr(capital, valor_neto, años)
-    
-    # MAX DRAWDOWN - Calculado SOLO sobre participaciones después del período DCA
-    # Durante el DCA el cash "protege" artificialmente el DD, lo cual no es comparable con LS
-    valores_post_dca = valores_solo_activo.iloc[ultimo_dia_dca:]
-    if len(valores_post_dca) > 1 and valores_post_dca.iloc[0] > 0:
-        max_dd, fecha_pico, fecha_valle = calcular_max_drawdown(valores_post_dca)
-    else:
-        max_dd, fecha_pico, fecha_valle = 0.0, precios.index[0], precios.index[0]
-    
-    # Volatilidad post-DCA (comparable con LS)
-    if len(valores_post_dca) > 1:
-        retornos_diarios = valores_post_dca.pct_change().dropna()
-        volatilidad = retornos_diarios.std() * np.sqrt(252) * 100 if len(retornos_diarios) > 1 else 0
-    else:
-        volatilidad = 0
-    
-    sharpe = (cagr / volatilidad) if volatilidad > 0 else 0
-    
-    precio_medio = sum(p * c for p, c in zip(precios_compra, cantidades_compra)) / sum(cantidades_compra) if cantidades_compra else 0
-    
-    return {
-        'valores': valores,
-        'valores_solo_activo': valores_solo_activo,
-        'valor_bruto': valor_bruto_final,
-        'valor_tras_venta': valor_tras_venta,
-        'valor_neto': valor_neto,
-        'rentabilidad': rentabilidad,
-        'cagr': cagr,
-        'max_drawdown': max_dd,
-        'fecha_pico_dd': fecha_pico,
-        'fecha_valle_dd': fecha_valle,
-        'volatilidad': volatilidad,
-        'sharpe': sharpe,
-        'base_coste': capital_invertido_total,
-        'plusvalia': plusvalia,
-        'impuestos': impuestos_totales,
-        'impuestos_activo': impuestos_activo,
-        'impuestos_intereses': impuestos_intereses,
-        'desglose_impuestos': desglose_imp,
-        'tipo_efectivo': (impuestos_activo / plusvalia * 100) if plusvalia > 0 else 0,
-        'comision_compra': comisiones_compra,
-        'slippage_compra': slippage_compra,
-        'comision_venta': valor_bruto_final * comision,
-        'slippage_venta': valor_bruto_final * slippage,
-        'costes_transaccion': comisiones_compra + slippage_compra + coste_venta,
-        'coste_total': comisiones_compra + slippage_compra + coste_venta + impuestos_totales,
-        'num_operaciones': num_compras + 1,
-        'precio_medio': precio_medio,
-        'años': años,
-        'dias_dca': ultimo_dia_dca,
-        'intereses_monetario': intereses_monetario,
-        'capital_invertido': capital_invertido_total,
-        'capital_total_aportado': capital,
-        'aportacion_mensual': aportacion,
-        'modo': 'capital_disponible'
-    }
+@st.cache_resource
+def obtener_cargador_metadatos() -> CargadorMetadatos:
+    """Metadatos en segundo plano (nombre, divisa, tipo): no bloquean simulación ni gráficos."""
+    return CargadorMetadatos(obtener_proveedor())
 
 
-def simular_dca_aportacion_periodica(
-    precios: pd.Series,
-    aportacion_mensual: float,
-    meses_dca: int,
-    comision: float,
-    slippage: float,
-    aportacion_inicio_mes: bool = True
-) -> dict:
-    """
-    DCA Modo 2: Aportación periódica (ej: del sueldo).
-    NO hay coste de oportunidad porque el dinero no existe hasta que llega.
-    """
-    dias_entre = 21
-    offset_dias = 0 if aportacion_inicio_mes else dias_entre
-    
-    # Arrays para tracking
-    participaciones_acumuladas = np.zeros(len(precios))
-    participaciones = 0.0
-    capital_invertido_total = 0.0
-    comisiones_compra = 0.0
-    slippage_compra = 0.0
-    precios_compra = []
-    cantidades_compra = []
-    num_compras = 0
-    indices_compra = []
-    
-    for mes in range(meses_dca):
-        idx = mes * dias_entre + offset_dias
-        if idx >= len(precios):
-            break
-        
-        # Compra con costes
-        coste_op = aportacion_mensual * (comision + slippage)
-        capital_efectivo = aportacion_mensual - coste_op
-        precio = precios.iloc[idx]
-        nuevas_part = capital_efectivo / precio
-        
-        participaciones += nuevas_part
-        capital_invertido_total += aportacion_mensual
-        comisiones_compra += aportacion_mensual * comision
-        slippage_compra += aportacion_mensual * slippage
-        num_compras += 1
-        precios_compra.append(precio)
-        cantidades_compra.append(nuevas_part)
-        indices_compra.append(idx)
-        
-        # Actualizar participaciones desde este punto hasta la siguiente compra
-        siguiente_idx = (mes + 1) * dias_entre + offset_dias
-        if siguiente_idx > len(precios):
-            siguiente_idx = len(precios)
-        participaciones_acumuladas[idx:siguiente_idx] = participaciones
-    
-    # Rellenar el resto con las participaciones finales
-    ultimo_dia_dca = indices_compra[-1] if indices_compra else 0
-    if indices_compra:
-        participaciones_acumuladas[ultimo_dia_dca:] = participaciones
-    
-    # EVOLUCIÓN
-    valores = pd.Series(participaciones_acumuladas * precios.values, index=precios.index)
-    
-    # VENTA
-    valor_bruto_final = valores.iloc[-1]
-    coste_venta = valor_bruto_final * (comision + slippage)
-    valor_tras_venta = valor_bruto_final - coste_venta
-    
-    # IMPUESTOS
-    plusvalia = valor_tras_venta - capital_invertido_total
-    impuestos, desglose_imp = calcular_impuestos_españa(plusvalia)
-    valor_neto = valor_tras_venta - impuestos
-    
-    # MÉTRICAS
-    dias = (precios.index[-1] - precios.index[0]).days
-    años = dias / 365.25
-    rentabilidad = (valor_neto / capital_invertido_total - 1) * 100
-    cagr = calcular_cagr(capital_invertido_total, valor_neto, años)
-    
-    # Max DD calculado SOLO desde el último día del DCA (comparable con LS)
-    valores_post_dca = valores.iloc[ultimo_dia_dca:]
-    if len(valores_post_dca) > 1 and valores_post_dca.iloc[0] > 0:
-        max_dd, fecha_pico, fecha_valle = calcular_max_drawdown(valores_post_dca)
-    else:
-        max_dd, fecha_pico, fecha_valle = 0.0, precios.index[0], precios.index[0]
-    
-    # Volatilidad post-DCA
-    if len(valores_post_dca) > 1:
-        retornos_diarios = valores_post_dca.pct_change().dropna()
-        volatilidad = retornos_diarios.std() * np.sqrt(252) * 100 if len(retornos_diarios) > 1 else 0
-    else:
-        volatilidad = 0
-    
-    sharpe = (cagr / volatilidad) if volatilidad > 0 else 0
-    
-    precio_medio = sum(p * c for p, c in zip(precios_compra, cantidades_compra)) / sum(cantidades_compra) if cantidades_compra else 0
-    
-    return {
-        'valores': valores,
-        'valores_solo_activo': valores,  # En este modo son iguales (no hay cash pendiente)
-        'valor_bruto': valor_bruto_final,
-        'valor_tras_venta': valor_tras_venta,
-        'valor_neto': valor_neto,
-        'rentabilidad': rentabilidad,
-        'cagr': cagr,
-        'max_drawdown': max_dd,
-        'fecha_pico_dd': fecha_pico,
-        'fecha_valle_dd': fecha_valle,
-        'volatilidad': volatilidad,
-        'sharpe': sharpe,
-        'base_coste': capital_invertido_total,
-        'plusvalia': plusvalia,
-        'impuestos': impuestos,
-        'impuestos_activo': impuestos,
-        'impuestos_intereses': 0,
-        'desglose_impuestos': desglose_imp,
-        'tipo_efectivo': (impuestos / plusvalia * 100) if plusvalia > 0 else 0,
-        'comision_compra': comisiones_compra,
-        'slippage_compra': slippage_compra,
-        'comision_venta': valor_bruto_final * comision,
-        'slippage_venta': valor_bruto_final * slippage,
-        'costes_transaccion': comisiones_compra + slippage_compra + coste_venta,
-        'coste_total': comisiones_compra + slippage_compra + coste_venta + impuestos,
-        'num_operaciones': num_compras + 1,
-        'precio_medio': precio_medio,
-        'años': años,
-        'dias_dca': ultimo_dia_dca,
-        'intereses_monetario': 0,
-        'capital_invertido': capital_invertido_total,
-        'capital_total_aportado': capital_invertido_total,
-        'aportacion_mensual': aportacion_mensual,
-        'modo': 'aportacion_periodica'
-    }
+@st.cache_data(ttl=3600, show_spinner=False)
+def ejecutar_universo_cacheado(tickers: tuple, fecha_inicio: str, escenario: dict) -> dict:
+    """Ranking LS vs DCA de un universo: descargas en paralelo sobre el almacén compartido."""
+    return ejecutar_universo(obtener_proveedor(), tickers, fecha_inicio, escenario)
 
 
-@st.cache_data(ttl=3600)
-def descargar_datos(ticker: str, fecha_inicio: str) -> tuple[pd.Series, dict]:
-    """Descarga datos y metadata."""
-    try:
-        activo = yf.Ticker(ticker)
-        data = activo.history(start=fecha_inicio, auto_adjust=True)
-        if data.empty:
-            return None, None
-        info = activo.info
-        return data['Close'].dropna(), info
-    except:
-        return None, None
+@st.cache_resource
+def obtener_cache_simulaciones() -> CacheLRU:
+    """Resultados de simulación compartidos entre reruns: los cambios de vista no vuelven a simular."""
+    return CacheLRU(max_entradas=128)
+
+
+@st.cache_resource
+def configurar_registro_tiempos() -> logging.Logger:
+    """Tiempos por etapa de cada rerun como líneas JSON en stderr (logger lump_sum.tiempos)."""
+    manejador = logging.StreamHandler(sys.stderr)
+    manejador.setFormatter(logging.Formatter('%(message)s'))
+    REGISTRO.addHandler(manejador)
+    REGISTRO.setLevel(logging.INFO)
+    REGISTRO.propagate = False
+    return REGISTRO
 
 
 # =============================================================================
@@ -813,7 +397,7 @@ El capital pendiente genera intereses en monetario.</small>
         
         aportacion_mensual_calc = capital_dca / meses_dca
         st.caption(f"→ Aportación: {aportacion_mensual_calc:,.0f}/mes")
-        
+    
     else:
         st.markdown("""
 <div class="mode-box">
@@ -856,16 +440,30 @@ No hay coste de oportunidad porque el dinero no existe hasta que llega.</small>
         capital_dca = aportacion_mensual * meses_dca
         st.caption(f"→ Capital total: {capital_dca:,.0f}")
     
-    # Momento de aportación
-    st.markdown("**Momento aportación**")
-    momento_aportacion = st.radio(
-        "Momento",
-        options=["inicio", "final"],
-        format_func=lambda x: "📅 Principio de mes" if x == "inicio" else "📅 Final de mes",
-        horizontal=True,
+    # Calendario de aportaciones (sesiones reales del mercado)
+    CALENDARIOS = {
+        'primer_dia_mes': "📅 Primer día hábil del mes",
+        'ultimo_dia_mes': "📅 Último día hábil del mes",
+        'dia_mes:15': "📅 Día 15 de cada mes",
+        'semanal:2': "📅 Cada 2 semanas",
+        'semanal': "📅 Cada semana",
+    }
+    st.markdown("**Calendario aportaciones**")
+    regla_calendario = st.selectbox(
+        "Calendario",
+        options=list(CALENDARIOS),
+        format_func=CALENDARIOS.get,
         label_visibility="collapsed"
     )
-    aportacion_inicio = momento_aportacion == "inicio"
+    
+    # Con calendarios semanales el plan dura los mismos meses y el capital se reparte entre más compras
+    num_compras_dca = num_aportaciones(meses_dca, regla_calendario)
+    if modo_dca == "capital_disponible":
+        aportacion_dca = capital_dca / num_compras_dca
+    else:
+        aportacion_dca = aportacion_mensual * meses_dca / num_compras_dca
+    if num_compras_dca != meses_dca:
+        st.caption(f"→ {num_compras_dca} aportaciones de {aportacion_dca:,.0f}")
     
     st.markdown('<div class="separator"></div>', unsafe_allow_html=True)
     
@@ -904,6 +502,21 @@ No hay coste de oportunidad porque el dinero no existe hasta que llega.</small>
 # MAIN
 # =============================================================================
 
+# Tiempos por etapa de este rerun (registro JSON); con ?debug=1 se muestran al final
+configurar_registro_tiempos()
+depuracion = st.query_params.get('debug') == '1'
+cronometro = Cronometro(ticker=ticker_input, modo_dca=modo_dca)
+
+
+def pintar_figura(fig: go.Figure, nombre: str):
+    """st.plotly_chart cronometrado; en depuración mide también el JSON de la figura."""
+    if depuracion:
+        with cronometro.etapa(f'serializacion_{nombre}') as etapa:
+            etapa['bytes'] = len(fig.to_json())
+    with cronometro.etapa(f'render_{nombre}', trazas=len(fig.data)):
+        st.plotly_chart(fig, use_container_width=True)
+
+
 st.markdown("""
 <h1 style="font-size: 2.5rem; margin-bottom: 8px;">
 Lump Sum vs Dollar Cost Averaging
@@ -926,13 +539,27 @@ if not ticker_input:
     st.warning("Introduce un ticker válido")
     st.stop()
 
-with st.spinner(f"Cargando {ticker_input}..."):
-    precios_full, info_activo = descargar_datos(ticker_input, str(fecha_inicio))
+# Los metadatos se piden en paralelo a los precios y no se esperan
+cargador_metadatos = obtener_cargador_metadatos()
+cargador_metadatos.solicitar(ticker_input)
+
+with st.spinner(f"Cargando {ticker_input}..."), cronometro.etapa('carga_datos', cache='acierto') as etapa:
+    try:
+        precios_full = descargar_datos(ticker_input, str(fecha_inicio))
+    except TickerNoEncontrado:
+        precios_full = None
+    except ErrorDatos as e:
+        st.error(f"❌ Error obteniendo datos de '{ticker_input}': {e}")
+        st.stop()
+    if precios_full is not None:
+        etapa.update(sesiones=len(precios_full), bytes=int(precios_full.memory_usage(index=True)))
 
 if precios_full is None or precios_full.empty:
     st.error(f"❌ No se encontraron datos para '{ticker_input}'")
     st.stop()
 
+info_activo = cargador_metadatos.obtener(ticker_input)
+
 nombre_activo = info_activo.get('shortName', ticker_input) if info_activo else ticker_input
 divisa = info_activo.get('currency', 'N/A') if info_activo else 'N/A'
 tipo_activo = info_activo.get('quoteType', 'N/A') if info_activo else 'N/A'
@@ -945,25 +572,45 @@ st.markdown(f"""
 
 # Recortar datos
 dias_horizonte = horizonte * 252
-if len(precios_full) < dias_horizonte:
+if len(precios_full) <= dias_horizonte:
     st.warning(f"⚠️ Solo hay {len(precios_full)} días. Ajustando horizonte.")
     dias_horizonte = len(precios_full) - 1
 
 precios = precios_full.iloc[:dias_horizonte + 1]
 
 # === SIMULACIONES ===
-resultado_ls = simular_lump_sum(precios, capital_ls, comision, slippage)
-
-if modo_dca == "capital_disponible":
-    resultado_dca = simular_dca_capital_disponible(
-        precios, capital_dca, meses_dca, comision, slippage, tasa_monetario, aportacion_inicio
+# Se simula una vez toda la serie descargada y cada horizonte se lee de sus prefijos:
+# mover el slider de horizonte no vuelve a simular. Clave: ticker + versión de los
+# precios (huella de la serie) + parámetros que no dependen del horizonte
+cache_simulaciones = obtener_cache_simulaciones()
+clave_datos = (ticker_input, huella_serie(precios_full))
+
+with cronometro.etapa('simulacion_ls'):
+    prefijos_ls = cache_simulaciones.obtener_o_calcular(
+        ('ls',) + clave_datos + (capital_ls, comision, slippage),
+        PrefijosSimulacion.lump_sum, precios_full, capital_ls, comision, slippage
     )
-    descripcion_dca = f"DCA {meses_dca}m (capital disponible)"
-else:
-    resultado_dca = simular_dca_aportacion_periodica(
-        precios, aportacion_mensual, meses_dca, comision, slippage, aportacion_inicio
-    )
-    descripcion_dca = f"DCA {aportacion_mensual:,.0f}/mes × {meses_dca}m"
+    resultado_ls = prefijos_ls.resultado(dias_horizonte)
+
+with cronometro.etapa('simulacion_dca'):
+    if modo_dca == "capital_disponible":
+        prefijos_dca = cache_simulaciones.obtener_o_calcular(
+            ('dca', modo_dca) + clave_datos + (capital_dca, num_compras_dca, regla_calendario, comision, slippage, tasa_monetario),
+            PrefijosSimulacion.dca_capital_disponible, precios_full, capital_dca, num_compras_dca, comision, slippage, tasa_monetario,
+            regla_calendario
+        )
+        descripcion_dca = f"DCA {meses_dca}m (capital disponible)"
+    else:
+        prefijos_dca = cache_simulaciones.obtener_o_calcular(
+            ('dca', modo_dca) + clave_datos + (aportacion_dca, num_compras_dca, regla_calendario, comision, slippage),
+            PrefijosSimulacion.dca_aportacion_periodica, precios_full, aportacion_dca, num_compras_dca, comision, slippage,
+            regla_calendario
+        )
+        descripcion_dca = f"DCA {aportacion_mensual:,.0f}/mes × {meses_dca}m"
+    resultado_dca = prefijos_dca.resultado(dias_horizonte)
+    
+    # Posiciones de compra de la ventana (puntos obligatorios del gráfico)
+    compras_dca = prefijos_dca.compras(dias_horizonte)
 
 # Comparación justa: rentabilidad sobre capital aportado
 ganador = "LS" if resultado_ls['rentabilidad'] > resultado_dca['rentabilidad'] else "DCA"
@@ -994,7 +641,7 @@ with col1:
 <div class="metric-card-highlight">
 <div class="metric-title">LUMP SUM ({capital_ls:,.0f}) {badge}</div>
 <div class="metric-value {color}">{resultado_ls['rentabilidad']:+.1f}%</div>
-<div class="metric-subtitle">{resultado_ls['valor_neto']:,.0f} {divisa} neto | CAGR: {resultado_ls['cagr']:.1f}%</div>
+<div class="metric-subtitle">{resultado_ls['valor_neto']:,.0f} {divisa} neto | CAGR: {resultado_ls['cagr']:.1f}% | TIR: {resultado_ls['tir']:.1f}%</div>
 </div>
 """, unsafe_allow_html=True)
 
@@ -1005,7 +652,7 @@ with col2:
 <div class="metric-card-highlight">
 <div class="metric-title">{descripcion_dca} {badge}</div>
 <div class="metric-value {color}">{resultado_dca['rentabilidad']:+.1f}%</div>
-<div class="metric-subtitle">{resultado_dca['valor_neto']:,.0f} {divisa} neto | CAGR: {resultado_dca['cagr']:.1f}%</div>
+<div class="metric-subtitle">{resultado_dca['valor_neto']:,.0f} {divisa} neto | CAGR: {resultado_dca['cagr']:.1f}% | TIR: {resultado_dca['tir']:.1f}%</div>
 </div>
 """, unsafe_allow_html=True)
 
@@ -1120,7 +767,7 @@ st.markdown('<div class="separator"></div>', unsafe_allow_html=True)
 st.markdown('<div class="section-header">📈 Evolución del patrimonio</div>', unsafe_allow_html=True)
 
 # Opciones de visualización
-col_v1, col_v2, col_v3 = st.columns(3)
+col_v1, col_v2, col_v3, col_v4 = st.columns(4)
 with col_v1:
     vista_grafico = st.radio(
         "Escala",
@@ -1143,6 +790,33 @@ with col_v2:
         vista_patrimonio = "total"
 with col_v3:
     mostrar_sin_costes = st.checkbox("📉 Línea sin costes", value=False)
+with col_v4:
+    puntos_grafico = st.select_slider(
+        "Puntos por curva",
+        options=[500, 1000, 2000, 5000, "Todos"],
+        value=2000,
+        label_visibility="collapsed",
+        help="Máximo de puntos por curva (LTTB conserva la forma). 'Todos' pinta cada día con WebGL."
+    )
+
+# Curvas largas: LTTB al presupuesto de puntos, o Scattergl si se pintan todos los días
+MAX_PUNTOS_SVG = 5000
+submuestrear = puntos_grafico != "Todos" and len(precios) > puntos_grafico
+Traza = go.Scattergl if not submuestrear and len(precios) > MAX_PUNTOS_SVG else go.Scatter
+
+# Puntos que se conservan exactos: pico y valle del drawdown y fechas de compra
+posiciones_dd_ls = precios.index.get_indexer([resultado_ls['fecha_pico_dd'], resultado_ls['fecha_valle_dd']])
+posiciones_dd_dca = precios.index.get_indexer([resultado_dca['fecha_pico_dd'], resultado_dca['fecha_valle_dd']])
+obligatorios_ls = posiciones_dd_ls
+obligatorios_dca = np.concatenate((posiciones_dd_dca, compras_dca))
+
+
+def reducir_curva(serie: pd.Series, obligatorios) -> pd.Series:
+    """Serie submuestreada con LTTB si supera el presupuesto de puntos."""
+    if not submuestrear:
+        return serie
+    return serie.iloc[lttb(serie.to_numpy(), puntos_grafico, obligatorios)]
+
 
 # Seleccionar qué valores DCA mostrar
 if vista_patrimonio == "solo_activo" and modo_dca == "capital_disponible":
@@ -1152,137 +826,114 @@ else:
 
 # Calcular curvas sin costes para referencia
 if mostrar_sin_costes:
-    # LS sin costes
-    participaciones_ls_sin = capital_ls / precios.iloc[0]
-    valores_ls_sin = participaciones_ls_sin * precios
-    
-    # DCA sin costes
-    if modo_dca == "capital_disponible":
-        aport = capital_dca / meses_dca
-    else:
-        aport = aportacion_mensual
-    
-    dias_entre = 21
-    offset = 0 if aportacion_inicio else dias_entre
-    part_sin = 0.0
-    part_acum_sin = np.zeros(len(precios))
-    cash_sin = np.zeros(len(precios))
-    cash_pend = capital_dca if modo_dca == "capital_disponible" else 0
-    
-    for mes in range(meses_dca):
-        idx = mes * dias_entre + offset
-        if idx >= len(precios):
-            break
+    with cronometro.etapa('curvas_sin_costes'):
+        # Curvas sin costes calculadas por el motor (nivel de coste 0)
+        valores_ls_sin = pd.Series(resultado_ls['curvas_coste']['valores'][0], index=precios.index)
+        curvas_dca_sin = resultado_dca['curvas_coste']
+        if vista_patrimonio == "total" and modo_dca == "capital_disponible":
+            valores_dca_sin = pd.Series(curvas_dca_sin['valores'][0], index=precios.index)
+        else:
+            valores_dca_sin = pd.Series(curvas_dca_sin['valores_solo_activo'][0], index=precios.index)
+
+with cronometro.etapa('figura_evolucion') as etapa:
+    fig = go.Figure()
+    
+    if vista_grafico == "absoluto":
+        curva = reducir_curva(resultado_ls['valores'], obligatorios_ls)
+        fig.add_trace(Traza(
+            x=curva.index, y=curva.values,
+            fill='tozeroy', fillcolor='rgba(99, 102, 241, 0.15)',
+            line=dict(color='#818cf8', width=2.5),
+            name='Lump Sum',
+            hovertemplate='<b>LS</b><br>%{x|%Y-%m-%d}<br>%{y:,.0f} ' + divisa + '<extra></extra>'
+        ))
         
-        # Actualizar cash hasta este punto
-        if modo_dca == "capital_disponible":
-            cash_sin[:idx] = cash_pend
+        curva = reducir_curva(valores_dca_mostrar, obligatorios_dca)
+        fig.add_trace(Traza(
+            x=curva.index, y=curva.values,
+            fill='tozeroy', fillcolor='rgba(251, 146, 60, 0.15)',
+            line=dict(color='#fb923c', width=2.5),
+            name='DCA',
+            hovertemplate='<b>DCA</b><br>%{x|%Y-%m-%d}<br>%{y:,.0f} ' + divisa + '<extra></extra>'
+        ))
         
-        part_sin += aport / precios.iloc[idx]  # Sin costes = aportación completa
-        cash_pend -= aport
+        if mostrar_sin_costes:
+            curva = reducir_curva(valores_ls_sin, obligatorios_ls)
+            fig.add_trace(Traza(
+                x=curva.index, y=curva.values,
+                line=dict(color='#818cf8', width=1.5, dash='dot'),
+                name='LS sin costes',
+                hovertemplate='<b>LS sin costes</b><br>%{x|%Y-%m-%d}<br>%{y:,.0f}<extra></extra>'
+            ))
+            curva = reducir_curva(valores_dca_sin, obligatorios_dca)
+            fig.add_trace(Traza(
+                x=curva.index, y=curva.values,
+                line=dict(color='#fb923c', width=1.5, dash='dot'),
+                name='DCA sin costes',
+                hovertemplate='<b>DCA sin costes</b><br>%{x|%Y-%m-%d}<br>%{y:,.0f}<extra></extra>'
+            ))
         
-        sig = min((mes + 1) * dias_entre + offset, len(precios))
-        part_acum_sin[idx:sig] = part_sin
-    
-    if len(part_acum_sin) > 0:
-        part_acum_sin[idx:] = part_sin
-        if modo_dca == "capital_disponible":
-            cash_sin[idx:] = 0
-    
-    valores_dca_sin_activo = pd.Series(part_acum_sin * precios.values, index=precios.index)
-    
-    if vista_patrimonio == "total" and modo_dca == "capital_disponible":
-        valores_dca_sin = valores_dca_sin_activo + pd.Series(cash_sin, index=precios.index)
+        y_title = f"Valor ({divisa})"
+        y_suffix = ""
     else:
-        valores_dca_sin = valores_dca_sin_activo
-
-fig = go.Figure()
-
-if vista_grafico == "absoluto":
-    fig.add_trace(go.Scatter(
-        x=resultado_ls['valores'].index, y=resultado_ls['valores'].values,
-        fill='tozeroy', fillcolor='rgba(99, 102, 241, 0.15)',
-        line=dict(color='#818cf8', width=2.5),
-        name='Lump Sum',
-        hovertemplate='<b>LS</b><br>%{x|%Y-%m-%d}<br>%{y:,.0f} ' + divisa + '<extra></extra>'
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=valores_dca_mostrar.index, y=valores_dca_mostrar.values,
-        fill='tozeroy', fillcolor='rgba(251, 146, 60, 0.15)',
-        line=dict(color='#fb923c', width=2.5),
-        name='DCA',
-        hovertemplate='<b>DCA</b><br>%{x|%Y-%m-%d}<br>%{y:,.0f} ' + divisa + '<extra></extra>'
-    ))
-    
-    if mostrar_sin_costes:
-        fig.add_trace(go.Scatter(
-            x=valores_ls_sin.index, y=valores_ls_sin.values,
-            line=dict(color='#818cf8', width=1.5, dash='dot'),
-            name='LS sin costes',
-            hovertemplate='<b>LS sin costes</b><br>%{x|%Y-%m-%d}<br>%{y:,.0f}<extra></extra>'
-        ))
-        fig.add_trace(go.Scatter(
-            x=valores_dca_sin.index, y=valores_dca_sin.values,
-            line=dict(color='#fb923c', width=1.5, dash='dot'),
-            name='DCA sin costes',
-            hovertemplate='<b>DCA sin costes</b><br>%{x|%Y-%m-%d}<br>%{y:,.0f}<extra></extra>'
-        ))
-    
-    y_title = f"Valor ({divisa})"
-    y_suffix = ""
-else:
-    rentabilidad_ls = (resultado_ls['valores'] / capital_ls - 1) * 100
-    cap_ref = capital_dca if modo_dca == "capital_disponible" else resultado_dca['capital_total_aportado']
-    rentabilidad_dca = (valores_dca_mostrar / cap_ref - 1) * 100
-    
-    fig.add_trace(go.Scatter(
-        x=rentabilidad_ls.index, y=rentabilidad_ls.values,
-        fill='tozeroy', fillcolor='rgba(99, 102, 241, 0.15)',
-        line=dict(color='#818cf8', width=2.5),
-        name='Lump Sum',
-        hovertemplate='<b>LS</b><br>%{x|%Y-%m-%d}<br>%{y:.1f}%<extra></extra>'
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=rentabilidad_dca.index, y=rentabilidad_dca.values,
-        fill='tozeroy', fillcolor='rgba(251, 146, 60, 0.15)',
-        line=dict(color='#fb923c', width=2.5),
-        name='DCA',
-        hovertemplate='<b>DCA</b><br>%{x|%Y-%m-%d}<br>%{y:.1f}%<extra></extra>'
-    ))
-    
-    if mostrar_sin_costes:
-        rent_ls_sin = (valores_ls_sin / capital_ls - 1) * 100
-        rent_dca_sin = (valores_dca_sin / cap_ref - 1) * 100
+        rentabilidad_ls = (resultado_ls['valores'] / capital_ls - 1) * 100
+        cap_ref = capital_dca if modo_dca == "capital_disponible" else resultado_dca['capital_total_aportado']
+        rentabilidad_dca = (valores_dca_mostrar / cap_ref - 1) * 100
         
-        fig.add_trace(go.Scatter(
-            x=rent_ls_sin.index, y=rent_ls_sin.values,
-            line=dict(color='#818cf8', width=1.5, dash='dot'),
-            name='LS sin costes'
+        curva = reducir_curva(rentabilidad_ls, obligatorios_ls)
+        fig.add_trace(Traza(
+            x=curva.index, y=curva.values,
+            fill='tozeroy', fillcolor='rgba(99, 102, 241, 0.15)',
+            line=dict(color='#818cf8', width=2.5),
+            name='Lump Sum',
+            hovertemplate='<b>LS</b><br>%{x|%Y-%m-%d}<br>%{y:.1f}%<extra></extra>'
         ))
-        fig.add_trace(go.Scatter(
-            x=rent_dca_sin.index, y=rent_dca_sin.values,
-            line=dict(color='#fb923c', width=1.5, dash='dot'),
-            name='DCA sin costes'
+        
+        curva = reducir_curva(rentabilidad_dca, obligatorios_dca)
+        fig.add_trace(Traza(
+            x=curva.index, y=curva.values,
+            fill='tozeroy', fillcolor='rgba(251, 146, 60, 0.15)',
+            line=dict(color='#fb923c', width=2.5),
+            name='DCA',
+            hovertemplate='<b>DCA</b><br>%{x|%Y-%m-%d}<br>%{y:.1f}%<extra></extra>'
         ))
+        
+        if mostrar_sin_costes:
+            rent_ls_sin = (valores_ls_sin / capital_ls - 1) * 100
+            rent_dca_sin = (valores_dca_sin / cap_ref - 1) * 100
+            
+            curva = reducir_curva(rent_ls_sin, obligatorios_ls)
+            fig.add_trace(Traza(
+                x=curva.index, y=curva.values,
+                line=dict(color='#818cf8', width=1.5, dash='dot'),
+                name='LS sin costes'
+            ))
+            curva = reducir_curva(rent_dca_sin, obligatorios_dca)
+            fig.add_trace(Traza(
+                x=curva.index, y=curva.values,
+                line=dict(color='#fb923c', width=1.5, dash='dot'),
+                name='DCA sin costes'
+            ))
+        
+        fig.add_hline(y=0, line_dash="dash", line_color="rgba(148, 163, 184, 0.5)")
+        y_title = "Rentabilidad (%)"
+        y_suffix = "%"
+    
+    fig.update_layout(
+        template="plotly_dark",
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="JetBrains Mono", color="#e2e8f0"),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, bgcolor="rgba(0,0,0,0)"),
+        xaxis=dict(showgrid=True, gridcolor='rgba(99, 102, 241, 0.1)'),
+        yaxis=dict(showgrid=True, gridcolor='rgba(99, 102, 241, 0.1)', title=y_title, ticksuffix=y_suffix),
+        margin=dict(l=60, r=20, t=40, b=40),
+        height=450, hovermode='x unified'
+    )
     
-    fig.add_hline(y=0, line_dash="dash", line_color="rgba(148, 163, 184, 0.5)")
-    y_title = "Rentabilidad (%)"
-    y_suffix = "%"
-
-fig.update_layout(
-    template="plotly_dark",
-    paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
-    font=dict(family="JetBrains Mono", color="#e2e8f0"),
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, bgcolor="rgba(0,0,0,0)"),
-    xaxis=dict(showgrid=True, gridcolor='rgba(99, 102, 241, 0.1)'),
-    yaxis=dict(showgrid=True, gridcolor='rgba(99, 102, 241, 0.1)', title=y_title, ticksuffix=y_suffix),
-    margin=dict(l=60, r=20, t=40, b=40),
-    height=450, hovermode='x unified'
-)
+    # Puntos que se envían al navegador tras el submuestreo
+    etapa['puntos'] = sum(len(traza.x) for traza in fig.data if traza.x is not None)
 
-st.plotly_chart(fig, use_container_width=True)
+pintar_figura(fig, 'evolucion')
 
 # Mostrar impacto de costes en números
 coste_total_pct = (comision + slippage) * 100 * 2  # Ida y vuelta
@@ -1460,6 +1111,15 @@ with tab2:
 </div>
 </div>
 """, unsafe_allow_html=True)
+    
+    # Libro de operaciones: lotes de compra y venta final con coste FIFO
+    libro_dca = resultado_dca['operaciones'].a_dataframe()
+    with st.expander(f"🧾 Libro de operaciones ({len(libro_dca)} operaciones, coste FIFO)"):
+        st.dataframe(libro_dca.round(4), hide_index=True, use_container_width=True)
+        st.download_button(
+            "⬇️ Descargar CSV", libro_dca.to_csv(index=False).encode('utf-8'),
+            file_name=f"operaciones_dca_{ticker_input}.csv", mime="text/csv"
+        )
 
 st.markdown('<div class="separator"></div>', unsafe_allow_html=True)
 
@@ -1498,7 +1158,7 @@ with col1:
         yaxis=dict(showgrid=True, gridcolor='rgba(99, 102, 241, 0.1)', title=divisa),
         margin=dict(l=60, r=20, t=60, b=40), height=350
     )
-    st.plotly_chart(fig_bar, use_container_width=True)
+    pintar_figura(fig_bar, 'comparativa_costes')
 
 with col2:
     labels = ['Comisiones', 'Slippage', 'Impuestos', 'Neto']
@@ -1523,7 +1183,322 @@ with col2:
         annotations=[dict(text=f'<b>LS</b><br>{resultado_ls["valor_neto"]:,.0f}', x=0.5, y=0.5,
                           font_size=16, font_color='#e2e8f0', showarrow=False)]
     )
-    st.plotly_chart(fig_donut, use_container_width=True)
+    pintar_figura(fig_donut, 'reparto_ls')
+
+# =============================================================================
+# VENTANAS MÓVILES
+# =============================================================================
+
+st.markdown('<div class="separator"></div>', unsafe_allow_html=True)
+st.markdown('<div class="section-header">🔁 Todas las fechas de inicio</div>', unsafe_allow_html=True)
+
+mostrar_ventanas = st.checkbox(
+    "Evaluar LS vs DCA para cada posible día de inicio",
+    value=False,
+    help=f"Repite el backtest con horizonte de {horizonte} años empezando en cada sesión disponible desde {fecha_inicio}"
+)
+
+if mostrar_ventanas:
+    if len(precios_full) <= dias_horizonte:
+        st.warning("⚠️ No hay historia suficiente para más de una ventana con este horizonte.")
+    else:
+        # Cacheado como Monte Carlo: los cambios visuales no repiten el estudio
+        estudio = cache_simulaciones.obtener_o_calcular(
+            ('ventanas', modo_dca) + clave_datos + (
+                dias_horizonte, capital_ls, capital_dca, num_compras_dca, aportacion_dca, regla_calendario,
+                comision, slippage, tasa_monetario
+            ),
+            estudio_ventanas_moviles, precios_full, dias_horizonte, capital_dca, num_compras_dca, comision, slippage,
+            tasa_monetario, modo_dca,
+            aportacion_mensual=aportacion_dca if modo_dca == "aportacion_periodica" else None,
+            calendario=regla_calendario, capital_ls=capital_ls
+        )
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.markdown(f"""
+<div class="metric-card">
+<div class="metric-title">LS GANA</div>
+<div class="metric-value metric-value-blue">{estudio['win_rate_ls']:.1f}%</div>
+<div class="metric-subtitle">{estudio['num_ventanas']:,} ventanas</div>
+</div>
+""", unsafe_allow_html=True)
+        with col2:
+            st.markdown(f"""
+<div class="metric-card">
+<div class="metric-title">VENTAJA MEDIANA LS</div>
+<div class="metric-value metric-value-amber">{estudio['diferencia_mediana']:+.1f} pp</div>
+<div class="metric-subtitle">media {estudio['diferencia_media']:+.1f} pp</div>
+</div>
+""", unsafe_allow_html=True)
+        with col3:
+            mejor = estudio['mejor_ventana']
+            st.markdown(f"""
+<div class="metric-card">
+<div class="metric-title">MEJOR VENTANA LS</div>
+<div class="metric-value metric-value-green">{mejor['diferencia_pp']:+.1f} pp</div>
+<div class="metric-subtitle">{mejor['fecha_inicio'].strftime('%Y-%m-%d')} → {mejor['fecha_fin'].strftime('%Y-%m-%d')}</div>
+</div>
+""", unsafe_allow_html=True)
+        with col4:
+            peor = estudio['peor_ventana']
+            st.markdown(f"""
+<div class="metric-card">
+<div class="metric-title">PEOR VENTANA LS</div>
+<div class="metric-value metric-value-red">{peor['diferencia_pp']:+.1f} pp</div>
+<div class="metric-subtitle">{peor['fecha_inicio'].strftime('%Y-%m-%d')} → {peor['fecha_fin'].strftime('%Y-%m-%d')}</div>
+</div>
+""", unsafe_allow_html=True)
+        
+        fig_ventanas = go.Figure()
+        fig_ventanas.add_trace(go.Histogram(
+            x=estudio['diferencia_pp'].values, nbinsx=60, marker_color='#818cf8',
+            hovertemplate='%{x:.1f} pp<br>%{y} ventanas<extra></extra>'
+        ))
+        fig_ventanas.add_vline(x=0, line_dash="dash", line_color="rgba(148, 163, 184, 0.5)")
+        fig_ventanas.update_layout(
+            template="plotly_dark", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(family="JetBrains Mono", color="#e2e8f0"), showlegend=False,
+            xaxis=dict(showgrid=False, title="Ventaja LS (pp)"),
+            yaxis=dict(showgrid=True, gridcolor='rgba(99, 102, 241, 0.1)', title="Ventanas"),
+            margin=dict(l=60, r=20, t=40, b=40), height=350
+        )
+        pintar_figura(fig_ventanas, 'ventanas_moviles')
+        
+        pct = estudio['percentiles_pp']
+        st.caption(
+            f"Percentiles ventaja LS: P5 {pct[5]:+.1f} · P25 {pct[25]:+.1f} · P50 {pct[50]:+.1f} · "
+            f"P75 {pct[75]:+.1f} · P95 {pct[95]:+.1f} pp"
+        )
+        
+        # Mapa de calor: win rate LS por meses DCA × comisión (slippage actual)
+        meses_mapa = [m for m in [3, 6, 12, 18, 24, 36, 48, 60] if m <= horizonte * 12]
+        comisiones_mapa = [0.0, 0.0005, 0.001, 0.0025, 0.005, 0.01]
+        barrido = cache_simulaciones.obtener_o_calcular(
+            ('barrido', modo_dca) + clave_datos + (
+                dias_horizonte, capital_ls, capital_dca, tuple(meses_mapa), tuple(comisiones_mapa), aportacion_dca,
+                regla_calendario, slippage, tasa_monetario
+            ),
+            barrido_parametros, precios_full, dias_horizonte, capital_dca,
+            [num_aportaciones(m, regla_calendario) for m in meses_mapa], comisiones_mapa, [slippage],
+            tasa_monetario=tasa_monetario, modo_dca=modo_dca,
+            aportacion_mensual=aportacion_dca if modo_dca == "aportacion_periodica" else None,
+            calendario=regla_calendario, capital_ls=capital_ls
+        )
+        win_rate_mapa = (barrido['diferencia_pp'][..., 0] > 0).mean(axis=1) * 100
+        
+        fig_mapa = go.Figure(go.Heatmap(
+            z=win_rate_mapa,
+            x=[f"{c*100:.2f}%" for c in comisiones_mapa],
+            y=[f"{m}m" for m in meses_mapa],
+            colorscale=[[0, '#fb923c'], [0.5, '#1e1e32'], [1, '#818cf8']], zmid=50,
+            text=[[f"{v:.0f}%" for v in fila] for fila in win_rate_mapa], texttemplate="%{text}",
+            hovertemplate='DCA %{y} · comisión %{x}<br>LS gana en %{z:.1f}% de ventanas<extra></extra>'
+        ))
+        fig_mapa.update_layout(
+            template="plotly_dark", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(family="JetBrains Mono", color="#e2e8f0"),
+            xaxis=dict(title=f"Comisión (slippage {slippage*100:.2f}%)"),
+            yaxis=dict(title="Meses DCA"),
+            margin=dict(l=60, r=20, t=40, b=40), height=350
+        )
+        pintar_figura(fig_mapa, 'mapa_win_rate')
+        st.caption("% de fechas de inicio en las que Lump Sum supera a DCA para cada combinación de meses y comisión.")
+
+# =============================================================================
+# MONTE CARLO
+# =============================================================================
+
+st.markdown('<div class="separator"></div>', unsafe_allow_html=True)
+st.markdown('<div class="section-header">🎲 Caminos sintéticos</div>', unsafe_allow_html=True)
+
+mostrar_monte_carlo = st.checkbox(
+    "Distribución LS vs DCA con Monte Carlo (block bootstrap)",
+    value=False,
+    help="Genera caminos de precios remuestreando bloques de retornos diarios del activo desde "
+         f"{fecha_inicio} y compara LS y DCA en cada uno, con horizonte de {horizonte} años"
+)
+
+if mostrar_monte_carlo:
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        num_caminos = st.select_slider("Caminos", options=[500, 1000, 2000, 5000, 10000], value=1000)
+    with col2:
+        tamaño_bloque = st.slider("Bloque (sesiones)", 5, 126, 21, 1, help="21 ≈ un mes de retornos consecutivos")
+    with col3:
+        semilla = st.number_input("Semilla", min_value=0, value=42, step=1, help="Misma semilla, mismos caminos")
+    
+    monte_carlo = cache_simulaciones.obtener_o_calcular(
+        ('monte_carlo', modo_dca) + clave_datos + (
+            dias_horizonte, capital_dca, num_compras_dca, aportacion_dca, regla_calendario,
+            comision, slippage, tasa_monetario, num_caminos, tamaño_bloque, semilla
+        ),
+        monte_carlo_ls_dca, precios_full, dias_horizonte, capital_dca, num_compras_dca, comision, slippage,
+        tasa_monetario, modo_dca,
+        aportacion_mensual=aportacion_dca if modo_dca == "aportacion_periodica" else None,
+        calendario=regla_calendario, num_caminos=num_caminos, tamaño_bloque=tamaño_bloque, semilla=int(semilla)
+    )
+    pct_ls = monte_carlo['percentiles_ls']
+    pct_dca = monte_carlo['percentiles_dca']
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.markdown(f"""
+<div class="metric-card">
+<div class="metric-title">PROB. LS GANA</div>
+<div class="metric-value metric-value-blue">{monte_carlo['win_rate_ls']:.1f}%</div>
+<div class="metric-subtitle">{monte_carlo['num_caminos']:,} caminos</div>
+</div>
+""", unsafe_allow_html=True)
+    with col2:
+        st.markdown(f"""
+<div class="metric-card">
+<div class="metric-title">VENTAJA MEDIANA LS</div>
+<div class="metric-value metric-value-amber">{monte_carlo['diferencia_mediana']:+.1f} pp</div>
+<div class="metric-subtitle">media {monte_carlo['diferencia_media']:+.1f} pp</div>
+</div>
+""", unsafe_allow_html=True)
+    with col3:
+        st.markdown(f"""
+<div class="metric-card">
+<div class="metric-title">LS · MEDIANA</div>
+<div class="metric-value metric-value-blue">{pct_ls[50]:+.1f}%</div>
+<div class="metric-subtitle">P5 {pct_ls[5]:+.1f}% · P95 {pct_ls[95]:+.1f}%</div>
+</div>
+""", unsafe_allow_html=True)
+    with col4:
+        st.markdown(f"""
+<div class="metric-card">
+<div class="metric-title">DCA · MEDIANA</div>
+<div class="metric-value metric-value-amber">{pct_dca[50]:+.1f}%</div>
+<div class="metric-subtitle">P5 {pct_dca[5]:+.1f}% · P95 {pct_dca[95]:+.1f}%</div>
+</div>
+""", unsafe_allow_html=True)
+    
+    fig_mc = go.Figure()
+    fig_mc.add_trace(go.Histogram(
+        x=monte_carlo['rentabilidad_ls'], name='Lump Sum', nbinsx=60, marker_color='#818cf8', opacity=0.6,
+        hovertemplate='%{x:.1f}%<br>%{y} caminos<extra>LS</extra>'
+    ))
+    fig_mc.add_trace(go.Histogram(
+        x=monte_carlo['rentabilidad_dca'], name='DCA', nbinsx=60, marker_color='#fb923c', opacity=0.6,
+        hovertemplate='%{x:.1f}%<br>%{y} caminos<extra>DCA</extra>'
+    ))
+    fig_mc.update_layout(
+        template="plotly_dark", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="JetBrains Mono", color="#e2e8f0"), barmode='overlay',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        xaxis=dict(showgrid=False, title="Rentabilidad neta (%)"),
+        yaxis=dict(showgrid=True, gridcolor='rgba(99, 102, 241, 0.1)', title="Caminos"),
+        margin=dict(l=60, r=20, t=40, b=40), height=350
+    )
+    pintar_figura(fig_mc, 'monte_carlo')
+    
+    pct = monte_carlo['percentiles_pp']
+    st.caption(
+        f"Percentiles ventaja LS: P5 {pct[5]:+.1f} · P25 {pct[25]:+.1f} · P50 {pct[50]:+.1f} · "
+        f"P75 {pct[75]:+.1f} · P95 {pct[95]:+.1f} pp. Caminos desde el último precio con bloques de "
+        f"{tamaño_bloque} sesiones de la historia disponible."
+    )
+
+# =============================================================================
+# UNIVERSO
+# =============================================================================
+
+st.markdown('<div class="separator"></div>', unsafe_allow_html=True)
+st.markdown('<div class="section-header">🌍 Universo de activos</div>', unsafe_allow_html=True)
+
+mostrar_universo = st.checkbox(
+    "Misma configuración en muchos activos",
+    value=False,
+    help="Descarga en paralelo los precios de cada ticker y compara LS vs DCA con los parámetros de la barra lateral"
+)
+
+if mostrar_universo:
+    NOMBRES_UNIVERSO = {'eurostoxx50': "🇪🇺 Euro Stoxx 50", 'etfs': "🌐 ETFs"}
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        universo = st.selectbox("Universo", options=list(NOMBRES_UNIVERSO), format_func=NOMBRES_UNIVERSO.get)
+    with col2:
+        texto_tickers = st.text_input(
+            "Tickers (editables, separados por comas)", value=", ".join(UNIVERSOS[universo]), key=f"tickers_{universo}"
+        )
+    tickers_universo = tuple(t for t in texto_tickers.replace(",", " ").split() if t)
+    
+    escenario_universo = {
+        'horizonte': horizonte,
+        'modo': modo_dca,
+        'meses_dca': meses_dca,
+        'momento': regla_calendario,
+        'comision': comision,
+        'slippage': slippage,
+        'tasa_monetario': tasa_monetario,
+        'capital': capital_dca,
+        'capital_ls': capital_ls,
+        'aportacion_mensual': aportacion_mensual if modo_dca == "aportacion_periodica" else capital_dca / meses_dca,
+    }
+    with st.spinner(f"Descargando y simulando {len(tickers_universo)} activos..."):
+        resultado_universo = ejecutar_universo_cacheado(tickers_universo, str(fecha_inicio), escenario_universo)
+    ranking = resultado_universo['ranking']
+    errores_universo = resultado_universo['errores']
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown(f"""
+<div class="metric-card">
+<div class="metric-title">LS GANA</div>
+<div class="metric-value metric-value-blue">{resultado_universo['win_rate_ls']:.1f}%</div>
+<div class="metric-subtitle">{len(ranking)} de {resultado_universo['num_tickers']} activos simulados</div>
+</div>
+""", unsafe_allow_html=True)
+    with col2:
+        st.markdown(f"""
+<div class="metric-card">
+<div class="metric-title">VENTAJA MEDIANA LS</div>
+<div class="metric-value metric-value-amber">{resultado_universo['diferencia_mediana']:+.1f} pp</div>
+<div class="metric-subtitle">horizonte {horizonte} años</div>
+</div>
+""", unsafe_allow_html=True)
+    with col3:
+        color_errores = "metric-value-red" if len(errores_universo) else "metric-value-green"
+        st.markdown(f"""
+<div class="metric-card">
+<div class="metric-title">SIN SIMULAR</div>
+<div class="metric-value {color_errores}">{len(errores_universo)}</div>
+<div class="metric-subtitle">sin datos o sin historia suficiente</div>
+</div>
+""", unsafe_allow_html=True)
+    
+    if not ranking.empty:
+        fig_universo = go.Figure(go.Bar(
+            x=ranking['ticker'], y=ranking['diferencia_pp'],
+            marker_color=['#818cf8' if d > 0 else '#fb923c' for d in ranking['diferencia_pp']],
+            hovertemplate='%{x}<br>Ventaja LS: %{y:+.1f} pp<extra></extra>'
+        ))
+        fig_universo.add_hline(y=0, line_dash="dash", line_color="rgba(148, 163, 184, 0.5)")
+        fig_universo.update_layout(
+            template="plotly_dark", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(family="JetBrains Mono", color="#e2e8f0"), showlegend=False,
+            xaxis=dict(showgrid=False),
+            yaxis=dict(showgrid=True, gridcolor='rgba(99, 102, 241, 0.1)', title="Ventaja LS (pp)"),
+            margin=dict(l=60, r=20, t=40, b=40), height=350
+        )
+        pintar_figura(fig_universo, 'universo')
+        
+        columnas_ranking = {
+            'posicion': '#', 'ticker': 'Ticker', 'diferencia_pp': 'Ventaja LS (pp)',
+            'rentabilidad_ls': 'Rent. LS (%)', 'rentabilidad_dca': 'Rent. DCA (%)',
+            'tir_ls': 'TIR LS (%)', 'tir_dca': 'TIR DCA (%)',
+            'max_drawdown_ls': 'Max DD LS (%)', 'max_drawdown_dca': 'Max DD DCA (%)', 'ganador': 'Ganador'
+        }
+        st.dataframe(
+            ranking[list(columnas_ranking)].rename(columns=columnas_ranking).round(2),
+            hide_index=True, use_container_width=True
+        )
+    
+    if len(errores_universo):
+        with st.expander(f"⚠️ {len(errores_universo)} activos sin simular"):
+            st.dataframe(errores_universo, hide_index=True, use_container_width=True)
 
 # =============================================================================
 # RESUMEN
@@ -1536,7 +1511,7 @@ col1, col2 = st.columns(2)
 
 with col1:
     modo_txt = "Capital disponible" if modo_dca == "capital_disponible" else "Aportación periódica"
-    momento_txt = "Principio de mes" if aportacion_inicio else "Final de mes"
+    momento_txt = CALENDARIOS[regla_calendario].removeprefix("📅 ")
     
     st.markdown(f"""
 <div class="metric-card">
@@ -1545,7 +1520,7 @@ with col1:
 <p><strong>💱 Divisa:</strong> {divisa}</p>
 <p><strong>⏱️ Horizonte:</strong> {resultado_ls['años']:.1f} años</p>
 <p><strong>🔄 Modo DCA:</strong> {modo_txt}</p>
-<p><strong>📅 Momento:</strong> {momento_txt}</p>
+<p><strong>📅 Calendario:</strong> {momento_txt}</p>
 </div>
 """, unsafe_allow_html=True)
 
@@ -1555,7 +1530,7 @@ with col2:
     st.markdown(f"""
 <div class="metric-card">
 <p><strong>💰 Capital LS:</strong> {capital_ls:,.0f} {divisa}</p>
-<p><strong>💰 Capital DCA:</strong> {capital_dca:,.0f} {divisa} ({resultado_dca['aportacion_mensual']:,.0f}/mes × {meses_dca})</p>
+<p><strong>💰 Capital DCA:</strong> {capital_dca:,.0f} {divisa} ({resultado_dca['aportacion_mensual']:,.0f} × {num_compras_dca})</p>
 <p><strong>🏆 Ganador:</strong> {ganador_txt} (+{abs(diferencia_pp):.1f} pp)</p>
 <p><strong>📊 Neto LS:</strong> {resultado_ls['valor_neto']:,.0f} {divisa}</p>
 <p><strong>📊 Neto DCA:</strong> {resultado_dca['valor_neto']:,.0f} {divisa}</p>
@@ -1569,7 +1544,7 @@ st.markdown(f"""
 <div class="info-box">
 <strong>ℹ️ Metodología:</strong><br>
 • <strong>Lump Sum:</strong> Invierte todo el día 1, vende al final.<br>
-• <strong>DCA {modo_txt}:</strong> {'Reparte el capital en ' + str(meses_dca) + ' meses' if modo_dca == 'capital_disponible' else 'Aporta ' + f'{aportacion_mensual:,.0f}' + ' cada mes'}. Aportación al {momento_txt.lower()}.<br>
+• <strong>DCA {modo_txt}:</strong> {'Reparte el capital en ' + str(meses_dca) + ' meses' if modo_dca == 'capital_disponible' else 'Aporta ' + f'{aportacion_mensual:,.0f}' + ' cada mes'}. Calendario: {momento_txt.lower()}.<br>
 {intereses_nota}• <strong>Impuestos:</strong> IRPF 2024 sobre plusvalía al vender.<br>
 • <strong>Costes:</strong> {comision*100:.2f}% comisión + {slippage*100:.2f}% slippage por operación.
 </div>
@@ -1582,3 +1557,27 @@ st.markdown(f"""
 <p style="font-size: 0.7rem; color: #374151;">v4.0 - Dos modos DCA + Momento aportación</p>
 </div>
 """, unsafe_allow_html=True)
+
+# Resumen de tiempos del rerun en el registro; con ?debug=1, panel de depuración
+resumen_tiempos = cronometro.cerrar()
+if depuracion:
+    with st.expander("🛠️ Depuración"):
+        st.caption(f"Rerun {resumen_tiempos['ejecucion']} · {resumen_tiempos['total_ms']:,.0f} ms en total")
+        st.dataframe(
+            pd.DataFrame(resumen_tiempos['etapas']).set_index('etapa').round({'duracion_ms': 1}),
+            use_container_width=True
+        )
+        st.json({
+            'cache_simulaciones': cache_simulaciones.estadisticas(),
+            'almacen_precios': obtener_proveedor().estadisticas()
+        })
+
+# Si los metadatos llegan después de pintar la página, se repinta con nombre y divisa.
+# Se sondea sin bloquear el script; si la carga falla se deja de esperar
+if info_activo is None and cargador_metadatos.estado(ticker_input) == 'cargando':
+    @st.fragment(run_every=1)
+    def esperar_metadatos():
+        if cargador_metadatos.estado(ticker_input) == 'listo':
+            st.rerun()
+    
+    esperar_metadatos()
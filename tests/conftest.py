@@ -0,0 +1,46 @@
+"""
+Datos sintéticos y comparación de resultados para las pruebas de equivalencia.
+
+Las pruebas no usan red: los precios son la serie sintética del benchmark
+(lump_sum.benchmark.serie_sintetica), un paseo aleatorio geométrico con
+semilla fija sobre días hábiles.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lump_sum.benchmark import serie_sintetica
+from lump_sum.operaciones import LibroOperaciones
+
+
+def _iguales(x, y, rtol: float) -> bool:
+    if isinstance(x, pd.Series):
+        return x.index.equals(y.index) and np.allclose(x.to_numpy(), y.to_numpy(), rtol=rtol, atol=0.0)
+    if isinstance(x, np.ndarray):
+        return x.shape == np.shape(y) and np.allclose(x, y, rtol=rtol, atol=0.0, equal_nan=True)
+    if isinstance(x, LibroOperaciones):
+        a, b = x.a_dataframe(), y.a_dataframe()
+        numericas = a.select_dtypes('number').columns
+        return (
+            a.columns.equals(b.columns)
+            and a.drop(columns=numericas).equals(b.drop(columns=numericas))
+            and np.allclose(a[numericas].to_numpy(float), b[numericas].to_numpy(float), rtol=rtol, atol=0.0, equal_nan=True)
+        )
+    if isinstance(x, dict):
+        return x.keys() == y.keys() and all(_iguales(x[k], y[k], rtol) for k in x)
+    if isinstance(x, (str, pd.Timestamp)):
+        return x == y
+    return bool(np.isclose(x, y, rtol=rtol, atol=0.0) or (np.isnan(x) and np.isnan(y)))
+
+
+def comparar_resultados(a: dict, b: dict, claves=None, rtol: float = 0.0):
+    """Falla con la lista de claves distintas entre dos resultados de simulación."""
+    claves = list(a) if claves is None else claves
+    distintas = [k for k in claves if not _iguales(a[k], b[k], rtol)]
+    assert not distintas, f"Claves distintas: {distintas}"
+
+
+@pytest.fixture(scope='session')
+def precios() -> pd.Series:
+    return serie_sintetica(1500, semilla=7, inicio='2005-01-03')
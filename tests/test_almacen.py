@@ -0,0 +1,154 @@
+"""Almacén SQLite de precios (refresco incremental, recarga, TTL, contadores) y coalescencia."""
+
+import logging
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from lump_sum import AlmacenPrecios, ErrorProveedor, ProveedorPrecios
+from lump_sum.coalescencia import UnVuelo
+
+
+class ProveedorFalso(ProveedorPrecios):
+    """Fuente en memoria que anota la fecha_inicio de cada petición."""
+    
+    def __init__(self, serie: pd.Series):
+        self.serie = serie
+        self.peticiones = []
+        self.error = None
+        self.dentro = threading.Event()
+        self.soltar = None
+    
+    def precios(self, ticker: str, fecha_inicio: str = None) -> pd.Series:
+        self.peticiones.append(fecha_inicio)
+        self.dentro.set()
+        if self.soltar is not None:
+            self.soltar.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.serie if fecha_inicio is None else self.serie.loc[pd.Timestamp(fecha_inicio):]
+    
+    def metadatos(self, ticker: str) -> dict:
+        return {'symbol': ticker}
+
+
+def _serie(n: int, desde: float = 100.0) -> pd.Series:
+    return pd.Series(desde + pd.RangeIndex(n).to_numpy(float), index=pd.bdate_range('2024-01-01', periods=n), name='Close')
+
+
+@pytest.fixture
+def proveedor():
+    return ProveedorFalso(_serie(10))
+
+
+def test_primera_carga_y_acierto(tmp_path, proveedor):
+    almacen = AlmacenPrecios(tmp_path / 'precios.sqlite', ttl=3600, proveedor=proveedor)
+    pd.testing.assert_series_equal(almacen.precios('spy'), proveedor.serie, check_freq=False)
+    pd.testing.assert_series_equal(almacen.precios('SPY', '2024-01-05'), proveedor.serie.loc['2024-01-05':], check_freq=False)
+    assert proveedor.peticiones == [None]
+    estadisticas = almacen.estadisticas()
+    assert (estadisticas['fallos'], estadisticas['aciertos'], estadisticas['esperas_coalescidas']) == (1, 1, 0)
+
+
+def test_refresco_incremental_desde_la_penultima_sesion(tmp_path, proveedor):
+    almacen = AlmacenPrecios(tmp_path / 'precios.sqlite', ttl=3600, proveedor=proveedor)
+    almacen.precios('SPY')
+    
+    # Dos sesiones nuevas y la última guardada (cierre parcial) corregida
+    nueva = _serie(12)
+    nueva.iloc[9] = 555.0
+    proveedor.serie = nueva
+    assert almacen.actualizar('SPY', forzar=True)
+    assert proveedor.peticiones == [None, '2024-01-11']
+    pd.testing.assert_series_equal(almacen.precios('SPY'), nueva, check_freq=False)
+
+
+def test_recarga_completa_si_cambia_el_ajuste(tmp_path, proveedor):
+    almacen = AlmacenPrecios(tmp_path / 'precios.sqlite', ttl=3600, proveedor=proveedor)
+    almacen.precios('SPY')
+    
+    # Un dividendo reajusta toda la historia: la penúltima sesión ya no coincide
+    ajustada = _serie(12) * 0.98
+    proveedor.serie = ajustada
+    almacen.actualizar('SPY', forzar=True)
+    assert proveedor.peticiones == [None, '2024-01-11', None]
+    pd.testing.assert_series_equal(almacen.precios('SPY'), ajustada, check_freq=False)
+
+
+def test_ttl(tmp_path, proveedor, monkeypatch):
+    almacen = AlmacenPrecios(tmp_path / 'precios.sqlite', ttl=60, proveedor=proveedor)
+    almacen.precios('SPY')
+    ahora = time.time()
+    monkeypatch.setattr(time, 'time', lambda: ahora + 30)
+    almacen.precios('SPY')
+    assert len(proveedor.peticiones) == 1
+    monkeypatch.setattr(time, 'time', lambda: ahora + 90)
+    almacen.precios('SPY')
+    assert len(proveedor.peticiones) == 2
+    estadisticas = almacen.estadisticas()
+    assert (estadisticas['fallos'], estadisticas['aciertos']) == (2, 1)
+
+
+def test_fuente_caida_sirve_lo_almacenado_y_avisa(tmp_path, proveedor, caplog):
+    almacen = AlmacenPrecios(tmp_path / 'precios.sqlite', ttl=0, proveedor=proveedor)
+    almacen.precios('SPY')
+    proveedor.error = ErrorProveedor('sin red')
+    with caplog.at_level(logging.WARNING, logger='lump_sum.almacen'):
+        pd.testing.assert_series_equal(almacen.precios('SPY'), proveedor.serie, check_freq=False)
+    assert 'SPY' in caplog.text and 'sin red' in caplog.text
+    # Sin nada guardado el error llega al llamador
+    with pytest.raises(ErrorProveedor):
+        almacen.precios('QQQ')
+
+
+def test_peticiones_simultaneas_comparten_un_refresco(tmp_path, proveedor):
+    almacen = AlmacenPrecios(tmp_path / 'precios.sqlite', ttl=3600, proveedor=proveedor)
+    proveedor.soltar = threading.Event()
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(almacen.precios('SPY'))) for _ in range(2)]
+    hilos[0].start()
+    assert proveedor.dentro.wait(5)
+    hilos[1].start()
+    time.sleep(0.2)
+    proveedor.soltar.set()
+    for hilo in hilos:
+        hilo.join(5)
+    
+    assert proveedor.peticiones == [None]
+    assert len(resultados) == 2 and resultados[0].equals(resultados[1])
+    estadisticas = almacen.estadisticas()
+    assert (estadisticas['fallos'], estadisticas['esperas_coalescidas'], estadisticas['en_vuelo']) == (1, 1, 0)
+
+
+def test_un_vuelo_reparte_la_excepcion():
+    vuelos = UnVuelo()
+    dentro, soltar = threading.Event(), threading.Event()
+    
+    def fallar():
+        dentro.set()
+        soltar.wait(5)
+        raise ValueError('fallo')
+    
+    errores = []
+    
+    def llamar():
+        try:
+            vuelos.ejecutar('clave', fallar)
+        except ValueError as e:
+            errores.append(e)
+    
+    lider = threading.Thread(target=llamar)
+    lider.start()
+    assert dentro.wait(5)
+    assert vuelos.en_vuelo() == 1
+    seguidor = threading.Thread(target=llamar)
+    seguidor.start()
+    time.sleep(0.2)
+    soltar.set()
+    lider.join(5)
+    seguidor.join(5)
+    assert len(errores) == 2 and errores[0] is errores[1]
+    assert vuelos.en_vuelo() == 0
+    assert vuelos.ejecutar('clave', lambda: 42) == (42, False)
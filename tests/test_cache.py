@@ -0,0 +1,89 @@
+"""Caché LRU de simulaciones: expulsión, cálculo único con llamadas simultáneas y huella de series."""
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from lump_sum import CacheLRU, huella_serie
+
+from conftest import serie_sintetica
+
+
+class Contador:
+    """Función a cachear que cuenta sus llamadas."""
+    
+    def __init__(self):
+        self.llamadas = []
+    
+    def __call__(self, clave):
+        self.llamadas.append(clave)
+        return clave * 10
+
+
+def test_expulsion_del_menos_usado():
+    cache, calcular = CacheLRU(max_entradas=2), Contador()
+    cache.obtener_o_calcular('a', calcular, 1)
+    cache.obtener_o_calcular('b', calcular, 2)
+    # Leer 'a' la hace la más reciente: al entrar 'c' sale 'b'
+    assert cache.obtener_o_calcular('a', calcular, 1) == 10
+    cache.obtener_o_calcular('c', calcular, 3)
+    cache.obtener_o_calcular('a', calcular, 1)
+    cache.obtener_o_calcular('b', calcular, 2)
+    assert calcular.llamadas == [1, 2, 3, 2]
+    estadisticas = cache.estadisticas()
+    assert (estadisticas['aciertos'], estadisticas['fallos'], estadisticas['expulsiones']) == (2, 4, 2)
+    assert estadisticas['entradas'] == 2
+    assert estadisticas['tasa_aciertos'] == pytest.approx(100 * 2 / 6)
+
+
+def test_llamadas_simultaneas_calculan_una_vez():
+    cache = CacheLRU()
+    dentro, soltar = threading.Event(), threading.Event()
+    llamadas = []
+    
+    def lento():
+        llamadas.append(1)
+        dentro.set()
+        soltar.wait(5)
+        return object()
+    
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(cache.obtener_o_calcular('k', lento))) for _ in range(3)]
+    hilos[0].start()
+    assert dentro.wait(5)
+    for hilo in hilos[1:]:
+        hilo.start()
+    time.sleep(0.2)
+    soltar.set()
+    for hilo in hilos:
+        hilo.join(5)
+    
+    assert len(llamadas) == 1
+    assert len(resultados) == 3 and all(r is resultados[0] for r in resultados)
+    estadisticas = cache.estadisticas()
+    assert (estadisticas['fallos'], estadisticas['esperas_coalescidas']) == (1, 2)
+
+
+def test_limpiar_y_tamaño_invalido():
+    cache, calcular = CacheLRU(), Contador()
+    cache.obtener_o_calcular('a', calcular, 1)
+    cache.limpiar()
+    cache.obtener_o_calcular('a', calcular, 1)
+    assert calcular.llamadas == [1, 1]
+    with pytest.raises(ValueError):
+        CacheLRU(max_entradas=0)
+
+
+def test_huella_serie():
+    serie = serie_sintetica(300, semilla=2)
+    copia = pd.Series(serie.to_numpy().copy(), index=pd.DatetimeIndex(list(serie.index)))
+    assert huella_serie(serie) == huella_serie(copia) == huella_serie(serie.copy())
+    
+    otro_valor = serie.copy()
+    otro_valor.iloc[150] += 1e-9
+    otra_fecha = serie.copy()
+    otra_fecha.index = serie.index + pd.Timedelta(days=1)
+    huellas = {huella_serie(serie), huella_serie(otro_valor), huella_serie(otra_fecha), huella_serie(serie.iloc[:-1])}
+    assert len(huellas) == 4
@@ -0,0 +1,77 @@
+"""Reglas de calendario de las aportaciones sobre sesiones con festivos."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lump_sum import indices_compra, num_aportaciones, posiciones_compra
+from lump_sum.calendario import interpretar_regla
+
+
+# Días laborables de 2024 con festivos: 1 de enero, 1 de abril (lunes), 15 de mayo y 17 de junio
+FESTIVOS = pd.to_datetime(['2024-01-01', '2024-04-01', '2024-05-15', '2024-06-17'])
+SESIONES = pd.bdate_range('2024-01-01', '2024-12-31').difference(FESTIVOS)
+
+
+def _fechas(fechas: pd.DatetimeIndex, regla: str, n: int, desde: str = '2024-01-10', hasta: str = None) -> list:
+    ventana = fechas[(fechas >= desde) & (fechas <= (hasta or fechas[-1]))]
+    return [d.strftime('%Y-%m-%d') for d in ventana[indices_compra(ventana, n, regla)]]
+
+
+def test_primer_dia_mes():
+    # Primera compra el día de inicio; el 1 de abril es festivo y se compra el 2
+    assert _fechas(SESIONES, 'primer_dia_mes', 5) == ['2024-01-10', '2024-02-01', '2024-03-01', '2024-04-02', '2024-05-01']
+
+
+def test_ultimo_dia_mes():
+    assert _fechas(SESIONES, 'ultimo_dia_mes', 3) == ['2024-01-31', '2024-02-29', '2024-03-29']
+
+
+def test_ultimo_dia_mes_serie_a_mitad_de_mes():
+    # La serie acaba el 15 de abril: no se sabe si el mes ha terminado y la compra de abril no cuenta
+    assert _fechas(SESIONES, 'ultimo_dia_mes', 6, hasta='2024-04-15') == ['2024-01-31', '2024-02-29', '2024-03-29']
+    # Ni siquiera si acaba en la última sesión del mes: hace falta ver el mes siguiente
+    assert _fechas(SESIONES, 'ultimo_dia_mes', 6, hasta='2024-03-29') == ['2024-01-31', '2024-02-29']
+
+
+def test_semanal():
+    assert _fechas(SESIONES, 'semanal', 3, desde='2024-03-18') == ['2024-03-18', '2024-03-25', '2024-04-02']
+    assert _fechas(SESIONES, 'semanal:2', 3, desde='2024-03-18') == ['2024-03-18', '2024-04-02', '2024-04-15']
+    assert num_aportaciones(12, 'semanal') == 52
+    assert num_aportaciones(12, 'semanal:2') == 26
+    assert num_aportaciones(12, 'primer_dia_mes') == 12
+
+
+def test_dia_mes_festivos_y_meses_cortos():
+    # El día 15 ya ha pasado en enero: se empieza en febrero; el 15 de mayo es festivo
+    assert _fechas(SESIONES, 'dia_mes:15', 4, desde='2024-01-20') == ['2024-02-15', '2024-03-15', '2024-04-15', '2024-05-16']
+    # Día 31: último día de los meses cortos. El 31 de marzo es domingo y el 1 de abril
+    # festivo, así que la compra de marzo cae el 2 de abril
+    assert _fechas(SESIONES, 'dia_mes:31', 4, desde='2024-01-02') == ['2024-01-31', '2024-02-29', '2024-04-02', '2024-04-30']
+
+
+def test_posiciones_por_ventana_con_fines():
+    inicios = np.array([0, 20, 40])
+    posiciones = posiciones_compra(SESIONES, inicios, 3, 'primer_dia_mes', fines=inicios + 30)
+    assert posiciones.shape == (3, 3)
+    assert (posiciones[:, 0] == inicios).all()
+    # Las compras posteriores al fin de cada ventana valen len(fechas)
+    assert ((posiciones <= (inicios + 30)[:, None]) | (posiciones == len(SESIONES))).all()
+    assert (posiciones == len(SESIONES)).any()
+
+
+@pytest.mark.parametrize('regla', [
+    'trimestral', 'primer_dia_mes:2', 'ultimo_dia_mes:1', 'semanal:0', 'semanal:x', 'dia_mes:0', 'dia_mes:32', 'dia_mes:1.5',
+])
+def test_reglas_invalidas(regla):
+    with pytest.raises(ValueError):
+        interpretar_regla(regla)
+    with pytest.raises(ValueError):
+        indices_compra(SESIONES, 3, regla)
+
+
+def test_reglas_validas():
+    assert interpretar_regla('semanal') == ('semanal', 1)
+    assert interpretar_regla('semanal:4') == ('semanal', 4)
+    assert interpretar_regla('dia_mes:31') == ('dia_mes', 31)
+    assert interpretar_regla('ultimo_dia_mes') == ('ultimo_dia_mes', 0)
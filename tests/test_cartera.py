@@ -0,0 +1,54 @@
+"""Cartera de un solo activo (y de activos idénticos) frente a los simuladores de un activo."""
+
+import pandas as pd
+import pytest
+
+from lump_sum import simular_dca_aportacion_periodica, simular_dca_capital_disponible, simular_lump_sum
+from lump_sum.cartera import simular_cartera_dca, simular_cartera_lump_sum
+
+from conftest import comparar_resultados
+
+
+COMISION, SLIPPAGE = 0.001, 0.0005
+# costes_transaccion suma los costes por activo en otro orden: puede diferir en el último bit
+RTOL = 1e-12
+
+
+def _claves_comunes(individual: dict, cartera: dict, excluir=()) -> list:
+    return [k for k in individual if k in cartera and k not in excluir]
+
+
+@pytest.mark.parametrize('rebalanceo', ['nunca', 'periodico:3', 'umbral:1'])
+def test_cartera_lump_sum_un_activo(precios, rebalanceo):
+    individual = simular_lump_sum(precios, 10_000, COMISION, SLIPPAGE)
+    cartera = simular_cartera_lump_sum(precios.to_frame('A'), [1], 10_000, COMISION, SLIPPAGE, rebalanceo)
+    comparar_resultados(individual, cartera, _claves_comunes(individual, cartera), rtol=RTOL)
+
+
+@pytest.mark.parametrize('aportacion_inicio_mes', [True, False])
+@pytest.mark.parametrize('rebalanceo', ['nunca', 'aportaciones'])
+def test_cartera_dca_capital_disponible_un_activo(precios, aportacion_inicio_mes, rebalanceo):
+    individual = simular_dca_capital_disponible(
+        precios, 10_000, 12, COMISION, SLIPPAGE, 0.03, aportacion_inicio_mes=aportacion_inicio_mes
+    )
+    cartera = simular_cartera_dca(
+        precios.to_frame('A'), [1], 10_000, 12, COMISION, SLIPPAGE, 0.03,
+        rebalanceo=rebalanceo, aportacion_inicio_mes=aportacion_inicio_mes
+    )
+    comparar_resultados(individual, cartera, _claves_comunes(individual, cartera), rtol=RTOL)
+
+
+def test_cartera_dca_aportacion_periodica_un_activo(precios):
+    individual = simular_dca_aportacion_periodica(precios, 500, 24, COMISION, SLIPPAGE)
+    cartera = simular_cartera_dca(
+        precios.to_frame('A'), [1], 0, 24, COMISION, SLIPPAGE, modo='aportacion_periodica', aportacion_mensual=500
+    )
+    comparar_resultados(individual, cartera, _claves_comunes(individual, cartera), rtol=RTOL)
+
+
+@pytest.mark.parametrize('rebalanceo', ['nunca', 'periodico:3', 'umbral:1'])
+def test_cartera_de_activos_identicos(precios, rebalanceo):
+    # Repartir entre dos copias del mismo activo no cambia nada salvo el número de operaciones
+    individual = simular_lump_sum(precios, 10_000, COMISION, SLIPPAGE)
+    cartera = simular_cartera_lump_sum(pd.DataFrame({'A': precios, 'B': precios}), [0.5, 0.5], 10_000, COMISION, SLIPPAGE, rebalanceo)
+    comparar_resultados(individual, cartera, _claves_comunes(individual, cartera, excluir=('num_operaciones',)), rtol=RTOL)
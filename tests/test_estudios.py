@@ -0,0 +1,122 @@
+"""Estudios por lotes frente a los simuladores ventana a ventana."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lump_sum import (
+    barrido_parametros,
+    estudio_ventanas_moviles,
+    simular_dca_aportacion_periodica,
+    simular_dca_capital_disponible,
+    simular_lump_sum,
+)
+
+from conftest import serie_sintetica
+
+
+COMISION, SLIPPAGE, TASA = 0.001, 0.0005, 0.03
+HORIZONTE, MESES = 300, 6
+
+
+@pytest.fixture(scope='module')
+def precios():
+    return serie_sintetica(700, semilla=4)
+
+
+def _simular_ventana(ventana, modo, aportacion_inicio_mes, capital=10_000, aportacion=800, capital_ls=None):
+    """LS y DCA de una ventana con los simuladores (LS con lo aportado en 'aportacion_periodica')."""
+    if modo == 'capital_disponible':
+        dca = simular_dca_capital_disponible(
+            ventana, capital, MESES, COMISION, SLIPPAGE, TASA, aportacion_inicio_mes=aportacion_inicio_mes
+        )
+        capital_ls = capital if capital_ls is None else capital_ls
+    else:
+        dca = simular_dca_aportacion_periodica(
+            ventana, aportacion, MESES, COMISION, SLIPPAGE, aportacion_inicio_mes=aportacion_inicio_mes
+        )
+        capital_ls = dca['capital_total_aportado'] if capital_ls is None else capital_ls
+    return simular_lump_sum(ventana, capital_ls, COMISION, SLIPPAGE), dca
+
+
+@pytest.mark.parametrize('modo', ['capital_disponible', 'aportacion_periodica'])
+@pytest.mark.parametrize('aportacion_inicio_mes', [True, False])
+def test_ventanas_iguales_que_simuladores(precios, modo, aportacion_inicio_mes):
+    estudio = estudio_ventanas_moviles(
+        precios, HORIZONTE, 10_000, MESES, COMISION, SLIPPAGE, TASA, modo,
+        aportacion_inicio_mes=aportacion_inicio_mes, aportacion_mensual=800 if modo == 'aportacion_periodica' else None
+    )
+    assert estudio['num_ventanas'] == len(precios) - HORIZONTE
+    for inicio in np.random.default_rng(1).choice(estudio['num_ventanas'], 12, replace=False):
+        ls, dca = _simular_ventana(precios.iloc[inicio:inicio + HORIZONTE + 1], modo, aportacion_inicio_mes)
+        assert estudio['rentabilidad_ls'].iloc[inicio] == pytest.approx(ls['rentabilidad'], rel=1e-12, abs=1e-12)
+        assert estudio['rentabilidad_dca'].iloc[inicio] == pytest.approx(dca['rentabilidad'], rel=1e-12, abs=1e-12)
+        assert estudio['tir_ls'].iloc[inicio] == pytest.approx(ls['tir'], rel=1e-9, abs=1e-9)
+        assert estudio['tir_dca'].iloc[inicio] == pytest.approx(dca['tir'], rel=1e-9, abs=1e-9)
+    diferencia = estudio['rentabilidad_ls'] - estudio['rentabilidad_dca']
+    np.testing.assert_array_equal(estudio['diferencia_pp'], diferencia)
+    assert estudio['win_rate_ls'] == pytest.approx((diferencia > 0).mean() * 100)
+
+
+@pytest.mark.parametrize('modo', ['capital_disponible', 'aportacion_periodica'])
+def test_capital_ls_propio(precios, modo):
+    # El capital de LS puede ser distinto del DCA (como en el backtest principal)
+    estudio = estudio_ventanas_moviles(
+        precios, HORIZONTE, 10_000, MESES, COMISION, SLIPPAGE, TASA, modo, aportacion_mensual=800, capital_ls=250_000
+    )
+    for inicio in (0, 150, estudio['num_ventanas'] - 1):
+        ls, dca = _simular_ventana(precios.iloc[inicio:inicio + HORIZONTE + 1], modo, True, capital_ls=250_000)
+        assert estudio['rentabilidad_ls'].iloc[inicio] == pytest.approx(ls['rentabilidad'], rel=1e-12, abs=1e-12)
+        assert estudio['rentabilidad_dca'].iloc[inicio] == pytest.approx(dca['rentabilidad'], rel=1e-12, abs=1e-12)
+
+
+def test_ventanas_en_paralelo_iguales_que_en_serie(precios):
+    parametros = (precios, HORIZONTE, 10_000, MESES, COMISION, SLIPPAGE, TASA)
+    serie = estudio_ventanas_moviles(*parametros, num_procesos=1)
+    paralelo = estudio_ventanas_moviles(*parametros, num_procesos=2)
+    for clave in ('rentabilidad_ls', 'rentabilidad_dca', 'diferencia_pp', 'tir_ls', 'tir_dca'):
+        assert serie[clave].equals(paralelo[clave]), clave
+    assert serie['percentiles_pp'] == paralelo['percentiles_pp']
+    assert serie['mejor_ventana'] == paralelo['mejor_ventana']
+
+
+def test_serie_demasiado_corta(precios):
+    with pytest.raises(ValueError):
+        estudio_ventanas_moviles(precios.iloc[:HORIZONTE], HORIZONTE, 10_000, MESES, COMISION, SLIPPAGE)
+
+
+@pytest.mark.parametrize('modo', ['capital_disponible', 'aportacion_periodica'])
+def test_barrido_igual_que_simuladores(precios, modo):
+    # Un sábado se ajusta a la sesión siguiente (el lunes)
+    lunes = precios.index[precios.index.dayofweek == 0][7]
+    fechas = [precios.index[0], lunes - pd.Timedelta(days=2), precios.index[390]]
+    meses, comisiones, slippages = [3, 6], [0.0, 0.002], [0.0, 0.001]
+    barrido = barrido_parametros(
+        precios, HORIZONTE, 10_000, meses, comisiones, slippages, fechas_inicio=fechas, tasa_monetario=TASA,
+        modo_dca=modo, aportacion_mensual=800 if modo == 'aportacion_periodica' else None, con_tir=True
+    )
+    forma = (2, 3, 2, 2)
+    assert barrido['dimensiones'] == ('meses_dca', 'fecha_inicio', 'comision', 'slippage')
+    assert all(barrido[clave].shape == forma for clave in ('rentabilidad_ls', 'rentabilidad_dca', 'tir_ls', 'tir_dca'))
+    assert list(barrido['coordenadas']['fecha_inicio']) == [precios.index[0], lunes, precios.index[390]]
+    
+    for celda in [(0, 0, 0, 0), (1, 1, 1, 0), (0, 2, 1, 1), (1, 0, 0, 1)]:
+        m, f, c, s = celda
+        inicio = precios.index.get_loc(barrido['coordenadas']['fecha_inicio'][f])
+        ventana = precios.iloc[inicio:inicio + HORIZONTE + 1]
+        if modo == 'capital_disponible':
+            dca = simular_dca_capital_disponible(ventana, 10_000, meses[m], comisiones[c], slippages[s], TASA)
+            ls = simular_lump_sum(ventana, 10_000, comisiones[c], slippages[s])
+        else:
+            dca = simular_dca_aportacion_periodica(ventana, 800, meses[m], comisiones[c], slippages[s])
+            ls = simular_lump_sum(ventana, dca['capital_total_aportado'], comisiones[c], slippages[s])
+        assert barrido['rentabilidad_ls'][celda] == pytest.approx(ls['rentabilidad'], rel=1e-12, abs=1e-12)
+        assert barrido['rentabilidad_dca'][celda] == pytest.approx(dca['rentabilidad'], rel=1e-12, abs=1e-12)
+        assert barrido['tir_ls'][celda] == pytest.approx(ls['tir'], rel=1e-9, abs=1e-9)
+        assert barrido['tir_dca'][celda] == pytest.approx(dca['tir'], rel=1e-9, abs=1e-9)
+        assert barrido['diferencia_pp'][celda] == barrido['rentabilidad_ls'][celda] - barrido['rentabilidad_dca'][celda]
+
+
+def test_barrido_sin_historia_suficiente(precios):
+    with pytest.raises(ValueError):
+        barrido_parametros(precios, HORIZONTE, 10_000, [6], [0.001], [0.0], fechas_inicio=[precios.index[-10]])
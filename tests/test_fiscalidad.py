@@ -0,0 +1,40 @@
+"""IRPF vectorizado (calcular_impuestos_españa_array) frente al cálculo escalar por tramos."""
+
+import numpy as np
+
+from lump_sum.fiscalidad import TRAMOS_IRPF_2024, calcular_impuestos_españa, calcular_impuestos_españa_array
+
+
+def _plusvalias() -> np.ndarray:
+    limites = np.array([limite for limite, _ in TRAMOS_IRPF_2024[:-1]])
+    # Límites de tramo y sus vecinos, cero, pérdidas y una muestra amplia de ganancias
+    bordes = np.concatenate((limites, np.nextafter(limites, 0), np.nextafter(limites, np.inf), limites + 0.01))
+    rng = np.random.default_rng(0)
+    muestra = np.concatenate((rng.uniform(-50_000, 400_000, 2000), rng.lognormal(9, 2, 2000)))
+    return np.concatenate(([0.0, -0.0, -1.0, 1e-9, 0.01, 1e9], bordes, muestra))
+
+
+def test_impuestos_array_igual_que_escalar():
+    plusvalias = _plusvalias()
+    impuestos, _ = calcular_impuestos_españa_array(plusvalias)
+    esperado = np.array([calcular_impuestos_españa(p)[0] for p in plusvalias])
+    np.testing.assert_array_equal(impuestos, esperado)
+
+
+def test_desglose_array_igual_que_escalar():
+    plusvalias = _plusvalias()
+    _, detalle = calcular_impuestos_españa_array(plusvalias, desglose=True)
+    for i, plusvalia in enumerate(plusvalias):
+        _, desglose = calcular_impuestos_españa(plusvalia)
+        for tramo, valores in detalle.items():
+            base = desglose.get(tramo, {}).get('base', 0.0)
+            impuesto = desglose.get(tramo, {}).get('impuesto', 0.0)
+            assert np.isclose(valores['base'][i], base, rtol=1e-14, atol=0), (plusvalia, tramo)
+            assert np.isclose(valores['impuesto'][i], impuesto, rtol=1e-14, atol=0), (plusvalia, tramo)
+
+
+def test_impuestos_array_conserva_la_forma():
+    plusvalias = _plusvalias()[:12].reshape(3, 4)
+    impuestos, detalle = calcular_impuestos_españa_array(plusvalias, desglose=True)
+    assert impuestos.shape == (3, 4)
+    assert all(valores['base'].shape == (3, 4) for valores in detalle.values())
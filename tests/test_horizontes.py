@@ -0,0 +1,71 @@
+"""PrefijosSimulacion.resultado(h) frente a simular sobre precios.iloc[:h + 1]."""
+
+import warnings
+
+import numpy as np
+import pytest
+
+from lump_sum import simular_dca_aportacion_periodica, simular_dca_capital_disponible, simular_lump_sum
+from lump_sum.calendario import indices_compra, num_aportaciones
+from lump_sum.horizontes import PrefijosSimulacion
+
+from conftest import comparar_resultados, serie_sintetica
+
+
+COMISION, SLIPPAGE, NIVELES = 0.001, 0.0005, (0.0, 0.01)
+# La volatilidad sale de sumas acumuladas de retornos y de sus cuadrados: en ventanas
+# con poca varianza difiere de la desviación directa en torno a 1e-11 relativo
+RTOL = 1e-9
+
+
+@pytest.fixture(scope='module')
+def precios():
+    return serie_sintetica(800, semilla=11)
+
+
+def _horizontes(n: int, compras) -> list:
+    # Horizontes al azar, extremos de la serie y los días alrededor de cada compra
+    rng = np.random.default_rng(5)
+    alrededor = [i + d for i in compras for d in (-1, 0, 1)]
+    return sorted({h for h in [0, 1, 2, n - 1, *rng.integers(0, n, 25), *alrededor] if 0 <= h < n})
+
+
+def test_prefijos_lump_sum(precios):
+    prefijos = PrefijosSimulacion.lump_sum(precios, 10_000, COMISION, SLIPPAGE, niveles_coste=NIVELES)
+    for h in _horizontes(len(precios), []):
+        esperado = simular_lump_sum(precios.iloc[:h + 1], 10_000, COMISION, SLIPPAGE, niveles_coste=NIVELES)
+        comparar_resultados(prefijos.resultado(h), esperado, rtol=RTOL)
+
+
+@pytest.mark.parametrize('regla', ['primer_dia_mes', 'ultimo_dia_mes', 'semanal', 'dia_mes:15', 'dia_mes:31'])
+def test_prefijos_dca(precios, regla):
+    n = num_aportaciones(12, regla)
+    capital = PrefijosSimulacion.dca_capital_disponible(precios, 10_000, n, COMISION, SLIPPAGE, 0.03, regla, niveles_coste=NIVELES)
+    periodica = PrefijosSimulacion.dca_aportacion_periodica(precios, 800, n, COMISION, SLIPPAGE, regla, niveles_coste=NIVELES)
+    for h in _horizontes(len(precios), indices_compra(precios.index, n, regla)):
+        ventana = precios.iloc[:h + 1]
+        compras = indices_compra(ventana.index, n, regla)
+        assert list(capital.compras(h)) == list(compras), h
+        esperado = simular_dca_capital_disponible(
+            ventana, 10_000, n, COMISION, SLIPPAGE, 0.03, indices_compra=compras, niveles_coste=NIVELES
+        )
+        comparar_resultados(capital.resultado(h), esperado, rtol=RTOL)
+        esperado = simular_dca_aportacion_periodica(ventana, 800, n, COMISION, SLIPPAGE, indices_compra=compras, niveles_coste=NIVELES)
+        comparar_resultados(periodica.resultado(h), esperado, rtol=RTOL)
+
+
+def test_horizonte_fuera_de_la_serie(precios):
+    prefijos = PrefijosSimulacion.lump_sum(precios, 10_000, COMISION, SLIPPAGE)
+    with pytest.raises(ValueError):
+        prefijos.resultado(len(precios))
+
+
+def test_horizonte_sin_compras(precios):
+    # Con 'ultimo_dia_mes' la primera sesión aún no tiene compra: rentabilidad NaN, sin 0/0
+    prefijos = PrefijosSimulacion.dca_aportacion_periodica(precios, 800, 12, COMISION, SLIPPAGE, 'ultimo_dia_mes')
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        resultado = prefijos.resultado(0)
+        directo = simular_dca_aportacion_periodica(precios.iloc[:1], 800, 12, COMISION, SLIPPAGE, aportacion_inicio_mes=False)
+    assert resultado['capital_invertido'] == 0 and np.isnan(resultado['rentabilidad'])
+    assert directo['capital_invertido'] == 0 and np.isnan(directo['rentabilidad'])
@@ -0,0 +1,118 @@
+"""Métricas de riesgo y rentabilidad frente a las fórmulas de pandas y a casos con solución cerrada."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lump_sum import calcular_cagr, calcular_max_drawdown, calcular_metricas, calcular_tir, calcular_twr, calcular_twr_diario
+
+from conftest import serie_sintetica
+
+
+def _metricas_pandas(serie: pd.Series, años: float) -> dict:
+    """Referencia: drawdown con expanding().max(), volatilidad con pct_change().std() y Sharpe = CAGR / vol."""
+    maximo = serie.expanding().max()
+    drawdowns = (serie - maximo) / maximo
+    valle = drawdowns.idxmin()
+    pico = serie.loc[:valle].idxmax()
+    retornos = serie.pct_change().dropna()
+    volatilidad = retornos.std() * np.sqrt(252) * 100 if len(retornos) > 1 else 0.0
+    cagr = calcular_cagr(serie.iloc[0], serie.iloc[-1], años)
+    return {
+        'max_drawdown': drawdowns.min() * 100,
+        'idx_pico': serie.index.get_loc(pico),
+        'idx_valle': serie.index.get_loc(valle),
+        'volatilidad': volatilidad,
+        'cagr': cagr,
+        'sharpe': cagr / volatilidad if volatilidad > 0 else 0.0,
+    }
+
+
+def _comparar(metricas: dict, referencia: dict):
+    assert metricas['idx_pico'] == referencia['idx_pico']
+    assert metricas['idx_valle'] == referencia['idx_valle']
+    for clave in ('max_drawdown', 'volatilidad', 'cagr', 'sharpe'):
+        assert metricas[clave] == pytest.approx(referencia[clave], rel=1e-12, abs=1e-12), clave
+
+
+def test_metricas_serie_igual_que_pandas():
+    serie = serie_sintetica(2000, semilla=8)
+    años = (serie.index[-1] - serie.index[0]).days / 365.25
+    _comparar(calcular_metricas(serie.to_numpy(), años), _metricas_pandas(serie, años))
+    
+    max_dd, pico, valle = calcular_max_drawdown(serie)
+    referencia = _metricas_pandas(serie, años)
+    assert max_dd == pytest.approx(referencia['max_drawdown'], rel=1e-12)
+    assert (pico, valle) == (serie.index[referencia['idx_pico']], serie.index[referencia['idx_valle']])
+
+
+def test_metricas_matriz_igual_que_pandas_por_fila():
+    # Curvas con distinta deriva, una plana (sin drawdown ni volatilidad) y una con máximos repetidos
+    curvas = [serie_sintetica(500, semilla=s).to_numpy() for s in range(5)]
+    curvas.append(np.full(500, 50.0))
+    curvas.append(np.tile([100.0, 90.0, 100.0, 80.0, 100.0], 100))
+    matriz = np.vstack(curvas)
+    años = np.linspace(1.0, 3.0, len(matriz))
+    metricas = calcular_metricas(matriz, años)
+    for fila, curva in enumerate(matriz):
+        referencia = _metricas_pandas(pd.Series(curva), años[fila])
+        _comparar({clave: valor[fila] for clave, valor in metricas.items()}, referencia)
+
+
+def test_metricas_casos_limite():
+    # Un solo valor o un primer valor nulo: sin drawdown
+    assert calcular_metricas(np.array([100.0]), 1.0)['max_drawdown'] == 0.0
+    metricas = calcular_metricas(np.array([0.0, 10.0, 5.0]), 1.0)
+    assert metricas['max_drawdown'] == 0.0 and metricas['cagr'] == 0.0
+    assert calcular_metricas(np.array([100.0, 121.0]), 2.0)['cagr'] == pytest.approx(10.0)
+
+
+def test_tir_un_flujo():
+    assert calcular_tir(np.array([-100.0, 110.0]), np.array([0.0, 1.0])) == pytest.approx(10.0, rel=1e-12)
+    assert calcular_tir(np.array([-100.0, 121.0]), np.array([0.0, 2.0])) == pytest.approx(10.0, rel=1e-12)
+    assert calcular_tir(np.array([-100.0, 50.0]), np.array([0.0, 0.5])) == pytest.approx(-75.0, rel=1e-12)
+
+
+def test_tir_aportaciones_iguales_a_tipo_constante():
+    # 100 al año durante tres años al 5 %: el valor final es la suma capitalizada de cada aportación
+    final = sum(100 * 1.05 ** (3 - t) for t in range(3))
+    flujos = np.array([-100.0, -100.0, -100.0, final])
+    assert calcular_tir(flujos, np.arange(4.0)) == pytest.approx(5.0, rel=1e-12)
+
+
+def test_tir_sin_cambio_de_signo():
+    assert np.isnan(calcular_tir(np.array([-100.0, -50.0]), np.array([0.0, 1.0])))
+    assert np.isnan(calcular_tir(np.array([100.0, 50.0]), np.array([0.0, 1.0])))
+    lote = calcular_tir(np.array([[-100.0, 110.0], [-100.0, 0.0]]), np.array([0.0, 1.0]))
+    assert lote[0] == pytest.approx(10.0) and np.isnan(lote[1])
+
+
+def test_tir_por_lotes_igual_que_escalar():
+    # Cada fila debe dar exactamente lo mismo resuelta sola o junto a otras
+    rng = np.random.default_rng(3)
+    flujos = np.concatenate((-rng.uniform(50, 150, (200, 12)), rng.uniform(500, 3_000, (200, 1))), axis=1)
+    tiempos = np.append(np.arange(12) / 12, 1.5)
+    lote = calcular_tir(flujos, tiempos)
+    escalares = np.array([calcular_tir(fila, tiempos) for fila in flujos])
+    np.testing.assert_array_equal(lote, escalares)
+    np.testing.assert_array_equal(calcular_tir(flujos[::-1], tiempos), lote[::-1])
+
+
+def test_twr_no_depende_de_las_aportaciones():
+    # +10 % el día 1 y +10 % el día 2, con una aportación de 110 el día 2: TWR 21 %
+    valores = np.array([100.0, 110.0, (110.0 + 110.0) * 1.1])
+    flujos = np.array([100.0, 0.0, 110.0])
+    assert calcular_twr_diario(valores, flujos) == pytest.approx(21.0, rel=1e-12)
+    serie = pd.Series(valores, index=pd.bdate_range('2020-01-01', periods=3))
+    assert calcular_twr(serie, [100.0, 110.0], [0, 2]) == pytest.approx(21.0, rel=1e-12)
+    assert calcular_twr(serie, [], []) == 0.0
+
+
+def test_twr_matriz_igual_que_por_fila():
+    rng = np.random.default_rng(4)
+    valores = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (6, 250)), axis=1))
+    flujos = np.zeros_like(valores)
+    flujos[:, 0] = valores[:, 0]
+    flujos[:, 100] = 10.0
+    lote = calcular_twr_diario(valores, flujos)
+    np.testing.assert_array_equal(lote, [calcular_twr_diario(v, f) for v, f in zip(valores, flujos)])
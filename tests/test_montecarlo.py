@@ -0,0 +1,101 @@
+"""Monte Carlo por block bootstrap: reproducibilidad con semilla y núcleo frente a los simuladores."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lump_sum import (
+    caminos_bootstrap,
+    monte_carlo_ls_dca,
+    simular_caminos,
+    simular_dca_aportacion_periodica,
+    simular_dca_capital_disponible,
+    simular_lump_sum,
+)
+from lump_sum import montecarlo
+from lump_sum.montecarlo import sortear_bloques
+
+from conftest import serie_sintetica
+
+
+COMISION, SLIPPAGE, TASA = 0.001, 0.0005, 0.03
+CLAVES = ('rentabilidad_ls', 'rentabilidad_dca', 'diferencia_pp', 'tir_ls', 'tir_dca')
+
+
+@pytest.fixture(scope='module')
+def precios():
+    return serie_sintetica(1000, semilla=9)
+
+
+def _monte_carlo(precios, **opciones):
+    return monte_carlo_ls_dca(
+        precios, 260, 10_000, 12, COMISION, SLIPPAGE, TASA, num_caminos=300, tamaño_bloque=21, semilla=123, **opciones
+    )
+
+
+def test_misma_semilla_mismo_resultado_con_cualquier_lote(precios, monkeypatch):
+    referencia = _monte_carlo(precios)
+    variantes = [_monte_carlo(precios, caminos_por_lote=1), _monte_carlo(precios, caminos_por_lote=77)]
+    # 1 MB por lote: unos 125 caminos de 261 sesiones, tres lotes
+    monkeypatch.setattr(montecarlo, 'MEMORIA_LOTE_MB', 1)
+    variantes.append(_monte_carlo(precios))
+    for variante in variantes:
+        for clave in CLAVES:
+            np.testing.assert_array_equal(variante[clave], referencia[clave], err_msg=clave)
+        assert variante['percentiles_pp'] == referencia['percentiles_pp']
+
+
+def test_misma_semilla_mismo_resultado_en_paralelo(precios):
+    serie, paralelo = _monte_carlo(precios), _monte_carlo(precios, num_procesos=2)
+    for clave in CLAVES:
+        np.testing.assert_array_equal(paralelo[clave], serie[clave], err_msg=clave)
+
+
+def test_otra_semilla_otros_caminos(precios):
+    otra = monte_carlo_ls_dca(precios, 260, 10_000, 12, COMISION, SLIPPAGE, TASA, num_caminos=300, semilla=124)
+    assert not np.array_equal(otra['rentabilidad_ls'], _monte_carlo(precios)['rentabilidad_ls'])
+
+
+def test_caminos_encadenan_bloques_circulares():
+    retornos = np.log(np.linspace(1.01, 1.05, 10))
+    inicios = np.array([[8, 3]])
+    camino = caminos_bootstrap(retornos, inicios, 7, 4, precio_inicial=50.0)[0]
+    # Bloque desde 8 con vuelta al principio (8, 9, 0, 1) y desde 3 hasta completar el horizonte
+    np.testing.assert_allclose(np.diff(np.log(camino)), retornos[[8, 9, 0, 1, 3, 4, 5]], rtol=1e-12)
+    assert camino[0] == 50.0
+    bloques = sortear_bloques(5, 100, 21, 999, semilla=1)
+    assert bloques.shape == (5, 5)
+    np.testing.assert_array_equal(bloques, sortear_bloques(5, 100, 21, 999, semilla=1))
+
+
+@pytest.mark.parametrize('modo', ['capital_disponible', 'aportacion_periodica'])
+def test_camino_igual_que_simuladores(precios, modo):
+    dias_horizonte = 400
+    retornos = np.diff(np.log(precios.to_numpy()))
+    inicios = sortear_bloques(4, dias_horizonte, 21, len(retornos), semilla=5)
+    caminos = caminos_bootstrap(retornos, inicios, dias_horizonte, 21, precios.iloc[-1])
+    fechas = pd.bdate_range(precios.index[-1], periods=dias_horizonte + 1)
+    aportacion = 700 if modo == 'aportacion_periodica' else None
+    resultado = simular_caminos(caminos, fechas, 10_000, 12, COMISION, SLIPPAGE, TASA, modo, aportacion_mensual=aportacion)
+    
+    for fila, camino in enumerate(caminos):
+        serie = pd.Series(camino, index=fechas)
+        if modo == 'capital_disponible':
+            dca = simular_dca_capital_disponible(serie, 10_000, 12, COMISION, SLIPPAGE, TASA)
+            ls = simular_lump_sum(serie, 10_000, COMISION, SLIPPAGE)
+        else:
+            dca = simular_dca_aportacion_periodica(serie, 700, 12, COMISION, SLIPPAGE)
+            ls = simular_lump_sum(serie, dca['capital_total_aportado'], COMISION, SLIPPAGE)
+        assert resultado['rentabilidad_ls'][fila] == pytest.approx(ls['rentabilidad'], rel=1e-12, abs=1e-12)
+        assert resultado['rentabilidad_dca'][fila] == pytest.approx(dca['rentabilidad'], rel=1e-12, abs=1e-12)
+        assert resultado['tir_ls'][fila] == pytest.approx(ls['tir'], rel=1e-9, abs=1e-9)
+        assert resultado['tir_dca'][fila] == pytest.approx(dca['tir'], rel=1e-9, abs=1e-9)
+
+
+def test_parametros_invalidos(precios):
+    with pytest.raises(ValueError):
+        monte_carlo_ls_dca(precios.iloc[:1], 10, 10_000, 12, COMISION, SLIPPAGE)
+    with pytest.raises(ValueError):
+        monte_carlo_ls_dca(precios, 10, 10_000, 12, COMISION, SLIPPAGE, num_caminos=0)
+    with pytest.raises(ValueError):
+        monte_carlo_ls_dca(precios, 10, 10_000, 12, COMISION, SLIPPAGE, tamaño_bloque=0)
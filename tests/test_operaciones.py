@@ -0,0 +1,84 @@
+"""Coste FIFO del libro de operaciones frente a la base de coste agregada y a un reparto lote a lote."""
+
+import numpy as np
+import pytest
+
+from lump_sum import simular_dca_aportacion_periodica, simular_dca_capital_disponible, simular_lump_sum
+from lump_sum.operaciones import LibroOperaciones
+
+
+def _fifo_lote_a_lote(participaciones_lotes, importes_lotes, ventas) -> list:
+    """Coste de adquisición de cada venta recorriendo los lotes en orden (referencia)."""
+    pendientes = list(participaciones_lotes)
+    costes = []
+    for vendidas in ventas:
+        coste = 0.0
+        for i, pendiente in enumerate(pendientes):
+            consumidas = min(pendiente, vendidas)
+            coste += consumidas / participaciones_lotes[i] * importes_lotes[i]
+            pendientes[i] -= consumidas
+            vendidas -= consumidas
+            if vendidas <= 0:
+                break
+        costes.append(coste)
+    return costes
+
+
+@pytest.mark.parametrize('simular', [
+    lambda p: simular_lump_sum(p, 10_000, 0.001, 0.0005),
+    lambda p: simular_dca_capital_disponible(p, 10_000, 12, 0.001, 0.0005, 0.03),
+    lambda p: simular_dca_aportacion_periodica(p, 500, 24, 0.001, 0.0005),
+], ids=['lump_sum', 'capital_disponible', 'aportacion_periodica'])
+def test_venta_total_igual_que_base_agregada(precios, simular):
+    # Vendiendo todo, el coste FIFO es lo invertido y la ganancia, lo cobrado menos lo invertido
+    resultado = simular(precios)
+    libro = resultado['operaciones']
+    venta = libro.ventas[-1]
+    compras = libro.compras
+    assert np.isclose(venta['coste_adquisicion'], resultado['capital_invertido'], rtol=1e-13, atol=0)
+    assert np.isclose(resultado['plusvalia'], resultado['valor_tras_venta'] - resultado['capital_invertido'], rtol=1e-12, atol=1e-9)
+    assert np.isclose(libro.participaciones_abiertas(), 0.0, atol=1e-9)
+    precio_medio = np.dot(compras['precio'], compras['participaciones']) / compras['participaciones'].sum()
+    assert np.isclose(resultado['precio_medio'], precio_medio, rtol=1e-14, atol=0)
+
+
+def test_ventas_parciales_igual_que_lote_a_lote(precios):
+    rng = np.random.default_rng(2)
+    dias = np.arange(0, 600, 21)
+    libro = LibroOperaciones(precios.index)
+    libro.comprar(dias, precios.iloc[dias], rng.uniform(100, 1_000, len(dias)), 0.001, 0.0005)
+    
+    # Ventas que cortan lotes por la mitad, vacían uno justo en su borde y venden lo que queda
+    total = libro.compras['participaciones'].sum()
+    fin_lote = np.cumsum(libro.compras['participaciones'])
+    cortes = np.array([0.1 * total, fin_lote[5], fin_lote[5] + 0.5 * libro.compras['participaciones'][6], 0.8 * total, total])
+    ventas = np.diff(cortes, prepend=0.0)
+    for vendidas in ventas:
+        libro.vender(700, precios.iloc[700], vendidas, 0.001, 0.0005)
+    
+    esperado = _fifo_lote_a_lote(libro.compras['participaciones'], libro.compras['importe'], ventas)
+    np.testing.assert_allclose(libro.ventas['coste_adquisicion'], esperado, rtol=1e-12)
+    np.testing.assert_allclose(libro.ventas['ganancia'], libro.ventas['importe_neto'] - esperado, rtol=1e-10)
+    assert np.isclose(libro.ventas['coste_adquisicion'].sum(), libro.compras['importe'].sum(), rtol=1e-13, atol=0)
+    np.testing.assert_allclose(libro.consumo_lotes().sum(axis=1), ventas, rtol=1e-12)
+    np.testing.assert_allclose(libro.consumo_lotes().sum(axis=0), libro.compras['participaciones'], rtol=1e-12)
+    assert libro.lotes_abiertos().empty
+
+
+def test_lotes_abiertos_conservan_el_coste(precios):
+    dias = np.arange(0, 300, 21)
+    libro = LibroOperaciones(precios.index)
+    libro.comprar(dias, precios.iloc[dias], 1_000, 0.001, 0.0005)
+    venta = libro.vender(400, precios.iloc[400], 0.37 * libro.participaciones_abiertas(), 0.001, 0.0005)
+    abiertos = libro.lotes_abiertos()
+    assert np.isclose(venta['coste_adquisicion'] + abiertos['coste_adquisicion'].sum(), 1_000 * len(dias), rtol=1e-13, atol=0)
+    assert np.isclose(abiertos['participaciones'].sum(), libro.participaciones_abiertas(), rtol=1e-12, atol=0)
+
+
+def test_venta_sin_participaciones_o_fuera_de_orden(precios):
+    libro = LibroOperaciones(precios.index)
+    libro.comprar([10], precios.iloc[[10]], 1_000, 0.0, 0.0)
+    with pytest.raises(ValueError):
+        libro.vender(20, precios.iloc[20], 2 * libro.participaciones_abiertas(), 0.0, 0.0)
+    with pytest.raises(ValueError):
+        libro.vender(5, precios.iloc[5], libro.participaciones_abiertas(), 0.0, 0.0)
@@ -0,0 +1,82 @@
+"""Pool de procesos con arrays compartidos frente a la ejecución en el propio proceso."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lump_sum import ArraysCompartidos, EjecutorProcesos, ProveedorFicheros
+from lump_sum import cli
+from lump_sum.paralelo import abrir_arrays, lotes
+
+from conftest import serie_sintetica
+
+
+def _arrays_y_tareas() -> tuple[dict, list]:
+    """Precios de dos tickers con las claves de la línea de comandos y un escenario por ticker y modo."""
+    arrays, tareas = {}, []
+    for ticker, semilla in (('AAA', 1), ('BBB', 2)):
+        precios = serie_sintetica(800, semilla=semilla)
+        clave_valores, clave_fechas = cli._claves_arrays(ticker)
+        arrays[clave_valores] = precios.to_numpy()
+        arrays[clave_fechas] = precios.index.to_numpy()
+        for modo in cli.MODOS_DCA:
+            escenario = {
+                'escenario_id': len(tareas), 'ticker': ticker, 'fecha_inicio': precios.index[10], 'horizonte': 2,
+                'modo': modo, 'meses_dca': 12, 'momento': 'inicio', 'comision': 0.001, 'slippage': 0.0005,
+                'tasa_monetario': 0.03, 'capital': 10_000, 'aportacion_mensual': 1_000,
+            }
+            tareas.append((escenario, 10, 10 + 2 * 252 + 1, True))
+    return arrays, tareas
+
+
+def test_mapear_en_paralelo_igual_que_en_linea():
+    arrays, tareas = _arrays_y_tareas()
+    en_linea = list(EjecutorProcesos(1, arrays).mapear(cli._tarea_escenario, tareas))
+    paralelo = list(EjecutorProcesos(2, arrays).mapear(cli._tarea_escenario, tareas, tareas_por_envio=3))
+    assert len(paralelo) == len(en_linea) == 4
+    for (fila_a, curvas_a), (fila_b, curvas_b) in zip(en_linea, paralelo):
+        assert fila_a == fila_b
+        pd.testing.assert_frame_equal(curvas_a, curvas_b)
+
+
+def test_arrays_compartidos_de_solo_lectura():
+    arrays = {'a': np.arange(10.0), 'b': np.array([[1, 2], [3, 4]], dtype=np.int32), 'vacio': np.empty(0)}
+    with ArraysCompartidos(arrays) as compartidos:
+        memoria, vistas = abrir_arrays(compartidos.descriptor)
+        for clave, valor in arrays.items():
+            np.testing.assert_array_equal(vistas[clave], valor)
+            assert vistas[clave].dtype == valor.dtype
+        with pytest.raises(ValueError):
+            vistas['a'][0] = 1.0
+        del vistas
+        memoria.close()
+
+
+def test_lotes_cubren_todo_en_orden():
+    for n, procesos in ((0, 1), (1, 4), (10, 1), (1000, 3)):
+        partes = lotes(n, procesos)
+        assert np.concatenate([np.arange(n)[parte] for parte in partes]).tolist() == list(range(n))
+    assert len(lotes(1000, 3)) == 12
+    with pytest.raises(ValueError):
+        EjecutorProcesos(0)
+
+
+def test_linea_de_comandos_igual_con_varios_procesos(tmp_path):
+    # Varios tickers comparten un único pool: misma salida que sin procesos
+    datos = ProveedorFicheros(tmp_path / 'datos')
+    datos.guardar('AAA', serie_sintetica(1300, semilla=1, inicio='2010-01-01'))
+    datos.guardar('BBB', serie_sintetica(900, semilla=2, inicio='2010-01-01'))
+    salidas = []
+    for procesos in (1, 2):
+        salida = tmp_path / f'resumen_{procesos}.csv'
+        argumentos = [
+            '--tickers', 'AAA', 'BBB', 'CCC', '--fechas-inicio', '2010-01-01', '2011-06-01', '--horizontes', '1', '3',
+            '--modos', *cli.MODOS_DCA, '--proveedor', f"ficheros:{tmp_path / 'datos'}", '--sin-almacen',
+            '--procesos', str(procesos), '--salida', str(salida), '--bloque', '3',
+        ]
+        assert cli.main(argumentos) == 0
+        salidas.append(salida.read_text())
+    assert salidas[0] == salidas[1]
+    resumen = pd.read_csv(tmp_path / 'resumen_1.csv')
+    assert resumen['escenario_id'].tolist() == list(range(len(resumen)))
+    assert set(resumen['ticker']) == {'AAA', 'BBB'}
@@ -0,0 +1,96 @@
+"""ResultadoSimulacion: compactación de los diccionarios, lectura por clave y fila del resumen."""
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from lump_sum import ResultadoSimulacion, fila_resumen, simular_dca_capital_disponible, simular_lump_sum
+from lump_sum.cli import COLUMNAS_ENTERAS, EscritorTabular, MODOS_DCA, ejecutar_escenario
+
+
+@pytest.fixture(scope='module')
+def resultados(precios) -> tuple[dict, dict]:
+    return (
+        simular_lump_sum(precios, 10_000, 0.001, 0.0005),
+        simular_dca_capital_disponible(precios, 10_000, 12, 0.001, 0.0005, 0.03),
+    )
+
+
+def _escenario(escenario_id: int, modo: str, meses_dca: int) -> dict:
+    return {
+        'escenario_id': escenario_id, 'ticker': 'SINT', 'fecha_inicio': pd.Timestamp('2005-01-03'), 'horizonte': 3,
+        'modo': modo, 'meses_dca': meses_dca, 'momento': 'inicio', 'comision': 0.001, 'slippage': 0.0005,
+        'tasa_monetario': 0.03, 'capital': 10_000, 'aportacion_mensual': 1_000,
+    }
+
+
+def test_sin_curvas_solo_metricas(resultados):
+    for resultado in resultados:
+        compacto = ResultadoSimulacion.desde_dict(resultado, con_curvas=False)
+        assert not compacto.tiene_curvas
+        assert compacto.curva is None and compacto.fechas is None and compacto.operaciones is None
+        for clave in ('valores', 'valores_solo_activo', 'curvas_coste', 'operaciones'):
+            assert clave not in compacto
+            with pytest.raises(KeyError):
+                compacto[clave]
+        assert compacto.a_dict().keys() == set(resultado) - {'valores', 'valores_solo_activo', 'curvas_coste', 'operaciones'}
+
+
+def test_lectura_como_diccionario(resultados):
+    for resultado in resultados:
+        compacto = ResultadoSimulacion.desde_dict(resultado, con_curvas=True)
+        assert compacto.tiene_curvas
+        for clave, valor in resultado.items():
+            if isinstance(valor, pd.Series):
+                pd.testing.assert_series_equal(compacto[clave], valor, check_names=False)
+            elif clave not in ('curvas_coste', 'operaciones'):
+                assert compacto[clave] == valor or (np.isnan(valor) and np.isnan(compacto[clave])), clave
+        assert compacto.a_dict().keys() == resultado.keys()
+        # Los campos internos y las claves desconocidas no se leen por clave
+        for clave in ('fechas', 'curva', 'curva_solo_activo', 'no_existe'):
+            assert clave not in compacto
+            assert compacto.get(clave, 'defecto') == 'defecto'
+    ls, dca = (ResultadoSimulacion.desde_dict(r, con_curvas=True) for r in resultados)
+    # Las claves exclusivas de DCA no existen en Lump Sum, cuya curva solo activo es la curva
+    assert ls.curva_solo_activo is None and dca.curva_solo_activo is not None
+    pd.testing.assert_series_equal(ls['valores_solo_activo'], ls['valores'])
+    for clave in ('impuestos_activo', 'aportacion_mensual', 'dias_dca', 'modo'):
+        assert clave not in ls and clave in dca
+        with pytest.raises(KeyError):
+            ls[clave]
+    assert dca['modo'] == resultados[1]['modo']
+
+
+def test_indice_de_fechas_compartido(precios, resultados):
+    compactos = [ResultadoSimulacion.desde_dict(r, con_curvas=True, fechas=precios.index) for r in resultados]
+    assert all(c.fechas is precios.index for c in compactos)
+    assert all(c.curva.dtype == np.float64 for c in compactos)
+
+
+def test_fila_resumen_con_el_escritor(precios, tmp_path):
+    filas = []
+    for i, (modo, meses_dca) in enumerate((m, meses) for m in MODOS_DCA for meses in (1, 12)):
+        escenario = _escenario(i, modo, meses_dca)
+        ventana = precios.iloc[:3 * 252 + 1]
+        filas.append(fila_resumen(escenario, ventana, *ejecutar_escenario(ventana, escenario)))
+    for fila in filas:
+        assert set(COLUMNAS_ENTERAS) <= fila.keys()
+        assert all(isinstance(fila[columna], (int, np.integer)) for columna in COLUMNAS_ENTERAS)
+        assert fila['ganador'] == ('LS' if fila['rentabilidad_ls'] > fila['rentabilidad_dca'] else 'DCA')
+    assert [f['num_compras_dca'] for f in filas] == [1, 12, 1, 12]
+    df = pd.DataFrame(filas)
+    for ruta in (tmp_path / 'resumen.parquet', tmp_path / 'resumen.csv'):
+        # Dos bloques: el esquema del primero debe aceptar el segundo
+        with EscritorTabular(ruta, COLUMNAS_ENTERAS) as escritor:
+            escritor.escribir(df.iloc[:2])
+            escritor.escribir(df.iloc[2:])
+        assert escritor.filas == len(filas)
+        leido = pd.read_parquet(ruta) if ruta.suffix == '.parquet' else pd.read_csv(ruta)
+        assert leido.columns.tolist() == df.columns.tolist()
+        for columna in COLUMNAS_ENTERAS:
+            assert pd.api.types.is_integer_dtype(leido[columna])
+            assert leido[columna].tolist() == df[columna].tolist()
+        np.testing.assert_allclose(leido['rentabilidad_dca'], df['rentabilidad_dca'], rtol=1e-15)
+    esquema = pq.read_schema(tmp_path / 'resumen.parquet')
+    assert str(esquema.field('capital_ls').type) == 'double'
@@ -0,0 +1,89 @@
+"""Simuladores LS / DCA: casos con resultado conocido y motor vectorizado frente al bucle."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lump_sum import simular_dca_aportacion_periodica, simular_dca_capital_disponible, simular_lump_sum
+from lump_sum.simulacion import MOTORES_CAPITAL_DISPONIBLE
+
+from conftest import comparar_resultados, serie_sintetica
+
+
+@pytest.fixture
+def precios_planos() -> pd.Series:
+    return pd.Series(100.0, index=pd.bdate_range('2020-01-01', periods=300))
+
+
+def test_lump_sum_sin_variacion_ni_costes(precios_planos):
+    resultado = simular_lump_sum(precios_planos, 10_000, 0.0, 0.0)
+    assert resultado['valor_neto'] == 10_000
+    assert resultado['plusvalia'] == 0 and resultado['impuestos'] == 0
+    assert resultado['rentabilidad'] == 0
+    assert resultado['num_operaciones'] == 2
+
+
+def test_lump_sum_costes_en_compra_y_venta(precios_planos):
+    # Precio constante: se pierde el coste al comprar y otra vez sobre lo que queda al vender
+    resultado = simular_lump_sum(precios_planos, 10_000, 0.001, 0.0005)
+    assert resultado['valor_tras_venta'] == pytest.approx(10_000 * (1 - 0.0015) ** 2, rel=1e-14)
+    assert resultado['plusvalia'] == pytest.approx(10_000 * ((1 - 0.0015) ** 2 - 1), rel=1e-12)
+    assert resultado['impuestos'] == 0
+    assert resultado['costes_transaccion'] == pytest.approx(10_000 - resultado['valor_tras_venta'], rel=1e-12)
+
+
+def test_lump_sum_plusvalia_por_tramos(precios_planos):
+    # El precio se duplica el último día: 10.000 de ganancia, 6.000 al 19 % y 4.000 al 21 %
+    precios = precios_planos.copy()
+    precios.iloc[-1] = 200.0
+    resultado = simular_lump_sum(precios, 10_000, 0.0, 0.0)
+    assert resultado['plusvalia'] == pytest.approx(10_000)
+    assert resultado['impuestos'] == pytest.approx(6_000 * 0.19 + 4_000 * 0.21)
+    assert resultado['valor_neto'] == pytest.approx(20_000 - 1_980)
+
+
+def test_dca_capital_disponible_intereses_del_pendiente(precios_planos):
+    # Dos compras (día 0 y primera sesión de febrero): el día 0 renta todo el capital
+    # antes de comprar y hasta la segunda compra renta la mitad
+    resultado = simular_dca_capital_disponible(precios_planos, 10_000, 2, 0.0, 0.0, 0.0252)
+    dias = resultado['operaciones'].compras['dia']
+    assert list(dias) == [0, precios_planos.index.searchsorted(pd.Timestamp('2020-02-01'))]
+    assert resultado['intereses_monetario'] == pytest.approx(0.0252 / 252 * (10_000 + 5_000 * dias[1]), rel=1e-12)
+    assert resultado['impuestos_intereses'] == pytest.approx(resultado['intereses_monetario'] * 0.19, rel=1e-12)
+
+
+def test_dca_aportacion_periodica_capital_y_costes(precios_planos):
+    resultado = simular_dca_aportacion_periodica(precios_planos, 500, 6, 0.001, 0.0)
+    assert resultado['capital_total_aportado'] == pytest.approx(3_000)
+    assert resultado['comision_compra'] == pytest.approx(3.0)
+    assert resultado['num_operaciones'] == 7
+    assert resultado['valor_tras_venta'] == pytest.approx(3_000 * (1 - 0.001) ** 2, rel=1e-12)
+    np.testing.assert_array_equal(resultado['operaciones'].compras['importe'], 500.0)
+
+
+@pytest.mark.parametrize('meses_dca', [1, 6, 12, 36])
+@pytest.mark.parametrize('aportacion_inicio_mes', [True, False])
+def test_motores_capital_disponible_iguales(precios, meses_dca, aportacion_inicio_mes):
+    parametros = dict(
+        capital=50_000, meses_dca=meses_dca, comision=0.001, slippage=0.0005, tasa_monetario=0.03,
+        aportacion_inicio_mes=aportacion_inicio_mes, niveles_coste=(0.0, 0.01),
+    )
+    vectorizado = simular_dca_capital_disponible(precios, motor='vectorizado', **parametros)
+    bucle = simular_dca_capital_disponible(precios, motor='bucle', **parametros)
+    # Los totales de comisión y slippage del motor vectorizado son productos: el bucle los suma
+    comparar_resultados(vectorizado, bucle, rtol=1e-12)
+
+
+def test_motores_con_mas_meses_que_la_serie():
+    # Serie de tres meses: el DCA se queda a medias y parte del capital sigue en el monetario
+    precios = serie_sintetica(60, semilla=3)
+    vectorizado = simular_dca_capital_disponible(precios, 12_000, 12, 0.001, 0.0005, 0.02)
+    bucle = simular_dca_capital_disponible(precios, 12_000, 12, 0.001, 0.0005, 0.02, motor='bucle')
+    assert vectorizado['num_operaciones'] < 12
+    comparar_resultados(vectorizado, bucle, rtol=1e-12)
+
+
+def test_motor_desconocido(precios):
+    with pytest.raises(ValueError):
+        simular_dca_capital_disponible(precios, 10_000, 12, 0.001, 0.0005, 0.03, motor='x')
+    assert set(MOTORES_CAPITAL_DISPONIBLE) == {'vectorizado', 'bucle'}
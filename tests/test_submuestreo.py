@@ -0,0 +1,39 @@
+"""Submuestreo LTTB de curvas para gráficos."""
+
+import numpy as np
+
+from lump_sum import lttb
+
+from conftest import serie_sintetica
+
+
+def test_longitud_y_extremos():
+    valores = serie_sintetica(5000, semilla=6).to_numpy()
+    for n_puntos in (3, 10, 500, 4999):
+        posiciones = lttb(valores, n_puntos)
+        assert len(posiciones) == n_puntos
+        assert posiciones[0] == 0 and posiciones[-1] == len(valores) - 1
+        assert (np.diff(posiciones) > 0).all()
+
+
+def test_obligatorios_se_conservan():
+    valores = serie_sintetica(5000, semilla=6).to_numpy()
+    obligatorios = [int(np.argmax(valores)), int(np.argmin(valores)), 1234, 1235, 4998]
+    posiciones = lttb(valores, 300, obligatorios)
+    assert set(obligatorios) <= set(posiciones.tolist())
+    assert len(posiciones) <= 300
+    assert posiciones[0] == 0 and posiciones[-1] == len(valores) - 1
+    # Fuera de rango o repetidos se ignoran
+    np.testing.assert_array_equal(lttb(valores, 300, obligatorios + [-1, 5000, 1234]), posiciones)
+
+
+def test_serie_corta_sin_cambios():
+    valores = np.array([3.0, 1.0, 4.0, 1.0, 5.0])
+    np.testing.assert_array_equal(lttb(valores, 10), np.arange(5))
+    np.testing.assert_array_equal(lttb(valores, 5), np.arange(5))
+
+
+def test_conserva_un_pico_aislado():
+    valores = np.zeros(10_000)
+    valores[7_777] = 100.0
+    assert 7_777 in lttb(valores, 50)